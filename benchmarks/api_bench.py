@@ -0,0 +1,361 @@
+"""Load benchmark for every main.py endpoint, in-process and deterministic.
+
+Boots the FastAPI app inside this process (httpx ASGI transport, startup and
+shutdown hooks included) in a scratch directory, seeds the store, swaps the
+Whisper loader for a deterministic stub and serves WhatsApp media from a mock
+transport, so no GPU, network or real data is touched. Each scenario runs at
+fixed concurrency levels and records p50/p95/p99 latency, throughput, errors
+and peak RSS.
+
+    python benchmarks/api_bench.py                          # run, print, write results
+    python benchmarks/api_bench.py --update-baseline        # also store as the baseline
+    python benchmarks/api_bench.py --scenarios list_page,search --concurrency 1,16
+
+Exits with status 1 when a scenario regresses past `--tolerance` against the
+baseline (p95 latency up or throughput down).
+"""
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = ROOT / "benchmarks" / "api_baseline.json"
+DEFAULT_OUTPUT = ROOT / "benchmarks" / "api_results.json"
+
+SEFIROT = ["Keter", "Chochmah", "Binah", "Chesed", "Gevurah", "Tiferet", "Netzach", "Hod", "Yesod", "Malkuth"]
+SKILLS = ["Whisper Transcription", "Audio Analysis", "Tax Review", "Sales Outreach", "Data Reporting", "Legal Review"]
+
+
+class StubWhisperModel:
+    """Deterministic stand-in for a Whisper model: text derives from the audio bytes"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def transcribe(self, audio, **options):
+        if isinstance(audio, str):
+            with open(audio, "rb") as f:
+                audio = f.read()
+        digest = hashlib.sha256(audio).hexdigest()  # decoded arrays expose the buffer protocol
+        time.sleep(self.delay)  # stands in for inference time
+        return {
+            "text": f" transcripcion {digest[:16]}",
+            "language": "es",
+            "segments": [{"start": 0.0, "end": 1.0, "text": f"transcripcion {digest[:16]}"}],
+        }
+
+
+def wav_bytes(seed: int, seconds: float = 1.0, rate: int = 16000) -> bytes:
+    rng = random.Random(seed)
+    frames = bytes(rng.getrandbits(8) for _ in range(int(seconds * rate) * 2))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(frames)
+    return buffer.getvalue()
+
+
+def synthetic_agent(rng: random.Random, i: int) -> dict:
+    return {
+        "name": f"Bench Agent {i}",
+        "role": rng.choice(["Analyst", "Assistant", "Consultant"]),
+        "specialty": rng.choice(["Taxes", "Audio", "Legal support"]),
+        "sefirot_activation": rng.sample(SEFIROT, 3),
+        "skills": rng.sample(SKILLS, 3),
+    }
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / 1024 / (1024 if platform.system() == "Darwin" else 1), 1)
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def boot(workdir: Path, stub_delay: float):
+    """Import main.py inside `workdir` with benchmark-friendly settings"""
+    for name in ("static", "templates"):
+        shutil.copytree(ROOT / name, workdir / name)
+    shutil.copy(ROOT / "empleaidos.json", workdir / "empleaidos.json")
+    os.chdir(workdir)
+    os.environ.update({
+        "WHISPER_WORKERS": "0",
+        "WHISPER_MAX_QUEUE_DEPTH": "100000",
+        "TRANSCRIPTION_CACHE_DIR": str(workdir / "cache"),
+        "SESSION_FLUSH_INTERVAL": "3600",
+    })
+    sys.path.insert(0, str(ROOT))
+    import main
+
+    main.whisper_models._loader = lambda size: StubWhisperModel(stub_delay)
+    main.skill_deployer.skills_path = workdir / "skills"
+    # The benchmark measures handlers, not the limiter rejecting them
+    main.rate_limiter.default_limit = 10 ** 9
+    main.rate_limiter.route_limits = {}
+    return main
+
+
+def build_scenarios(main, rng: random.Random, seeded_ids: list):
+    """name -> async fn(client, i) returning the response"""
+    import httpx
+
+    counter = {"audio": 0}
+
+    def next_audio() -> bytes:
+        counter["audio"] += 1
+        return wav_bytes(counter["audio"])
+
+    cached_audio = wav_bytes(0)
+    delete_pool = list(seeded_ids[len(seeded_ids) // 2:])
+    deploy_pool = seeded_ids[:len(seeded_ids) // 2]
+    import_body = "\n".join(json.dumps(synthetic_agent(rng, 900_000 + i)) for i in range(100)).encode()
+
+    # WhatsApp media is served from memory instead of a provider CDN
+    media = {}
+
+    def serve_media(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=media.get(request.url.path, cached_audio))
+
+    main.media_fetcher._client = httpx.AsyncClient(transport=httpx.MockTransport(serve_media))
+
+    async def home_new_session(client, i):
+        return await client.get("/")
+
+    async def list_page(client, i):
+        return await client.get("/api/empleaidos", params={"limit": 100, "cursor": (i % 5) * 100})
+
+    async def list_projected(client, i):
+        return await client.get("/api/empleaidos", params={"fields": "id,name,status"})
+
+    async def search(client, i):
+        return await client.get("/api/empleaidos/search", params={"q": "skills:whisper AND sefirot:hod", "limit": 20})
+
+    async def create(client, i):
+        return await client.post("/api/empleaidos", json=synthetic_agent(rng, 100_000 + i))
+
+    async def delete(client, i):
+        return await client.delete(f"/api/empleaidos/{delete_pool.pop()}")
+
+    async def deploy_one(client, i):
+        return await client.post(f"/api/empleaidos/{deploy_pool[i % len(deploy_pool)]}/deploy")
+
+    async def deploy_bulk(client, i):
+        return await client.post("/api/empleaidos/deploy", json={"ids": deploy_pool[:50]})
+
+    async def import_ndjson(client, i):
+        return await client.post("/api/empleaidos/import", params={"dry_run": "true"}, content=import_body)
+
+    async def health(client, i):
+        return await client.get("/api/health")
+
+    async def metrics(client, i):
+        return await client.get("/api/metrics")
+
+    async def whisper_transcribe(client, i):
+        return await client.post("/api/whisper/transcribe", files={"file": ("a.wav", next_audio(), "audio/wav")})
+
+    async def whisper_transcribe_cached(client, i):
+        return await client.post("/api/whisper/transcribe", files={"file": ("a.wav", cached_audio, "audio/wav")})
+
+    async def whisper_transcribe_stream(client, i):
+        response = await client.post("/api/whisper/transcribe/stream", files={"file": ("a.wav", next_audio(), "audio/wav")})
+        if "event: done" not in response.text:
+            raise RuntimeError("stream ended without a done event")
+        return response
+
+    async def whisper_job(client, i):
+        submitted = await client.post("/api/whisper/jobs", files={"file": ("a.wav", next_audio(), "audio/wav")})
+        if submitted.status_code != 202:
+            return submitted
+        return await client.get(f"/api/whisper/jobs/{submitted.json()['id']}", params={"wait": 30})
+
+    async def whisper_skills(client, i):
+        return await client.get("/api/whisper/skills")
+
+    async def whatsapp_webhook(client, i):
+        audio = next_audio()
+        # Unique across concurrency levels, or redelivery dedup would answer from memory
+        path = f"/media/{counter['audio']}.ogg"
+        media[path] = audio
+        return await client.post("/api/whatsapp/webhook", json={
+            "from": "+18095550000",
+            "message_type": "audio",
+            "audio_url": f"https://media.example{path}",
+            "message_id": f"wamid.bench.{counter['audio']}",
+        })
+
+    async def whatsapp_webhook_redelivery(client, i):
+        return await client.post("/api/whatsapp/webhook", json={
+            "from": "+18095550000",
+            "message_type": "audio",
+            "audio_url": "https://media.example/media/redelivered.ogg",
+            "message_id": "wamid.bench.redelivered",
+        })
+
+    async def whatsapp_status(client, i):
+        return await client.get("/api/whatsapp/status")
+
+    scenarios = [
+        home_new_session, list_page, list_projected, search, create, delete, deploy_one, deploy_bulk,
+        import_ndjson, health, metrics, whisper_transcribe, whisper_transcribe_cached,
+        whisper_transcribe_stream, whisper_job, whisper_skills, whatsapp_webhook, whatsapp_webhook_redelivery,
+        whatsapp_status,
+    ]
+    return {fn.__name__: fn for fn in scenarios}
+
+
+async def drive(client, scenario, requests: int, concurrency: int) -> dict:
+    latencies, errors = [], 0
+    next_index = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in next_index:
+            started = time.perf_counter()
+            try:
+                response = await scenario(client, i)
+                if response.status_code >= 400:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "throughput_rps": round(requests / elapsed, 1) if elapsed else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+async def run_suite(args) -> dict:
+    import httpx
+
+    workdir = Path(tempfile.mkdtemp(prefix="empleaido-bench-"))
+    try:
+        main = boot(workdir, args.stub_delay)
+        rng = random.Random(args.seed)
+        seeded = []
+        for i in range(args.seed_agents):
+            agent = synthetic_agent(rng, i)
+            seeded.append(dict(agent, id=f"bench-{i:06d}", status="active", created_at="2026-01-01T00:00:00",
+                               deployed=False))
+        main.empleaido_store.put_many(seeded)
+        scenarios = build_scenarios(main, rng, [agent["id"] for agent in seeded])
+        selected = args.scenarios.split(",") if args.scenarios else list(scenarios)
+        unknown = set(selected) - set(scenarios)
+        if unknown:
+            raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+        levels = [int(level) for level in args.concurrency.split(",")]
+
+        results = {}
+        async with main.app.router.lifespan_context(main.app):
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+                for name in selected:
+                    for concurrency in levels:
+                        requests = args.requests
+                        if name == "delete":
+                            requests = min(requests, args.seed_agents // 2 // len(levels))
+                        result = await drive(client, scenarios[name], requests, concurrency)
+                        results[f"{name}@c{concurrency}"] = result
+                        print(
+                            f"{name:<26} c={concurrency:<3} p50 {result['p50_ms']:8.2f} ms  "
+                            f"p95 {result['p95_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms  "
+                            f"{result['throughput_rps']:8.1f} req/s  errors {result['errors']:<3} "
+                            f"rss {result['peak_rss_mb']} MB"
+                        )
+        return {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "seed": args.seed,
+                "seed_agents": args.seed_agents,
+                "requests": args.requests,
+                "stub_delay": args.stub_delay,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "results": results,
+        }
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """Scenarios whose p95 grew or throughput fell by more than `tolerance`"""
+    regressions = []
+    for key, result in current["results"].items():
+        base = baseline.get("results", {}).get(key)
+        if not base:
+            continue
+        if base["p95_ms"] and result["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{key}: p95 {base['p95_ms']} -> {result['p95_ms']} ms")
+        if base["throughput_rps"] and result["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{key}: throughput {base['throughput_rps']} -> {result['throughput_rps']} req/s")
+        if result["errors"] > base["errors"]:
+            regressions.append(f"{key}: errors {base['errors']} -> {result['errors']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", help="comma-separated subset (default: all)")
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario and level")
+    parser.add_argument("--seed-agents", type=int, default=2000, help="empleaidos stored before the run")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--stub-delay", type=float, default=0.005, help="stub model inference seconds")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_suite(args))
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {args.output}")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"Baseline updated: {args.baseline}")
+        return
+    if args.baseline.exists():
+        regressions = compare(report, json.loads(args.baseline.read_text()), args.tolerance)
+        if regressions:
+            print("Regressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Check: audit log rotation keeps `backups` segments and never touches the lock.
+
+Writes batches through AuditLogWriter with a tiny `max_bytes` so it rotates
+on nearly every write, well past the backup count, with and without gzip.
+Afterwards:
+
+1. the cross-process lock file still exists with the inode of the first write
+   (a recreated lock would let two workers hold "the" lock at once),
+2. exactly `backups` rotated segments are left, all named by _rotate(),
+3. unrelated files next to the log (e.g. audit.log.notes) are not pruned.
+
+    python benchmarks/audit_rotation_check.py [--rotations 40] [--backups 3]
+
+Exits with status 1 if any check fails.
+"""
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from factory.audit import AuditLogWriter  # noqa: E402
+
+
+def check(rotations: int, backups: int, compress: bool) -> list:
+    problems = []
+    with tempfile.TemporaryDirectory(prefix="audit-rotation-") as workdir:
+        path = Path(workdir) / "audit.log"
+        unrelated = Path(workdir) / "audit.log.notes"
+        unrelated.write_text("keep me\n")
+        writer = AuditLogWriter(path, max_bytes=64, rotate_daily=False, backups=backups, compress=compress)
+
+        writer._write([{"event": "first", "padding": "x" * 80}])
+        lock_inode = writer.lock_path.stat().st_ino
+        for i in range(rotations):
+            writer._write([{"event": "rotate", "i": i, "padding": "x" * 80}])
+
+        label = f"compress={compress}"
+        if writer.rotations < rotations:
+            problems.append(f"{label}: only {writer.rotations} rotations for {rotations} oversized writes")
+        if not writer.lock_path.exists():
+            problems.append(f"{label}: lock file {writer.lock_path.name} was deleted")
+        elif writer.lock_path.stat().st_ino != lock_inode:
+            problems.append(f"{label}: lock file was recreated (inode changed)")
+        segments = sorted(p.name for p in path.parent.glob("audit.log.*") if p != unrelated)
+        if len(segments) != backups:
+            problems.append(f"{label}: {len(segments)} segments kept, expected {backups}: {segments}")
+        if not unrelated.exists():
+            problems.append(f"{label}: unrelated file {unrelated.name} was pruned")
+        print(f"{label:15} {writer.rotations} rotations, {len(segments)} segments kept, "
+              f"lock {'intact' if writer.lock_path.exists() else 'MISSING'}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rotations", type=int, default=40)
+    parser.add_argument("--backups", type=int, default=3)
+    args = parser.parse_args()
+
+    problems = []
+    for compress in (False, True):
+        problems += check(args.rotations, args.backups, compress)
+    for problem in problems:
+        print(f"FAIL {problem}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
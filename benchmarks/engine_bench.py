@@ -0,0 +1,153 @@
+"""Benchmark: real-time factor and memory of each transcription engine.
+
+Every engine runs in its own subprocess so peak RSS is attributable to it.
+Each child loads the model, warms it up on the first fixture, then
+transcribes every fixture and reports:
+
+- load time and RSS after loading,
+- real-time factor (inference seconds / audio seconds; lower is faster),
+- peak RSS over the run.
+
+The fixtures are the files passed with --audio (use real voice notes for
+representative numbers), or else synthetic 16 kHz WAV clips of 10/30/60 s.
+Engines whose library is missing are reported as unavailable.
+
+    python benchmarks/engine_bench.py [--engines whisper,faster-whisper] [--size base]
+        [--threads 4] [--compute-type int8] [--audio note1.ogg note2.ogg]
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from factory.audio_preprocess import SAMPLE_RATE, decode_audio  # noqa: E402
+from factory.transcription_engines import create_engine  # noqa: E402
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / 1024 / (1024 if platform.system() == "Darwin" else 1), 1)
+
+
+def synthetic_fixtures(directory: str) -> list:
+    import numpy as np
+
+    rng = np.random.default_rng(3)
+    paths = []
+    for seconds in (10, 30, 60):
+        t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+        envelope = (np.sin(2 * np.pi * 0.3 * t) > -0.3) * (0.5 + 0.5 * np.sin(2 * np.pi * 4 * t))
+        audio = 0.25 * envelope * (np.sin(2 * np.pi * 180 * t) + 0.3 * rng.standard_normal(len(t)))
+        path = os.path.join(directory, f"fixture_{seconds}s.wav")
+        with wave.open(path, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(SAMPLE_RATE)
+            w.writeframes((np.clip(audio, -1, 1) * 32767).astype("<i2").tobytes())
+        paths.append(path)
+    return paths
+
+
+def run_child(args) -> dict:
+    """Measure one engine in this process"""
+    settings = {"cpu_threads": args.threads}
+    if args.engine != "whisper":
+        settings["compute_type"] = args.compute_type
+    engine = create_engine(args.engine, settings)
+    try:
+        started = time.perf_counter()
+        model = engine.load(args.size)
+    except ImportError as e:
+        return {"engine": args.engine, "available": False, "error": str(e)}
+    load_seconds = time.perf_counter() - started
+    rss_loaded = peak_rss_mb()
+
+    fixtures = [(path, decode_audio(path, engine.decode)) for path in args.audio]
+    model.transcribe(fixtures[0][1], language=args.language)  # warm-up
+
+    audio_seconds = inference_seconds = 0.0
+    per_fixture = []
+    for path, audio in fixtures:
+        clock = time.perf_counter()
+        result = model.transcribe(audio, language=args.language)
+        elapsed = time.perf_counter() - clock
+        seconds = len(audio) / SAMPLE_RATE
+        audio_seconds += seconds
+        inference_seconds += elapsed
+        per_fixture.append({
+            "fixture": os.path.basename(path),
+            "audio_seconds": round(seconds, 2),
+            "rtf": round(elapsed / seconds, 4),
+            "text": result["text"].strip()[:60],
+        })
+    return {
+        "engine": engine.name,
+        "available": True,
+        "settings": engine.describe(),
+        "load_seconds": round(load_seconds, 2),
+        "rss_loaded_mb": rss_loaded,
+        "peak_rss_mb": peak_rss_mb(),
+        "rtf": round(inference_seconds / audio_seconds, 4),
+        "fixtures": per_fixture,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", default="whisper,faster-whisper")
+    parser.add_argument("--size", default="base")
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--language", default="es")
+    parser.add_argument("--audio", nargs="*", default=[])
+    parser.add_argument("--engine", help=argparse.SUPPRESS)  # child mode
+    args = parser.parse_args()
+
+    if args.engine:
+        print(json.dumps(run_child(args)))
+        return
+
+    workdir = tempfile.mkdtemp(prefix="engine-bench-")
+    fixtures = args.audio or synthetic_fixtures(workdir)
+    reports = []
+    for engine in args.engines.split(","):
+        command = [
+            sys.executable, __file__, "--engine", engine, "--size", args.size, "--threads", str(args.threads),
+            "--compute-type", args.compute_type, "--language", args.language, "--audio", *fixtures,
+        ]
+        child = subprocess.run(command, capture_output=True, text=True)
+        try:
+            reports.append(json.loads(child.stdout.strip().splitlines()[-1]))
+        except (IndexError, ValueError):
+            reports.append({"engine": engine, "available": False, "error": child.stderr.strip()[-300:]})
+    for path in fixtures:
+        if path.startswith(workdir):
+            os.unlink(path)
+    os.rmdir(workdir)
+
+    print(f"model size {args.size}, {args.threads} threads, {len(fixtures)} fixtures")
+    for report in reports:
+        if not report["available"]:
+            print(f"{report['engine']:16} unavailable: {report['error']}")
+            continue
+        print(
+            f"{report['engine']:16} rtf {report['rtf']:7.4f}  load {report['load_seconds']:6.2f} s  "
+            f"rss loaded {report['rss_loaded_mb']:7.1f} MB  peak {report['peak_rss_mb']:7.1f} MB"
+        )
+        for fixture in report["fixtures"]:
+            print(f"    {fixture['fixture']:24} {fixture['audio_seconds']:6.1f} s  rtf {fixture['rtf']:.4f}  {fixture['text']!r}")
+
+
+if __name__ == "__main__":
+    main()
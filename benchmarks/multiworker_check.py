@@ -0,0 +1,195 @@
+"""Concurrency check for multi-worker mode: no lost writes, shared sessions and limits.
+
+Starts `uvicorn main:app --workers N` in a scratch directory and drives it over
+HTTP:
+
+1. Parallel creates interleaved with parallel deletes of the new agents; every
+   worker must then list exactly the expected set of ids.
+2. The search index of every worker must reflect the same set.
+3. A session created by one worker must validate on all of them.
+4. A shared rate limit must admit exactly `limit` requests across workers.
+
+    python benchmarks/multiworker_check.py [--workers 4] [--creates 400]
+
+Exits with status 1 if any check fails.
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+WEBHOOK_LIMIT = 30
+MARKER = "Multiworkercheck"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workdir: Path, workers: int, port: int) -> subprocess.Popen:
+    for name in ("static", "templates"):
+        shutil.copytree(ROOT / name, workdir / name)
+    shutil.copy(ROOT / "empleaidos.json", workdir / "empleaidos.json")
+    env = dict(
+        os.environ,
+        EMPLEAIDO_WORKERS=str(workers),
+        WHISPER_WORKERS="0",
+        RATE_LIMITS=(
+            f"create_empleaido=100000,delete_empleaido=100000,get_empleaidos=100000,"
+            f"search_empleaidos=100000,whatsapp_webhook={WEBHOOK_LIMIT}"
+        ),
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", str(ROOT),
+         "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=workdir,
+        env=env,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, workers: int, timeout: float = 60):
+    """Wait until health answers from every worker process"""
+    deadline = time.monotonic() + timeout
+    pids = set()
+    while time.monotonic() < deadline:
+        try:
+            response = await client.get("/api/health")
+            pids.add(response.json()["worker"]["pid"])
+            if len(pids) >= workers:
+                return pids
+        except (httpx.HTTPError, KeyError, ValueError):
+            await asyncio.sleep(0.2)
+    return pids
+
+
+async def list_ids(client: httpx.AsyncClient) -> set:
+    response = await client.get("/api/empleaidos", params={"fields": "id"})
+    response.raise_for_status()
+    return {record["id"] for record in response.json()}
+
+
+async def run_checks(client: httpx.AsyncClient, workers: int, creates: int, concurrency: int) -> list:
+    failures = []
+    baseline = await list_ids(client)
+    semaphore = asyncio.Semaphore(concurrency)
+    created, deleted = [], []
+
+    async def create(i: int):
+        async with semaphore:
+            response = await client.post("/api/empleaidos", json={
+                "name": f"{MARKER} {i}",
+                "role": "Checker",
+                "specialty": "Concurrency",
+                "sefirot_activation": ["Hod"],
+                "skills": [MARKER],
+            })
+            response.raise_for_status()
+            empleaido_id = response.json()["id"]
+            created.append(empleaido_id)
+            # Delete every other agent right away, racing the remaining creates
+            if i % 2 == 0:
+                response = await client.delete(f"/api/empleaidos/{empleaido_id}")
+                response.raise_for_status()
+                deleted.append(empleaido_id)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(create(i) for i in range(creates)))
+    elapsed = time.perf_counter() - started
+    print(f"{creates} creates + {len(deleted)} deletes in {elapsed:.2f} s ({(creates + len(deleted)) / elapsed:.0f} writes/s)")
+
+    expected = baseline | (set(created) - set(deleted))
+    for attempt in range(workers * 4):
+        seen = await list_ids(client)
+        if seen != expected:
+            failures.append(
+                f"listing #{attempt}: {len(expected - seen)} missing, {len(seen - expected)} unexpected"
+            )
+            break
+    else:
+        print(f"listing: all {workers * 4} reads saw exactly {len(expected)} agents")
+
+    want = creates - len(deleted)
+    counts = set()
+    for _ in range(workers * 4):
+        response = await client.get("/api/empleaidos/search", params={"q": f"skills:{MARKER}", "limit": 0})
+        counts.add(response.json()["count"])
+    if counts != {want}:
+        failures.append(f"search counts across workers {sorted(counts)}, expected {want}")
+    else:
+        print(f"search: every worker counts {want} matching agents")
+
+    first = await client.get("/")
+    cookies = dict(first.cookies)
+    authenticated = 0
+    for _ in range(workers * 4):
+        # Authenticated sessions get an ETag; a new session would get a Set-Cookie instead
+        response = await client.get("/", cookies=cookies)
+        if "etag" in response.headers and "set-cookie" not in response.headers:
+            authenticated += 1
+    if authenticated != workers * 4:
+        failures.append(f"sessions: only {authenticated}/{workers * 4} requests recognised the session")
+    else:
+        print("sessions: one session validated on every request")
+
+    statuses = await asyncio.gather(*(
+        client.post("/api/whatsapp/webhook", json={"from": "+1", "message_type": "text", "message_id": str(i)})
+        for i in range(WEBHOOK_LIMIT * 2)
+    ))
+    allowed = sum(1 for response in statuses if response.status_code == 200)
+    if allowed != WEBHOOK_LIMIT:
+        failures.append(f"rate limit: {allowed} of {WEBHOOK_LIMIT * 2} allowed, expected {WEBHOOK_LIMIT}")
+    else:
+        print(f"rate limit: exactly {WEBHOOK_LIMIT} of {WEBHOOK_LIMIT * 2} requests admitted across workers")
+    return failures
+
+
+async def main_async(args) -> int:
+    workdir = Path(tempfile.mkdtemp(prefix="empleaido-workers-"))
+    port = free_port()
+    server = start_server(workdir, args.workers, port)
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency * 2)
+        # A fresh connection per request spreads requests over the workers sharing the socket
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", timeout=60, limits=limits, headers={"Connection": "close"}
+        ) as client:
+            pids = await wait_ready(client, args.workers)
+            print(f"{len(pids)} worker processes answering: {sorted(pids)}")
+            if len(pids) < args.workers:
+                print("warning: not every worker answered a health check")
+            failures = await run_checks(client, args.workers, args.creates, args.concurrency)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if failures:
+        print("FAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("OK: no lost writes, shared sessions and rate limits")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--creates", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    sys.exit(asyncio.run(main_async(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
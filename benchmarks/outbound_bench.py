@@ -0,0 +1,187 @@
+"""Benchmark: outbound WhatsApp reply delivery against a local stand-in provider.
+
+Starts a stand-in provider (Meta Cloud API text-message shape) on 127.0.0.1
+that answers after `--latency` seconds and rejects a share of requests with
+503 or 429 + Retry-After. Queues `--replies` transcriptions of mixed length
+(up to several WhatsApp messages each) for `--recipients` recipients through
+WhatsAppOutbox and checks that:
+
+- every reply is delivered, each part received exactly once,
+- parts arrive in order per recipient and respect the 4096-char limit,
+- rejoined parts reproduce the original text,
+- consecutive messages to one recipient are at least `--interval` apart.
+
+Reports throughput, retries and queue-to-delivered latency.
+
+    python benchmarks/outbound_bench.py [--replies 200] [--recipients 40] [--workers 8]
+        [--interval 0.05] [--latency 0.01] [--fail-rate 0.1]
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from factory.whatsapp_outbox import REPLY_DELIVERED, WhatsAppOutbox  # noqa: E402
+
+WORDS = "hola gracias mañana reunión cliente factura pedido envío semana precio equipo llamada".split()
+
+
+class StandInProvider(ThreadingHTTPServer):
+    """Accepts POST /messages; records accepted messages per recipient"""
+
+    daemon_threads = True
+
+    def __init__(self, latency: float, fail_rate: float, seed: int = 5):
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.received = defaultdict(list)  # recipient -> [(arrived, body)]
+        self.rejected = 0
+        self.sequence = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1/messages"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        arrived = time.monotonic()
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        time.sleep(server.latency)
+        with server.lock:
+            roll = server.rng.random()
+            if roll < server.fail_rate:
+                server.rejected += 1
+                if roll < server.fail_rate / 2:
+                    self._reply(429, {"error": "rate limited"}, {"Retry-After": "0.05"})
+                else:
+                    self._reply(503, {"error": "unavailable"})
+                return
+            server.sequence += 1
+            server.received[payload["to"]].append((arrived, payload["text"]["body"]))
+            message_id = f"wamid.standin.{server.sequence}"
+        self._reply(200, {"messages": [{"id": message_id}]})
+
+    def _reply(self, status: int, body: dict, headers: dict = None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def transcription(rng: random.Random) -> str:
+    """Spanish-ish sentences, 50 to ~10000 chars"""
+    sentences = []
+    for _ in range(rng.choice([1, 3, 10, 60, 150])):
+        words = rng.choices(WORDS, k=rng.randint(4, 14))
+        sentences.append(" ".join(words).capitalize() + rng.choice([".", ".", "?", "!"]))
+    return " ".join(sentences)
+
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+
+
+async def run(args, provider: StandInProvider) -> int:
+    outbox = WhatsAppOutbox(
+        provider.url, token="bench", workers=args.workers, min_interval=args.interval,
+        max_attempts=8, backoff_base=0.02, backoff_max=0.5, max_queue=args.replies,
+    )
+    rng = random.Random(11)
+    recipients = [f"1809555{i:04d}" for i in range(args.recipients)]
+    texts, replies = {}, []
+    started = time.perf_counter()
+    for i in range(args.replies):
+        recipient = rng.choice(recipients)
+        text = transcription(rng)
+        reply = outbox.enqueue(recipient, text, reply_to=f"wamid.in.{i}")
+        texts[reply.id] = text
+        replies.append(reply)
+    drained = await outbox.drain(args.timeout)
+    elapsed = time.perf_counter() - started
+    stats = outbox.stats()
+    await outbox.aclose()
+
+    problems = []
+    if not drained:
+        problems.append(f"{stats['pending']} replies still pending after {args.timeout} s")
+    expected = defaultdict(list)
+    for reply in replies:
+        if reply.status != REPLY_DELIVERED:
+            problems.append(f"reply {reply.id} {reply.status}: {reply.error}")
+        if " ".join(reply.parts).split() != texts[reply.id].split():
+            problems.append(f"reply {reply.id} parts do not rejoin to the original text")
+        if any(len(part) > outbox.max_chars for part in reply.parts):
+            problems.append(f"reply {reply.id} has a part over {outbox.max_chars} chars")
+        expected[reply.recipient].extend(reply.parts)
+    gaps = []
+    for recipient, parts in expected.items():
+        received = provider.received.get(recipient, [])
+        if [body for _, body in received] != parts:
+            problems.append(f"{recipient}: received {len(received)} parts, expected {len(parts)} in order")
+        gaps.extend(b[0] - a[0] for a, b in zip(received, received[1:]))
+    # Arrival spacing: the next send waits `interval` after the previous response
+    too_close = sum(1 for gap in gaps if gap < args.interval * 0.95)
+    if too_close:
+        problems.append(f"{too_close} consecutive messages closer than {args.interval} s")
+
+    latencies = [reply.finished_at - reply.queued_at for reply in replies if reply.finished_at]
+    parts = sum(len(reply.parts) for reply in replies)
+    multi = sum(1 for reply in replies if len(reply.parts) > 1)
+    print(f"{args.replies} replies ({multi} multi-part, {parts} parts) to {args.recipients} recipients, "
+          f"{args.workers} workers, interval {args.interval} s, provider latency {args.latency} s, "
+          f"fail rate {args.fail_rate}")
+    print(f"elapsed    {elapsed:8.2f} s  ({parts / elapsed:.1f} parts/s)")
+    print(f"provider   {provider.rejected} rejected (429/503), {stats['retries']} retries, "
+          f"{stats['parts_sent']} parts accepted")
+    print(f"latency    p50 {percentile(latencies, 0.5):.2f} s  p95 {percentile(latencies, 0.95):.2f} s  "
+          f"max {max(latencies or [0]):.2f} s (queued -> delivered)")
+    print(f"spacing    min gap {min(gaps or [0]):.3f} s between messages to one recipient")
+    for problem in problems[:20]:
+        print(f"FAIL {problem}")
+    return 1 if problems else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--replies", type=int, default=200)
+    parser.add_argument("--recipients", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--interval", type=float, default=0.05, help="min seconds between messages to one recipient")
+    parser.add_argument("--latency", type=float, default=0.01, help="stand-in provider response time")
+    parser.add_argument("--fail-rate", type=float, default=0.1, help="share of requests answered 429/503")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    provider = StandInProvider(args.latency, args.fail_rate)
+    threading.Thread(target=provider.serve_forever, daemon=True).start()
+    try:
+        code = asyncio.run(run(args, provider))
+    finally:
+        provider.shutdown()
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
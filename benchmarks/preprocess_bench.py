@@ -0,0 +1,125 @@
+"""Benchmark: decode + silence trimming in front of Whisper.
+
+Synthesises WhatsApp-style voice notes (speech-like bursts separated by
+pauses of 0.2-4 s over a faint noise floor), then reports per note the
+decode and VAD cost, the audio seconds removed and the inference time saved.
+Inference is a stub whose cost is linear in audio length (`--rtf`), or a
+real Whisper model with `--model base` when openai-whisper is installed.
+Remapped segment timestamps are checked to land on speech in the original.
+
+    python benchmarks/preprocess_bench.py [--notes 20] [--rtf 0.1] [--model base]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from factory.audio_preprocess import SAMPLE_RATE, preprocess  # noqa: E402
+
+
+class LinearCostModel:
+    """Stand-in model: sleeps `rtf` seconds per audio second, one segment per second"""
+
+    def __init__(self, rtf: float):
+        self.rtf = rtf
+
+    def transcribe(self, audio, **options):
+        seconds = len(audio) / SAMPLE_RATE
+        time.sleep(self.rtf * seconds)
+        segments = [{"start": float(t), "end": float(min(seconds, t + 1)), "text": " x"} for t in range(int(seconds))]
+        return {"text": " x" * len(segments), "language": "es", "segments": segments}
+
+
+def voice_note(rng: np.random.Generator, seconds: float):
+    """Return (float32 audio, [(burst_start, burst_end)])"""
+    audio = (rng.standard_normal(int(seconds * SAMPLE_RATE)) * 0.002).astype(np.float32)
+    bursts, t = [], rng.uniform(0.2, 1.5)
+    while t < seconds - 1:
+        length = min(rng.uniform(0.8, 4.0), seconds - t)
+        n = int(length * SAMPLE_RATE)
+        tt = np.arange(n) / SAMPLE_RATE
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * tt)  # syllable-rate modulation
+        carrier = np.sin(2 * np.pi * rng.uniform(120, 240) * tt) + 0.3 * rng.standard_normal(n)
+        start = int(t * SAMPLE_RATE)
+        audio[start:start + n] += (0.25 * envelope * carrier).astype(np.float32)
+        bursts.append((t, t + length))
+        t += length + rng.choice([rng.uniform(0.2, 0.5), rng.uniform(1.0, 4.0)])
+    return np.clip(audio, -1, 1), bursts
+
+
+def write_wav(audio, path: str):
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes((audio * 32767).astype("<i2").tobytes())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=60.0, help="length of each note")
+    parser.add_argument("--rtf", type=float, default=0.1, help="stub inference seconds per audio second")
+    parser.add_argument("--model", help="real Whisper model size instead of the stub")
+    args = parser.parse_args()
+
+    if args.model:
+        import whisper
+        model = whisper.load_model(args.model)
+    else:
+        model = LinearCostModel(args.rtf)
+
+    rng = np.random.default_rng(7)
+    totals = dict(audio=0.0, speech=0.0, decode=0.0, vad=0.0, full=0.0, trimmed=0.0)
+    misplaced = 0
+    workdir = tempfile.mkdtemp(prefix="preprocess-bench-")
+    for i in range(args.notes):
+        audio, bursts = voice_note(rng, args.seconds)
+        path = os.path.join(workdir, f"note{i}.wav")
+        write_wav(audio, path)
+
+        prepared = preprocess(path, vad={})
+        clock = time.perf_counter()
+        model.transcribe(preprocess(path).audio)
+        full = time.perf_counter() - clock
+        clock = time.perf_counter()
+        result = prepared.time_map.remap(model.transcribe(prepared.audio))
+        trimmed = time.perf_counter() - clock
+
+        # Kept audio is speech or a pause shorter than the VAD's minimum silence
+        for segment in result["segments"]:
+            if not any(start - 0.5 <= segment["start"] <= end + 0.5 for start, end in bursts):
+                misplaced += 1
+
+        report = prepared.report
+        totals["audio"] += report["audio_seconds"]
+        totals["speech"] += report["speech_seconds"]
+        totals["decode"] += report["decode_seconds"]
+        totals["vad"] += report["vad_seconds"]
+        totals["full"] += full
+        totals["trimmed"] += trimmed
+        os.unlink(path)
+    os.rmdir(workdir)
+
+    saved = totals["audio"] - totals["speech"]
+    print(f"{args.notes} notes x {args.seconds:.0f} s, model: {args.model or f'stub rtf={args.rtf}'}")
+    print(f"audio      {totals['audio']:9.1f} s decoded, {totals['speech']:.1f} s kept "
+          f"({saved:.1f} s / {100 * saved / totals['audio']:.1f}% trimmed)")
+    print(f"decode     {1000 * totals['decode'] / args.notes:9.2f} ms per note")
+    print(f"vad        {1000 * totals['vad'] / args.notes:9.2f} ms per note")
+    print(f"inference  {totals['full']:9.2f} s untrimmed, {totals['trimmed']:.2f} s trimmed "
+          f"({totals['full'] - totals['trimmed']:.2f} s / {100 * (1 - totals['trimmed'] / totals['full']):.1f}% saved)")
+    print(f"timestamps {misplaced} remapped segments away from any speech burst")
+    sys.exit(1 if misplaced else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Microbenchmark: rate limiter cost per check and memory at 100k clients.
+
+Compares the sliding-window counter against the previous list-of-timestamps
+tracker.
+
+    python benchmarks/rate_limit_bench.py [clients] [requests_per_client]
+"""
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from factory.rate_limit import SlidingWindowRateLimiter  # noqa: E402
+
+
+def legacy_check(tracker: dict, ip: str, endpoint: str, now: float, limit: int = 60) -> bool:
+    """The list-based check_rate_limit() this limiter replaced"""
+    key = f"{ip}:{endpoint}"
+    minute_ago = now - 60
+    if key in tracker:
+        tracker[key] = [ts for ts in tracker[key] if ts > minute_ago]
+    if len(tracker.get(key, [])) >= limit:
+        return False
+    tracker.setdefault(key, []).append(now)
+    return True
+
+
+def drive(check, ips, per_client: int):
+    start_time = 1_700_000_000.0
+    for round_ in range(per_client):
+        now = start_time + round_
+        for ip in ips:
+            check(ip, "get_empleaidos", now)
+
+
+def run(name: str, make_check, clients: int, per_client: int):
+    """Time a pass without tracing, then measure retained memory on a fresh instance"""
+    ips = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(clients)]
+    checks = clients * per_client
+
+    started = time.perf_counter()
+    drive(make_check(), ips, per_client)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    check = make_check()
+    drive(check, ips, per_client)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    retained = current - baseline
+
+    print(
+        f"{name:<16} {checks:>9} checks  {elapsed / checks * 1e9:6.0f} ns/check  "
+        f"retained {retained / 1024 / 1024:7.1f} MB  ({retained / clients:5.0f} B/client)"
+    )
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    per_client = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+
+    def sliding_window():
+        limiter = SlidingWindowRateLimiter(default_limit=60, window_seconds=60, max_keys=clients * 2)
+        return limiter.check
+
+    def legacy():
+        tracker = {}
+        return lambda ip, endpoint, now: legacy_check(tracker, ip, endpoint, now)
+
+    print(f"{clients} clients x {per_client} requests each (one per simulated second)")
+    run("sliding-window", sliding_window, clients, per_client)
+    run("legacy lists", legacy, clients, per_client)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Microbenchmark: inverted-index query latency at 50k empleaidos.
+
+    python benchmarks/search_bench.py [agents] [queries_per_pattern]
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from factory.search_index import SearchIndex  # noqa: E402
+
+SEFIROT = ["Keter", "Chochmah", "Binah", "Chesed", "Gevurah", "Tiferet", "Netzach", "Hod", "Yesod", "Malkuth"]
+SKILLS = [f"{verb} {noun}" for verb in ("Whisper", "Audio", "Data", "Legal", "Sales", "Tax", "Design", "Support")
+          for noun in ("Transcription", "Analysis", "Review", "Automation", "Reporting", "Outreach")]
+QUERIES = [
+    "skills:whisper AND sefirot:hod",
+    "whisper transcription hod",
+    "sefirot:hod OR sefirot:yesod",
+    "trans* AND sefirot:keter",
+    "role:analyst OR specialty:tax*",
+]
+
+
+def fleet(agents: int):
+    rng = random.Random(7)
+    return [
+        {
+            "id": f"{i:08x}",
+            "name": f"Agent{i}",
+            "role": rng.choice(["Analyst", "Assistant", "Consultant", "Engineer"]) + f" {i % 97}",
+            "specialty": " ".join(rng.sample(["tax", "audio", "legal", "support", "growth", "retail"], 2)),
+            "sefirot_activation": rng.sample(SEFIROT, 3),
+            "skills": rng.sample(SKILLS, 4),
+        }
+        for i in range(agents)
+    ]
+
+
+def main():
+    agents = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    records = fleet(agents)
+
+    index = SearchIndex()
+    started = time.perf_counter()
+    index.rebuild(records)
+    print(f"indexed {agents} agents in {time.perf_counter() - started:.2f} s  {index.stats()['tokens']}")
+
+    for query in QUERIES:
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            count, _ = index.search(query, limit=50)
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        p50, p99 = timings[len(timings) // 2], timings[int(len(timings) * 0.99)]
+        print(f"{query:<34} {count:>6} hits  p50 {p50 * 1e3:6.3f} ms  p99 {p99 * 1e3:6.3f} ms")
+
+    started = time.perf_counter()
+    for record in records[:1000]:
+        index.put(dict(record, skills=record["skills"][:2] + ["Fresh Skill"]))
+    print(f"incremental update: {(time.perf_counter() - started) / 1000 * 1e6:.1f} us/record")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Microbenchmark: skill.md/index.md rendering for a synthetic fleet.
+
+Compares the original f-string generator against the compiled templates,
+cold (first render) and memoized (unchanged records re-rendered).
+
+    python benchmarks/skill_render_bench.py [agents]
+"""
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from factory.skill_render import SEFIROT_CONTEXT, SkillRenderer  # noqa: E402
+
+
+def sanitize(value: str, max_length: int = 100) -> str:
+    return "".join(c for c in value if c.isprintable())[:max_length].strip()
+
+
+def legacy_skill_md(empleaido: dict) -> str:
+    """Condensed f-string generator the templates replaced (same work per call)"""
+    sefirot = "\n        ".join(
+        f"- **{s}**: {SEFIROT_CONTEXT.get(s, 'Sefirotic activation')}" for s in empleaido["sefirot_activation"]
+    )
+    skills = "\n        ".join(f"- {s}" for s in empleaido["skills"])
+    name = sanitize(empleaido["name"], 50)
+    role = sanitize(empleaido["role"], 100)
+    specialty = sanitize(empleaido["specialty"], 200)
+    return (
+        f"---\nname: {name.lower()}\ndescription: {role} - {specialty}\n---\n# {name.upper()}\n"
+        f"{sefirot}\n{skills}\n{', '.join(empleaido['skills'])}\n{empleaido['status'].upper()}\n"
+        f"{empleaido['created_at']}\n{empleaido['id']}\n"
+    )
+
+
+def fleet(agents: int):
+    sefirot = list(SEFIROT_CONTEXT)
+    return [
+        {
+            "id": f"{i:08x}",
+            "name": f"Agent{i}",
+            "role": f"Role {i % 37}",
+            "specialty": f"Specialty {i % 101}",
+            "sefirot_activation": sefirot[i % 7:i % 7 + 3],
+            "skills": [f"skill-{(i + k) % 50}" for k in range(4)],
+            "status": "active",
+            "created_at": "2026-01-01T00:00:00",
+            "deployed": False,
+        }
+        for i in range(agents)
+    ]
+
+
+def timed(name: str, render, records):
+    started = time.perf_counter()
+    for record in records:
+        render(record)
+    elapsed = time.perf_counter() - started
+    print(f"{name:<22} {len(records):>7} renders  {elapsed / len(records) * 1e6:8.1f} us/render  {elapsed:6.2f} s")
+
+
+def main():
+    agents = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    records = fleet(agents)
+    renderer = SkillRenderer(ROOT / "templates" / "skills", sanitize=sanitize, max_entries=agents * 2)
+
+    print(f"{agents} synthetic agents")
+    timed("f-string (legacy)", legacy_skill_md, records)
+    timed("template, cold", renderer.skill_md, records)
+    timed("template, memoized", renderer.skill_md, records)
+    print(renderer.stats())
+
+
+if __name__ == "__main__":
+    main()
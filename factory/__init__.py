@@ -0,0 +1 @@
+"""Runtime subsystems for the Empleaido Factory API (main.py)"""
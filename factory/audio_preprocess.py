@@ -0,0 +1,138 @@
+"""Decode once, trim silence, hand Whisper a 16 kHz float32 array.
+
+`decode_audio()` reads 16 kHz mono 16-bit WAV (our own chunk files and most
+test uploads) directly and hands anything else to the transcription engine's
+decoder (ffmpeg for openai-whisper, PyAV for faster-whisper).
+`trim_silence()` is an energy voice-activity detector: frames more than
+`threshold_db` below the loud (95th percentile) level are silence, and every
+silent run longer than `min_silence_seconds` is cut down to `padding_seconds`
+on each side. The returned `TimeMap` translates timestamps of the trimmed
+audio back onto the original recording.
+"""
+import bisect
+import time
+import wave
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+from factory.transcription_engines import SAMPLE_RATE, WhisperEngine
+
+
+class TimeMap:
+    """Piecewise offset from trimmed-audio time to original-audio time"""
+
+    def __init__(self, spans: List[Tuple[float, float]]):
+        # (trimmed_start, original_start) of each kept span, ascending
+        self.spans = spans or [(0.0, 0.0)]
+        self._starts = [trimmed for trimmed, _ in self.spans]
+
+    def original(self, seconds: float) -> float:
+        i = max(0, bisect.bisect_right(self._starts, seconds) - 1)
+        trimmed, original = self.spans[i]
+        return round(original + seconds - trimmed, 3)
+
+    def remap(self, result: dict) -> dict:
+        """Copy of a Whisper result with segment timestamps on the original timeline"""
+        segments = [
+            dict(segment, start=self.original(segment.get("start", 0.0)), end=self.original(segment.get("end", 0.0)))
+            for segment in result.get("segments", [])
+        ]
+        return dict(result, segments=segments)
+
+
+class Preprocessed(NamedTuple):
+    audio: object  # float32 numpy array, 16 kHz mono
+    time_map: TimeMap
+    report: dict
+
+
+def decode_audio(path: str, decoder: Optional[Callable[[str], object]] = None):
+    """Decode to 16 kHz mono float32 (numpy array); `decoder` is the engine's, openai-whisper's by default"""
+    import numpy as np
+
+    try:
+        with wave.open(path, "rb") as w:
+            if (w.getframerate(), w.getnchannels(), w.getsampwidth(), w.getcomptype()) == (SAMPLE_RATE, 1, 2, "NONE"):
+                pcm = np.frombuffer(w.readframes(w.getnframes()), dtype="<i2")
+                return pcm.astype(np.float32) / 32768.0
+    except (wave.Error, EOFError):
+        pass
+    if decoder is None:
+        decoder = WhisperEngine().decode
+    return decoder(path)
+
+
+def frame_energy(audio, frame_seconds: float = 0.03, sample_rate: int = SAMPLE_RATE):
+    """RMS energy per frame"""
+    import numpy as np
+
+    frame = max(1, int(frame_seconds * sample_rate))
+    count = len(audio) // frame
+    frames = audio[:count * frame].reshape(count, frame)
+    # einsum sums squares without materialising a squared copy of the recording
+    return np.sqrt(np.einsum("ij,ij->i", frames, frames) / frame)
+
+
+def trim_silence(
+    audio,
+    threshold_db: float = -35.0,
+    min_silence_seconds: float = 0.5,
+    padding_seconds: float = 0.15,
+    frame_seconds: float = 0.03,
+    floor: float = 1e-4,
+    sample_rate: int = SAMPLE_RATE,
+):
+    """Return `(trimmed_audio, time_map)`; all-silent audio trims to an empty array"""
+    import numpy as np
+
+    energy = frame_energy(audio, frame_seconds, sample_rate)
+    if len(energy) == 0:
+        return audio, TimeMap([(0.0, 0.0)])
+    threshold = max(floor, float(np.percentile(energy, 95)) * 10 ** (threshold_db / 20))
+    voiced = energy > threshold
+    if not voiced.any():
+        return audio[:0], TimeMap([(0.0, 0.0)])
+
+    frame = max(1, int(frame_seconds * sample_rate))
+    pad = int(padding_seconds * sample_rate)
+    # Silent runs as [start, end) frame ranges
+    edges = np.diff(np.concatenate(([1], voiced.astype(np.int8), [1])))
+    run_starts = np.flatnonzero(edges == -1)
+    run_ends = np.flatnonzero(edges == 1)
+
+    cuts = []
+    for start, end in zip(run_starts, run_ends):
+        cut_from = 0 if start == 0 else start * frame + pad
+        cut_to = len(audio) if end == len(voiced) else end * frame - pad
+        if (end - start) * frame_seconds >= min_silence_seconds and cut_to > cut_from:
+            cuts.append((int(cut_from), int(cut_to)))
+    if not cuts:
+        return audio, TimeMap([(0.0, 0.0)])
+
+    pieces, spans, position, kept = [], [], 0, 0
+    for cut_from, cut_to in cuts + [(len(audio), len(audio))]:
+        if cut_from > position:
+            pieces.append(audio[position:cut_from])
+            spans.append((kept / sample_rate, position / sample_rate))
+            kept += cut_from - position
+        position = cut_to
+    return np.concatenate(pieces) if pieces else audio[:0], TimeMap(spans)
+
+
+def preprocess(
+    path: str, vad: Optional[dict] = None, decoder: Optional[Callable[[str], object]] = None
+) -> Preprocessed:
+    """Decode `path` and, with `vad` settings (trim_silence kwargs), trim its silences"""
+    clock = time.perf_counter()
+    audio = decode_audio(path, decoder)
+    decoded = time.perf_counter()
+    if vad is not None:
+        trimmed, time_map = trim_silence(audio, **vad)
+    else:
+        trimmed, time_map = audio, TimeMap([(0.0, 0.0)])
+    finished = time.perf_counter()
+    return Preprocessed(trimmed, time_map, {
+        "decode_seconds": round(decoded - clock, 4),
+        "vad_seconds": round(finished - decoded, 4),
+        "audio_seconds": round(len(audio) / SAMPLE_RATE, 3),
+        "speech_seconds": round(len(trimmed) / SAMPLE_RATE, 3),
+    })
@@ -0,0 +1,162 @@
+"""Batched, non-blocking audit log writer with rotation.
+
+`log()` only appends to an in-memory queue. A background thread writes the
+queue in batches when it reaches `batch_size` entries or every
+`flush_interval` seconds, rotates the file by size or date, optionally gzips
+old segments, and flushes everything left on `close()`.
+"""
+import atexit
+import gzip
+import json
+import os
+import re
+import shutil
+import threading
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from factory.metrics import timed
+from factory.shared_state import file_lock
+
+
+class AuditLogWriter:
+    """Queue audit entries and persist them off the request path"""
+
+    def __init__(
+        self,
+        path: Path,
+        max_queue: int = 10000,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        max_bytes: int = 10 * 1024 * 1024,
+        rotate_daily: bool = True,
+        backups: int = 14,
+        compress: bool = True,
+    ):
+        self.path = Path(path)
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.backups = backups
+        self.compress = compress
+        # Outside the `audit.log.*` namespace so pruning can never remove it
+        self.lock_path = self.path.with_name(f".{self.path.name}.lock")
+        # audit.log.YYYYmmdd-HHMMSS[-N][.gz], as written by _rotate()
+        self._segment_re = re.compile(re.escape(self.path.name) + r"\.\d{8}-\d{6}(-\d+)?(\.gz)?")
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._atexit_registered = False
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.rotations = 0
+
+    def start(self):
+        if self._thread is None:
+            self._closed = False
+            self._thread = threading.Thread(target=self._run, name="audit-log", daemon=True)
+            self._thread.start()
+            if not self._atexit_registered:
+                atexit.register(self.close)
+                self._atexit_registered = True
+
+    def log(self, entry: dict) -> bool:
+        """Enqueue an entry; returns False (and counts a drop) when the queue is full"""
+        with self._cond:
+            if len(self._queue) >= self.max_queue:
+                self.dropped += 1
+                return False
+            self._queue.append(entry)
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify()
+        if self._thread is None:
+            self.start()
+        return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if len(self._queue) < self.batch_size and not self._closed:
+                    self._cond.wait(self.flush_interval)
+                batch = list(self._queue)
+                self._queue.clear()
+                closed = self._closed
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    print(f"Error writing audit log: {e}")
+            if closed:
+                return
+
+    @timed("audit_write")
+    def _write(self, batch):
+        data = "".join(json.dumps(entry) + "\n" for entry in batch)
+        # Worker processes share the file: rotate and append under one lock
+        with file_lock(self.lock_path):
+            self._maybe_rotate()
+            with open(self.path, "a") as f:
+                f.write(data)
+        self.written += len(batch)
+        self.batches += 1
+
+    # Rotation
+    def _maybe_rotate(self):
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return
+        too_big = self.max_bytes and stat.st_size >= self.max_bytes
+        new_day = (
+            self.rotate_daily
+            and datetime.fromtimestamp(stat.st_mtime).date() != datetime.now().date()
+        )
+        if too_big or new_day:
+            self._rotate(datetime.fromtimestamp(stat.st_mtime))
+
+    def _rotate(self, stamp: datetime):
+        target = self.path.with_name(f"{self.path.name}.{stamp.strftime('%Y%m%d-%H%M%S')}")
+        suffix = 1
+        while target.exists() or Path(f"{target}.gz").exists():
+            target = self.path.with_name(f"{self.path.name}.{stamp.strftime('%Y%m%d-%H%M%S')}-{suffix}")
+            suffix += 1
+        os.replace(self.path, target)
+        if self.compress:
+            with open(target, "rb") as src, gzip.open(f"{target}.gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.unlink(target)
+        self.rotations += 1
+        self._prune()
+
+    def _prune(self):
+        segments = sorted(
+            (p for p in self.path.parent.glob(f"{self.path.name}.*") if self._segment_re.fullmatch(p.name)),
+            key=lambda p: p.stat().st_mtime,
+        )
+        for old in segments[:-self.backups] if self.backups else segments:
+            old.unlink()
+
+    def close(self):
+        """Flush everything queued and stop the writer thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self._queue),
+            "max_queue": self.max_queue,
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "rotations": self.rotations,
+        }
@@ -0,0 +1,108 @@
+"""Incremental parsing of NDJSON or JSON-array request bodies.
+
+`iter_records()` consumes the body chunk by chunk and yields one record at a
+time, so an import of any size only holds the current chunk plus one
+partially received record in memory. The format is detected from the first
+non-whitespace byte: `[` means a JSON array, anything else is NDJSON.
+"""
+import codecs
+import json
+from typing import Any, AsyncIterator, Optional, Tuple
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+class ImportFormatError(ValueError):
+    """The body cannot be parsed any further"""
+
+
+async def iter_records(
+    chunks: AsyncIterator[bytes],
+    max_record_bytes: int = 64 * 1024,
+) -> AsyncIterator[Tuple[int, Optional[Any], Optional[str]]]:
+    """Yield `(number, record, error)` per line (NDJSON) or array element.
+
+    A malformed NDJSON line is reported and skipped; a malformed JSON array
+    cannot be resynchronised, so it raises ImportFormatError instead.
+    """
+    text = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buffer = ""
+    mode = None  # "ndjson" | "array"
+    number = 0
+    pos = 0
+    array_done = False
+    need_comma = False
+
+    async for chunk in _with_eof(chunks):
+        eof = chunk is None
+        buffer += text.decode(b"", final=True) if eof else text.decode(chunk)
+
+        if mode is None:
+            stripped = buffer.lstrip(_WHITESPACE)
+            if not stripped:
+                if eof:
+                    return
+                continue
+            if stripped[0] == "[":
+                mode = "array"
+                pos = len(buffer) - len(stripped) + 1
+            else:
+                mode = "ndjson"
+
+        if mode == "ndjson":
+            lines = buffer.split("\n")
+            buffer = "" if eof else lines.pop()
+            for line in lines:
+                number += 1
+                if not line.strip():
+                    continue
+                try:
+                    yield number, json.loads(line), None
+                except ValueError as e:
+                    yield number, None, f"Invalid JSON: {e}"
+            if len(buffer) > max_record_bytes:
+                raise ImportFormatError(f"Line {number + 1} exceeds {max_record_bytes} bytes")
+            continue
+
+        # JSON array: decode complete elements, keep the unfinished tail
+        while not array_done:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == "]":
+                array_done = True
+                pos += 1
+                break
+            if need_comma:
+                if buffer[pos] != ",":
+                    raise ImportFormatError(f"Expected ',' or ']' after element {number}")
+                need_comma = False
+                pos += 1
+                continue
+            try:
+                record, end = _decoder.raw_decode(buffer, pos)
+            except ValueError as e:
+                if eof:
+                    raise ImportFormatError(f"Invalid JSON in element {number + 1}: {e}")
+                if len(buffer) - pos > max_record_bytes:
+                    raise ImportFormatError(f"Element {number + 1} exceeds {max_record_bytes} bytes")
+                break  # element not fully received yet
+            number += 1
+            need_comma = True
+            pos = end
+            yield number, record, None
+
+        buffer, pos = buffer[pos:], 0
+        if eof and not array_done:
+            raise ImportFormatError("Unterminated JSON array")
+        if array_done and buffer.strip(_WHITESPACE):
+            raise ImportFormatError("Unexpected data after JSON array")
+
+
+async def _with_eof(chunks: AsyncIterator[bytes]) -> AsyncIterator[Optional[bytes]]:
+    async for chunk in chunks:
+        if chunk:
+            yield chunk
+    yield None
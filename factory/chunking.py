@@ -0,0 +1,144 @@
+"""Split long audio at silences and transcribe the pieces in parallel.
+
+The recording is decoded once to 16 kHz mono. Cut points are placed at the
+quietest frame near every `chunk_seconds`, and each chunk is extended by
+`overlap_seconds` on both sides so words at a cut are heard in full by one of
+the neighbours. Chunks are transcribed as independent jobs on the worker
+pool; each one keeps only the segments whose midpoint falls inside the span
+it owns, with timestamps shifted back onto the original timeline.
+"""
+import asyncio
+import os
+import tempfile
+import wave
+from collections import Counter
+from typing import AsyncIterator, List, NamedTuple, Optional, Tuple
+
+from factory.audio_preprocess import SAMPLE_RATE, frame_energy
+
+
+class AudioChunk(NamedTuple):
+    index: int
+    start: float  # seconds, including overlap
+    end: float
+    keep_from: float  # span whose segments this chunk contributes
+    keep_until: float
+
+
+def plan_chunks(
+    audio,
+    chunk_seconds: float = 30.0,
+    search_seconds: float = 5.0,
+    overlap_seconds: float = 1.0,
+    frame_seconds: float = 0.03,
+    sample_rate: int = SAMPLE_RATE,
+) -> List[AudioChunk]:
+    """Cut near every `chunk_seconds` at the quietest frame within +/- `search_seconds`"""
+    total = len(audio) / sample_rate
+    if total <= chunk_seconds + search_seconds:
+        return [AudioChunk(0, 0.0, total, 0.0, total)]
+
+    energy = frame_energy(audio, frame_seconds, sample_rate)
+    cuts = [0.0]
+    while total - cuts[-1] > chunk_seconds + search_seconds:
+        target = cuts[-1] + chunk_seconds
+        first = int((target - search_seconds) / frame_seconds)
+        last = min(len(energy), int((target + search_seconds) / frame_seconds) + 1)
+        quietest = first + int(energy[first:last].argmin())
+        cuts.append(round((quietest + 0.5) * frame_seconds, 3))
+    cuts.append(total)
+
+    return [
+        AudioChunk(
+            index=i,
+            start=round(max(0.0, cuts[i] - overlap_seconds), 3),
+            end=round(min(total, cuts[i + 1] + overlap_seconds), 3),
+            keep_from=cuts[i],
+            keep_until=cuts[i + 1],
+        )
+        for i in range(len(cuts) - 1)
+    ]
+
+
+def write_chunk(audio, chunk: AudioChunk, directory: Optional[str] = None, sample_rate: int = SAMPLE_RATE) -> str:
+    """Write the chunk as 16-bit PCM WAV and return its path"""
+    import numpy as np
+
+    samples = audio[int(chunk.start * sample_rate):int(chunk.end * sample_rate)]
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+    fd, path = tempfile.mkstemp(prefix=f"chunk{chunk.index:04d}-", suffix=".wav", dir=directory)
+    with os.fdopen(fd, "wb") as f, wave.open(f, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(pcm)
+    return path
+
+
+def stitch_chunk(chunk: AudioChunk, result: dict) -> List[dict]:
+    """Shift a chunk's segments onto the full timeline, keeping only those it owns"""
+    segments = []
+    for segment in result.get("segments", []):
+        start = round(segment.get("start", 0.0) + chunk.start, 3)
+        end = round(segment.get("end", 0.0) + chunk.start, 3)
+        if chunk.keep_from <= (start + end) / 2 < chunk.keep_until:
+            segments.append(dict(segment, start=start, end=end))
+    if not result.get("segments") and result.get("text", "").strip():
+        # Backends without segments: attribute the whole text to the owned span
+        segments.append({"start": chunk.keep_from, "end": chunk.keep_until, "text": result["text"]})
+    return segments
+
+
+def merge_results(parts: List[Tuple[AudioChunk, List[dict], dict]]) -> dict:
+    """Combine per-chunk outputs into one Whisper-style result"""
+    segments = []
+    for _, chunk_segments, _ in parts:
+        for segment in chunk_segments:
+            segments.append(dict(segment, id=len(segments)))
+    languages = Counter(result.get("language", "unknown") for _, _, result in parts)
+    return {
+        "text": "".join(segment.get("text", "") for segment in segments),
+        "language": languages.most_common(1)[0][0] if languages else "unknown",
+        "segments": segments,
+        "chunks": len(parts),
+    }
+
+
+async def transcribe_chunks(
+    queue,
+    audio,
+    chunks: List[AudioChunk],
+    model_size: str,
+    options: Optional[dict] = None,
+    max_in_flight: int = 1,
+) -> AsyncIterator[Tuple[AudioChunk, List[dict], dict]]:
+    """Run chunks on the job queue, yielding `(chunk, segments, result)` in order.
+
+    At most `max_in_flight` chunk files exist at once; jobs still pending
+    when the consumer stops (e.g. the client disconnected) are cancelled.
+    """
+    pending = list(chunks)
+    in_flight = []  # (chunk, job) in chunk order
+
+    def submit_next():
+        chunk = pending.pop(0)
+        path = write_chunk(audio, chunk)
+        try:
+            job = queue.submit(path, model_size, options, cleanup=True, audio_seconds=chunk.end - chunk.start)
+            in_flight.append((chunk, job))
+        except BaseException:
+            os.unlink(path)
+            raise
+
+    try:
+        while pending or in_flight:
+            while pending and len(in_flight) < max_in_flight:
+                await asyncio.to_thread(submit_next)
+            chunk, job = in_flight.pop(0)
+            job = await queue.wait(job)
+            if job.status != "done":
+                raise RuntimeError(f"Chunk {chunk.index} {job.status}: {job.error or ''}".strip())
+            yield chunk, stitch_chunk(chunk, job.result), job.result
+    finally:
+        for _, job in in_flight:
+            queue.cancel(job.id)
@@ -0,0 +1,306 @@
+"""Indexed in-memory empleaido store with an append-only journal.
+
+Records live in memory indexed by id and name. Each mutation is appended to a
+journal file; the journal is periodically compacted into an atomic snapshot
+(write temp file, then rename) in the existing `empleaidos.json` format.
+"""
+import bisect
+import json
+import os
+import secrets
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from factory.metrics import timed
+
+
+class EmpleaidoStore:
+    """O(1) lookups by id/name, O(1) amortized writes"""
+
+    def __init__(
+        self,
+        snapshot_path: Path,
+        journal_path: Optional[Path] = None,
+        compact_min_entries: int = 500,
+        fsync: bool = False,
+    ):
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = Path(journal_path) if journal_path else self.snapshot_path.with_suffix(".journal")
+        self.compact_min_entries = compact_min_entries
+        self.fsync = fsync
+        self._by_id: Dict[str, dict] = {}
+        self._by_name: Dict[str, Set[str]] = {}
+        # Insertion order for cursor pagination: parallel seq/id lists + id -> seq
+        self._order_seqs: List[int] = []
+        self._order_ids: List[str] = []
+        self._seq: Dict[str, int] = {}
+        self._next_seq = 1
+        # Bumped on every mutation; read endpoints key their caches on it.
+        # Versions restart with the process, so the epoch tells runs apart.
+        self.version = 0
+        self.epoch = secrets.token_hex(4)
+        self._journal = None
+        self._journal_entries = 0
+        self._lock = threading.RLock()
+        # Called as listener(op, record) after each put/delete, e.g. search indexes
+        self._listeners: List[Callable[[str, dict], None]] = []
+        self.load()
+
+    # Recovery
+    def load(self):
+        """Load the snapshot and replay any journal written after it"""
+        with self._lock:
+            self._close_journal()
+            self._by_id = {}
+            self._by_name = {}
+            self._order_seqs, self._order_ids, self._seq = [], [], {}
+            self._next_seq = 1
+            if self.snapshot_path.exists():
+                try:
+                    with open(self.snapshot_path, "r") as f:
+                        for record in json.load(f):
+                            self._index(record)
+                except (OSError, ValueError):
+                    pass
+
+            self._journal_entries = 0
+            if self.journal_path.exists():
+                with open(self.journal_path, "r") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            break  # torn final write from a crash
+                        self._apply(entry)
+                        self._journal_entries += 1
+
+    def _apply(self, entry: dict):
+        if entry.get("op") == "put":
+            self._index(entry["record"])
+        elif entry.get("op") == "delete":
+            self._unindex(entry["id"])
+
+    def _index(self, record: dict):
+        empleaido_id = record["id"]
+        previous = self._by_id.get(empleaido_id)
+        if previous is not None:
+            # Updates keep the record's position
+            self._unindex_name(previous)
+        else:
+            self._seq[empleaido_id] = self._next_seq
+            self._order_seqs.append(self._next_seq)
+            self._order_ids.append(empleaido_id)
+            self._next_seq += 1
+        self._by_id[empleaido_id] = record
+        self._by_name.setdefault(record["name"].lower(), set()).add(empleaido_id)
+
+    def _unindex_name(self, record: dict):
+        ids = self._by_name.get(record["name"].lower())
+        if ids:
+            ids.discard(record["id"])
+            if not ids:
+                del self._by_name[record["name"].lower()]
+
+    def _unindex(self, empleaido_id: str) -> Optional[dict]:
+        record = self._by_id.pop(empleaido_id, None)
+        if record:
+            self._unindex_name(record)
+            del self._seq[empleaido_id]
+            # Order lists keep tombstones; rebuild once they dominate
+            if len(self._order_ids) > 2 * len(self._by_id) + 64:
+                live = [(seq, i) for seq, i in zip(self._order_seqs, self._order_ids) if self._seq.get(i) == seq]
+                self._order_seqs = [seq for seq, _ in live]
+                self._order_ids = [i for _, i in live]
+        return record
+
+    # Reads (returned records are shared; copy before mutating)
+    def all(self) -> List[dict]:
+        with self._lock:
+            return list(self._by_id.values())
+
+    def get(self, empleaido_id: str) -> Optional[dict]:
+        return self._by_id.get(empleaido_id)
+
+    def find_by_name(self, name: str) -> List[dict]:
+        with self._lock:
+            return [self._by_id[i] for i in self._by_name.get(name.lower(), ())]
+
+    def query(
+        self,
+        status: Optional[str] = None,
+        deployed: Optional[bool] = None,
+        sefirot: Optional[str] = None,
+        skill: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[dict]:
+        """Filter records in insertion order"""
+        return self.page(status=status, deployed=deployed, sefirot=sefirot, skill=skill, limit=limit)[0]
+
+    def page(
+        self,
+        after: int = 0,
+        limit: Optional[int] = None,
+        status: Optional[str] = None,
+        deployed: Optional[bool] = None,
+        sefirot: Optional[str] = None,
+        skill: Optional[str] = None,
+    ) -> Tuple[List[dict], Optional[int]]:
+        """Records after cursor `after`, plus the cursor for the next page (or None)"""
+        matches = []
+        with self._lock:
+            start = bisect.bisect_right(self._order_seqs, after)
+            for position in range(start, len(self._order_ids)):
+                empleaido_id = self._order_ids[position]
+                seq = self._order_seqs[position]
+                if self._seq.get(empleaido_id) != seq:
+                    continue
+                record = self._by_id[empleaido_id]
+                if status is not None and record.get("status") != status:
+                    continue
+                if deployed is not None and bool(record.get("deployed")) != deployed:
+                    continue
+                if sefirot is not None and sefirot not in record.get("sefirot_activation", []):
+                    continue
+                if skill is not None and skill not in record.get("skills", []):
+                    continue
+                # Only a further match proves there is a next page
+                if limit is not None and len(matches) >= limit:
+                    return matches, self._seq[matches[-1]["id"]]
+                matches.append(record)
+        return matches, None
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def summary(self) -> dict:
+        """Dashboard totals: records, active records and sefirot activations"""
+        with self._lock:
+            records = list(self._by_id.values())
+        return {
+            "total": len(records),
+            "active": sum(1 for record in records if record.get("status") == "active"),
+            "sefirot_activations": sum(len(set(record.get("sefirot_activation", []))) for record in records),
+        }
+
+    # Writes
+    @timed("store_put")
+    def put(self, record: dict):
+        """Insert or replace a record by id"""
+        record = dict(record)
+        with self._lock:
+            self._append({"op": "put", "record": record})
+            self._index(record)
+            self.version += 1
+            self._maybe_compact()
+            self._notify("put", record)
+        return record
+
+    @timed("store_put_many")
+    def put_many(self, records: List[dict]) -> List[dict]:
+        """Insert or replace a batch with one journal flush and one version bump"""
+        records = [dict(record) for record in records]
+        if not records:
+            return records
+        with self._lock:
+            self._append(*({"op": "put", "record": record} for record in records))
+            for record in records:
+                self._index(record)
+            self.version += 1
+            self._maybe_compact()
+            for record in records:
+                self._notify("put", record)
+        return records
+
+    @timed("store_delete")
+    def delete(self, empleaido_id: str) -> Optional[dict]:
+        with self._lock:
+            if empleaido_id not in self._by_id:
+                return None
+            self._append({"op": "delete", "id": empleaido_id})
+            record = self._unindex(empleaido_id)
+            self.version += 1
+            self._maybe_compact()
+            self._notify("delete", record)
+            return record
+
+    def replace_all(self, records: List[dict]):
+        """Replace the whole collection (legacy save_empleaidos semantics)"""
+        with self._lock:
+            incoming = {r["id"]: r for r in records}
+            for empleaido_id in list(self._by_id):
+                if empleaido_id not in incoming:
+                    self.delete(empleaido_id)
+            for empleaido_id, record in incoming.items():
+                if self._by_id.get(empleaido_id) != record:
+                    self.put(record)
+
+    # Change notification
+    def subscribe(self, listener: Callable[[str, dict], None]):
+        self._listeners.append(listener)
+
+    def refresh(self) -> int:
+        """Listeners are notified synchronously; nothing to catch up on (single process)"""
+        return 0
+
+    def _notify(self, op: str, record: dict):
+        for listener in self._listeners:
+            listener(op, record)
+
+    @timed("store_journal_append")
+    def _append(self, *entries: dict):
+        if self._journal is None:
+            self._journal = open(self.journal_path, "a")
+        lines = [json.dumps(entry) + "\n" for entry in entries]
+        self._journal.write("".join(lines))
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+        self._journal_entries += len(lines)
+
+    def _close_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    # Compaction
+    def _maybe_compact(self):
+        # Threshold grows with the collection so compaction stays O(1) amortized
+        if self._journal_entries >= max(self.compact_min_entries, len(self._by_id)):
+            self.compact()
+
+    @timed("store_compact")
+    def compact(self):
+        """Write an atomic snapshot and truncate the journal"""
+        with self._lock:
+            directory = self.snapshot_path.parent
+            fd, tmp_path = tempfile.mkstemp(prefix=f".{self.snapshot_path.name}.", dir=directory)
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(list(self._by_id.values()), f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.snapshot_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+            # Replaying puts/deletes is idempotent, so a crash here is safe
+            self._close_journal()
+            open(self.journal_path, "w").close()
+            self._journal_entries = 0
+
+    def close(self):
+        with self._lock:
+            if self._journal_entries:
+                self.compact()
+            self._close_journal()
+
+    def stats(self) -> dict:
+        return {
+            "backend": "journal",
+            "records": len(self._by_id),
+            "journal_entries": self._journal_entries,
+            "version": self.version,
+        }
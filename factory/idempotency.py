@@ -0,0 +1,244 @@
+"""Webhook deduplication keyed on the provider's message id.
+
+Providers redeliver a webhook when the first delivery times out, so a slow
+transcription tends to arrive again while it is still being processed. Each
+key is claimed in a SQLite table before the handler runs:
+
+- a retry while the first delivery is still running waits for that result
+  (in-process through a shared future, across workers by polling the row);
+- a retry after completion gets the stored response from a bounded in-memory
+  LRU, or from the table while it is inside `window_seconds`;
+- a failed handler releases its claim so the next delivery tries again.
+
+Claims older than `claim_timeout` are treated as abandoned (crashed worker)
+and can be taken over.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Optional, Tuple
+
+STATUS_PROCESSING = "processing"
+STATUS_DONE = "done"
+
+
+class WebhookIdempotency:
+    """Run each webhook key once; duplicates get the first delivery's response"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS webhook_deliveries (
+        key TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        response TEXT,
+        claimed_at REAL NOT NULL,
+        completed_at REAL,
+        pid INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_webhook_deliveries_claimed_at ON webhook_deliveries (claimed_at);
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        window_seconds: float = 24 * 3600,
+        max_recent: int = 10000,
+        claim_timeout: float = 600.0,
+        poll_interval: float = 0.1,
+        prune_every: int = 1000,
+    ):
+        self.db_path = Path(db_path)
+        self.window_seconds = window_seconds
+        self.max_recent = max_recent
+        self.claim_timeout = claim_timeout
+        self.poll_interval = poll_interval
+        self.prune_every = prune_every
+        self._recent: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._in_flight = {}  # key -> asyncio.Future of this process
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._claims = 0
+        self.processed = 0
+        self.failed = 0
+        self.duplicates_in_flight = 0
+        self.duplicates_completed = 0
+        self._conn().executescript(self.SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    async def run(self, key: str, handler: Callable[[], Awaitable[dict]]) -> Tuple[dict, bool]:
+        """Return `(response, duplicate)`; `handler` runs only for the first delivery"""
+        response = self._recent_response(key)
+        if response is not None:
+            self._count_duplicate(completed=True)
+            return response, True
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self._count_duplicate(completed=False)
+            return await asyncio.shield(future), True
+
+        while True:
+            claimed, row = self._claim(key)
+            if claimed:
+                break
+            if row is None:
+                continue  # the blocking row vanished between insert and select
+            status, stored = row
+            if status == STATUS_DONE:
+                response = json.loads(stored)
+                self._remember(key, response)
+                self._count_duplicate(completed=True)
+                return response, True
+            # Another worker is processing it: wait for its row to change
+            response = await self._wait_for_other_worker(key)
+            if response is not None:
+                self._count_duplicate(completed=False)
+                return response, True
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            response = await handler()
+        except BaseException as e:
+            self._release(key)
+            with self._lock:
+                self.failed += 1
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()  # waiters re-raise it; no "never retrieved" warning
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+        self._complete(key, response)
+        self._remember(key, response)
+        future.set_result(response)
+        with self._lock:
+            self.processed += 1
+        return response, False
+
+    def _recent_response(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._recent.get(key)
+            if entry is None:
+                return None
+            completed_at, response = entry
+            if completed_at < time.time() - self.window_seconds:
+                del self._recent[key]
+                return None
+            self._recent.move_to_end(key)
+            return response
+
+    def _remember(self, key: str, response: dict):
+        with self._lock:
+            self._recent[key] = (time.time(), response)
+            self._recent.move_to_end(key)
+            while len(self._recent) > self.max_recent:
+                self._recent.popitem(last=False)
+
+    def _count_duplicate(self, completed: bool):
+        with self._lock:
+            if completed:
+                self.duplicates_completed += 1
+            else:
+                self.duplicates_in_flight += 1
+
+    def _claim(self, key: str) -> Tuple[bool, Optional[tuple]]:
+        """Insert a processing row; returns (claimed, (status, response) of the existing row)"""
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            # Expired results and abandoned claims do not block a new delivery
+            conn.execute(
+                "DELETE FROM webhook_deliveries WHERE key = ? AND ("
+                "(status = ? AND completed_at < ?) OR (status = ? AND claimed_at < ?))",
+                (key, STATUS_DONE, now - self.window_seconds, STATUS_PROCESSING, now - self.claim_timeout),
+            )
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO webhook_deliveries (key, status, claimed_at, pid) VALUES (?, ?, ?, ?)",
+                (key, STATUS_PROCESSING, now, os.getpid()),
+            )
+            row = None
+            if cursor.rowcount == 0:
+                row = conn.execute(
+                    "SELECT status, response FROM webhook_deliveries WHERE key = ?", (key,)
+                ).fetchone()
+        with self._lock:
+            self._claims += 1
+            prune = self._claims % self.prune_every == 0
+        if prune:
+            self.prune(now)
+        return row is None, row
+
+    async def _wait_for_other_worker(self, key: str) -> Optional[dict]:
+        """Poll until the row is done (its response) or gone/abandoned (None: try to claim)"""
+        deadline = time.monotonic() + self.claim_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            row = self._conn().execute(
+                "SELECT status, response, claimed_at FROM webhook_deliveries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[2] < time.time() - self.claim_timeout:
+                return None
+            if row[0] == STATUS_DONE:
+                response = json.loads(row[1])
+                self._remember(key, response)
+                return response
+        return None
+
+    def _complete(self, key: str, response: dict):
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "UPDATE webhook_deliveries SET status = ?, response = ?, completed_at = ? WHERE key = ?",
+                (STATUS_DONE, json.dumps(response), time.time(), key),
+            )
+
+    def _release(self, key: str):
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "DELETE FROM webhook_deliveries WHERE key = ? AND status = ? AND pid = ?",
+                (key, STATUS_PROCESSING, os.getpid()),
+            )
+
+    def prune(self, now: Optional[float] = None):
+        """Drop rows outside the dedup window"""
+        now = time.time() if now is None else now
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "DELETE FROM webhook_deliveries WHERE (status = ? AND completed_at < ?) OR claimed_at < ?",
+                (STATUS_DONE, now - self.window_seconds, now - max(self.window_seconds, self.claim_timeout)),
+            )
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM webhook_deliveries").fetchone()[0]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "recent": len(self._recent),
+                "max_recent": self.max_recent,
+                "in_flight": len(self._in_flight),
+                "window_seconds": self.window_seconds,
+                "processed": self.processed,
+                "failed": self.failed,
+                "duplicates": self.duplicates_in_flight + self.duplicates_completed,
+                "duplicates_in_flight": self.duplicates_in_flight,
+                "duplicates_completed": self.duplicates_completed,
+            }
@@ -0,0 +1,115 @@
+"""Pooled async downloader for provider media (WhatsApp audio_url).
+
+One keep-alive connection pool is shared by all webhook requests; downloads are
+streamed to disk with per-host concurrency limits and a size cutoff.
+"""
+import asyncio
+import hashlib
+import os
+import tempfile
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from starlette.concurrency import run_in_threadpool
+
+from factory.uploads import SpooledUpload
+
+
+class MediaFetchError(Exception):
+    """Download failed: bad URL, network error or non-2xx status (HTTP 502)"""
+
+
+class MediaTooLargeError(MediaFetchError):
+    """Remote media exceeded the configured byte limit (HTTP 413)"""
+
+
+class MediaFetcher:
+    """Shared async HTTP client that streams media downloads to temp files"""
+
+    def __init__(
+        self,
+        max_connections: int = 50,
+        max_keepalive: int = 20,
+        per_host_limit: int = 8,
+        timeout: float = 15.0,
+        max_bytes: int = 25 * 1024 * 1024,
+        chunk_size: int = 64 * 1024,
+    ):
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive)
+        self.timeout = httpx.Timeout(timeout, connect=min(timeout, 5.0))
+        self.per_host_limit = per_host_limit
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self.downloads = 0
+        self.failures = 0
+        self.too_large = 0
+        self.bytes_downloaded = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout, follow_redirects=True)
+        return self._client
+
+    def _slot(self, host: str) -> asyncio.Semaphore:
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_slots[host]
+
+    async def fetch_to_file(self, url: str, suffix: str = ".ogg", headers: Optional[dict] = None) -> SpooledUpload:
+        """Stream `url` into a temp file; the caller owns the returned path"""
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise MediaFetchError("Only http(s) media URLs are supported")
+
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        size = 0
+        digest = hashlib.sha256()
+        try:
+            async with self._slot(parts.hostname):
+                async with self.client.stream("GET", url, headers=headers) as response:
+                    if response.status_code >= 400:
+                        raise MediaFetchError(f"Media download returned HTTP {response.status_code}")
+                    declared = response.headers.get("content-length")
+                    if declared and declared.isdigit() and int(declared) > self.max_bytes:
+                        raise MediaTooLargeError(f"Media exceeds {self.max_bytes} bytes")
+                    with os.fdopen(fd, "wb") as f:
+                        fd = None
+                        async for chunk in response.aiter_bytes(self.chunk_size):
+                            size += len(chunk)
+                            if size > self.max_bytes:
+                                raise MediaTooLargeError(f"Media exceeds {self.max_bytes} bytes")
+                            digest.update(chunk)
+                            await run_in_threadpool(f.write, chunk)
+        except Exception as e:
+            if fd is not None:
+                os.close(fd)
+            os.unlink(path)
+            if isinstance(e, MediaTooLargeError):
+                self.too_large += 1
+            else:
+                self.failures += 1
+            if isinstance(e, MediaFetchError):
+                raise
+            raise MediaFetchError(f"Media download failed: {e}") from e
+
+        self.downloads += 1
+        self.bytes_downloaded += size
+        return SpooledUpload(path, os.path.basename(parts.path), size, digest.hexdigest())
+
+    def stats(self) -> dict:
+        return {
+            "downloads": self.downloads,
+            "failures": self.failures,
+            "too_large": self.too_large,
+            "bytes_downloaded": self.bytes_downloaded,
+            "per_host_limit": self.per_host_limit,
+        }
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
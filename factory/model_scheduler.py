@@ -0,0 +1,145 @@
+"""Pick the Whisper model size per request from duration, backlog and an SLO.
+
+A request's predicted latency is the time to drain the work already queued
+(spread over the workers) plus its own inference time. Both come from
+per-size real-time factors (inference seconds per audio second), which
+start at conservative CPU defaults and follow completed jobs as an EWMA.
+
+Each size gets an equal share of the SLO as its budget, largest first: with
+small/base/tiny and a 30 s SLO, small is used while its prediction is under
+10 s, base under 20 s and tiny up to the full 30 s. Stepping down before the
+SLO is spent keeps headroom for the requests that follow. A recording too
+long to meet any budget on its own runs on the smallest size. Requests are
+shed with `OverloadedError` only when the queued work alone (backlog spread
+over the workers) exceeds the SLO, so an idle server always admits; its
+`retry_after` is how long the backlog needs to drain back under the SLO.
+"""
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from factory.transcription_engines import FP32_MODEL_MB
+
+# Seconds of CPU inference per second of audio (openai-whisper fp32, 4 threads)
+DEFAULT_RTF = {
+    "tiny": 0.05,
+    "base": 0.1,
+    "small": 0.3,
+    "medium": 0.8,
+    "large": 1.6,
+    "large-v2": 1.6,
+    "large-v3": 1.6,
+}
+
+
+class OverloadedError(Exception):
+    """Raised when no model size can meet the latency SLO"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ModelScheduler:
+    """Chooses a model size per request; learns real-time factors from finished jobs"""
+
+    def __init__(
+        self,
+        sizes: Iterable[str],
+        preferred: str,
+        backlog: Callable[[], List[Tuple[str, Optional[float], float]]],
+        workers: int = 1,
+        slo_seconds: float = 30.0,
+        default_audio_seconds: float = 30.0,
+        rtf: Optional[Dict[str, float]] = None,
+        smoothing: float = 0.2,
+    ):
+        # Largest first, never above the preferred size
+        ordered = sorted(sizes, key=lambda size: FP32_MODEL_MB.get(size, 0), reverse=True)
+        self.tiers = ordered[ordered.index(preferred):] if preferred in ordered else [preferred]
+        self.preferred = preferred
+        self.backlog = backlog
+        self.workers = max(1, workers)
+        self.slo_seconds = slo_seconds
+        self.default_audio_seconds = default_audio_seconds
+        self.smoothing = smoothing
+        self._rtf = {size: (rtf or {}).get(size, DEFAULT_RTF.get(size, 1.0)) for size in self.tiers}
+        self._lock = threading.Lock()
+        self.decisions = {size: 0 for size in self.tiers}
+        self.downgraded = 0
+        self.rejected = 0
+
+    def rtf(self, size: str) -> float:
+        with self._lock:
+            return self._rtf.get(size, DEFAULT_RTF.get(size, 1.0))
+
+    def pending_seconds(self) -> float:
+        """Estimated inference seconds still owed to queued and running jobs"""
+        total = 0.0
+        for size, audio_seconds, elapsed in self.backlog():
+            estimate = (audio_seconds or self.default_audio_seconds) * self.rtf(size)
+            total += max(0.0, estimate - elapsed)
+        return total
+
+    def predict(self, size: str, audio_seconds: Optional[float], parallelism: int = 1,
+                pending: Optional[float] = None) -> float:
+        """Predicted seconds until a new request of `audio_seconds` finishes on `size`"""
+        pending = self.pending_seconds() if pending is None else pending
+        own = (audio_seconds or self.default_audio_seconds) * self.rtf(size) / max(1, min(parallelism, self.workers))
+        return pending / self.workers + own
+
+    def choose(self, audio_seconds: Optional[float], parallelism: int = 1) -> str:
+        """Largest size (up to the preferred one) within its SLO budget; raises OverloadedError"""
+        pending = self.pending_seconds()
+        queue_wait = pending / self.workers
+        if queue_wait > self.slo_seconds:
+            with self._lock:
+                self.rejected += 1
+            raise OverloadedError(
+                f"Transcription backlog exceeds the {self.slo_seconds:g} s latency target "
+                f"({queue_wait:.1f} s of queued work per worker)",
+                max(1, math.ceil(queue_wait - self.slo_seconds)),
+            )
+        chosen = self.tiers[-1]
+        for i, size in enumerate(self.tiers):
+            if self.predict(size, audio_seconds, parallelism, pending) <= self.slo_seconds * (i + 1) / len(self.tiers):
+                chosen = size
+                break
+        with self._lock:
+            self.decisions[chosen] += 1
+            if chosen != self.preferred:
+                self.downgraded += 1
+        return chosen
+
+    def observe(self, size: str, audio_seconds: Optional[float], inference_seconds: Optional[float]):
+        """Fold a finished job's real-time factor into the estimate for `size`"""
+        if not audio_seconds or inference_seconds is None or audio_seconds < 1:
+            return
+        sample = inference_seconds / audio_seconds
+        with self._lock:
+            current = self._rtf.get(size, DEFAULT_RTF.get(size, 1.0))
+            self._rtf[size] = (1 - self.smoothing) * current + self.smoothing * sample
+
+    def on_job_done(self, job, output: dict):
+        """TranscriptionJobQueue listener"""
+        report = output.get("preprocess") or {}
+        self.observe(
+            job.model_size,
+            report.get("audio_seconds") or job.audio_seconds,
+            output.get("timings", {}).get("model_transcribe"),
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            rtf = {size: round(value, 4) for size, value in self._rtf.items()}
+            decisions = dict(self.decisions)
+        return {
+            "preferred": self.preferred,
+            "tiers": self.tiers,
+            "slo_seconds": self.slo_seconds,
+            "rtf": rtf,
+            "pending_seconds": round(self.pending_seconds(), 2),
+            "decisions": decisions,
+            "downgraded": self.downgraded,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,216 @@
+"""Bounded-memory sliding-window-counter rate limiter.
+
+Each (client, route) key holds three numbers: the current window start and the
+request counts of the current and previous windows. The allowed rate is
+estimated by weighting the previous window by how much of it still overlaps
+the sliding window. Idle keys are evicted in LRU order once they are older
+than two windows, or when `max_keys` is reached.
+
+`SQLiteRateLimiter` keeps the same counters in a SQLite table so several
+worker processes enforce one shared limit.
+"""
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+class _Counter:
+    __slots__ = ("window_start", "previous", "current", "last_seen")
+
+    def __init__(self, window_start: float, now: float):
+        self.window_start = window_start
+        self.previous = 0
+        self.current = 0
+        self.last_seen = now
+
+
+class SlidingWindowRateLimiter:
+    """O(1) time and state per key; per-route limits with a shared default"""
+
+    def __init__(
+        self,
+        default_limit: int = 60,
+        window_seconds: float = 60.0,
+        route_limits: Optional[Dict[str, int]] = None,
+        max_keys: int = 200000,
+    ):
+        self.default_limit = default_limit
+        self.window_seconds = window_seconds
+        self.route_limits = dict(route_limits or {})
+        self.max_keys = max_keys
+        self._counters: "OrderedDict[Tuple[str, str], _Counter]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+        self.evicted = 0
+
+    def limit_for(self, route: str) -> int:
+        return self.route_limits.get(route, self.default_limit)
+
+    def check(self, client: str, route: str, now: Optional[float] = None) -> bool:
+        """Record a request and return False if it exceeds the route limit"""
+        now = time.time() if now is None else now
+        window = self.window_seconds
+        key = (client, route)
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None:
+                counter = _Counter(now - (now % window), now)
+                self._counters[key] = counter
+                self._evict(now)
+            else:
+                self._counters.move_to_end(key)
+
+            elapsed_windows = int((now - counter.window_start) // window)
+            if elapsed_windows >= 1:
+                counter.previous = counter.current if elapsed_windows == 1 else 0
+                counter.current = 0
+                counter.window_start += elapsed_windows * window
+            counter.last_seen = now
+
+            overlap = 1.0 - (now - counter.window_start) / window
+            estimated = counter.previous * overlap + counter.current
+            if estimated >= self.limit_for(route):
+                self.rejected += 1
+                return False
+            counter.current += 1
+            self.allowed += 1
+            return True
+
+    def _evict(self, now: float):
+        """Drop idle keys from the LRU end, and the oldest key when full"""
+        idle_cutoff = now - 2 * self.window_seconds
+        while self._counters:
+            key, oldest = next(iter(self._counters.items()))
+            if oldest.last_seen >= idle_cutoff and len(self._counters) <= self.max_keys:
+                break
+            del self._counters[key]
+            self.evicted += 1
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    def stats(self) -> dict:
+        return {
+            "tracked_keys": len(self._counters),
+            "max_keys": self.max_keys,
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "evicted": self.evicted,
+        }
+
+
+class SQLiteRateLimiter(SlidingWindowRateLimiter):
+    """Sliding-window counters shared by every process using `db_path`"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS rate_limits (
+        client TEXT NOT NULL,
+        route TEXT NOT NULL,
+        window_start REAL NOT NULL,
+        previous INTEGER NOT NULL,
+        current INTEGER NOT NULL,
+        last_seen REAL NOT NULL,
+        PRIMARY KEY (client, route)
+    );
+    CREATE INDEX IF NOT EXISTS idx_rate_limits_last_seen ON rate_limits (last_seen);
+    """
+
+    def __init__(self, db_path: Path, evict_every: int = 1000, **kwargs):
+        super().__init__(**kwargs)
+        self.db_path = Path(db_path)
+        self.evict_every = evict_every
+        self._local = threading.local()
+        self._checks = 0
+        self._conn().executescript(self.SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; check() opens its own BEGIN IMMEDIATE transaction
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def check(self, client: str, route: str, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        window = self.window_seconds
+        conn = self._conn()
+        # The write lock is taken up front so concurrent workers cannot both pass the limit
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT window_start, previous, current FROM rate_limits WHERE client = ? AND route = ?",
+                (client, route),
+            ).fetchone()
+            if row is None:
+                window_start, previous, current = now - (now % window), 0, 0
+            else:
+                window_start, previous, current = row
+                elapsed_windows = int((now - window_start) // window)
+                if elapsed_windows >= 1:
+                    previous = current if elapsed_windows == 1 else 0
+                    current = 0
+                    window_start += elapsed_windows * window
+
+            overlap = 1.0 - (now - window_start) / window
+            allowed = previous * overlap + current < self.limit_for(route)
+            if allowed:
+                current += 1
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limits (client, route, window_start, previous, current, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (client, route, window_start, previous, current, now),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        with self._lock:
+            if allowed:
+                self.allowed += 1
+            else:
+                self.rejected += 1
+            self._checks += 1
+            evict = self._checks % self.evict_every == 0
+        if evict:
+            self._evict(now)
+        return allowed
+
+    def _evict(self, now: float):
+        conn = self._conn()
+        cursor = conn.execute("DELETE FROM rate_limits WHERE last_seen < ?", (now - 2 * self.window_seconds,))
+        evicted = cursor.rowcount
+        # Over capacity: drop the least recently seen keys
+        excess = len(self) - self.max_keys
+        if excess > 0:
+            cursor = conn.execute(
+                "DELETE FROM rate_limits WHERE rowid IN "
+                "(SELECT rowid FROM rate_limits ORDER BY last_seen LIMIT ?)",
+                (excess,),
+            )
+            evicted += cursor.rowcount
+        with self._lock:
+            self.evicted += evicted
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+
+    def stats(self) -> dict:
+        return dict(super().stats(), tracked_keys=len(self), backend="sqlite", database=str(self.db_path))
+
+
+def parse_route_limits(spec: str) -> Dict[str, int]:
+    """Parse "route=limit,route=limit" into a dict"""
+    limits = {}
+    for item in spec.split(","):
+        if "=" in item:
+            route, limit = item.split("=", 1)
+            limits[route.strip()] = int(limit)
+    return limits
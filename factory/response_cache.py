@@ -0,0 +1,79 @@
+"""Pre-serialized response cache keyed by data version, with strong ETags.
+
+Read endpoints cache their encoded body per (request key, data version). Any
+mutation bumps the store version, so stale entries are never served; clients
+that send a matching If-None-Match get 304 Not Modified without a body.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+class VersionedResponseCache:
+    """LRU of encoded bodies; entries from older data versions are ignored"""
+
+    def __init__(self, epoch: str, max_entries: int = 256):
+        self.max_entries = max_entries
+        # The store's epoch: tells this data version apart from a previous run's
+        self.epoch = epoch
+        self._entries: "OrderedDict[str, Tuple[int, bytes, Dict[str, str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def etag(self, key: str, version: int) -> str:
+        digest = hashlib.sha1(key.encode()).hexdigest()[:12]
+        return f'"{self.epoch}-{version}-{digest}"'
+
+    def not_modified_for(self, if_none_match: Optional[str], etag: str) -> bool:
+        """True when the client's If-None-Match already names `etag`"""
+        if not if_none_match:
+            return False
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        if "*" in candidates or etag in candidates:
+            self.not_modified += 1
+            return True
+        return False
+
+    def get(self, key: str, version: int) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, key: str, version: int, body: bytes, headers: Optional[Dict[str, str]] = None):
+        with self._lock:
+            self._entries[key] = (version, body, dict(headers or {}))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def tee(self, key: str, version: int, chunks, headers: Optional[Dict[str, str]] = None, max_bytes: int = 1 << 20):
+        """Pass streamed chunks through; cache the body once complete if it stays within `max_bytes`"""
+        parts, size = [], 0
+        for chunk in chunks:
+            data = chunk.encode() if isinstance(chunk, str) else chunk
+            if parts is not None:
+                size += len(data)
+                # Too big to keep: stop collecting, keep streaming
+                if size > max_bytes:
+                    parts = None
+                else:
+                    parts.append(data)
+            yield data
+        if parts is not None:
+            self.put(key, version, b"".join(parts), headers)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+        }
@@ -0,0 +1,236 @@
+"""In-process inverted index over empleaido skills, sefirot, role and specialty.
+
+Each field keeps token -> bitset of document numbers (a Python int, bit N =
+document N) plus a sorted vocabulary for prefix lookups. AND/OR are single
+big-int operations and counts are popcounts, which keeps queries well under a
+millisecond at 50k documents. Documents are numbered in insertion order, so
+results come back in the same order as the listing endpoint. The index is
+updated incrementally from store write notifications.
+
+Query syntax (case and accent insensitive):
+
+    whisper hod                  both terms (implicit AND)
+    skills:whisper AND sefirot:hod
+    sefirot:hod OR sefirot:yesod  AND binds tighter than OR
+    trans*                       prefix match
+"""
+import bisect
+import re
+import threading
+import unicodedata
+from typing import Dict, List, Optional, Set, Tuple
+
+FIELDS = {
+    "skills": "skills",
+    "sefirot": "sefirot_activation",
+    "role": "role",
+    "specialty": "specialty",
+}
+
+_TOKEN = re.compile(r"\w+")
+
+
+class QuerySyntaxError(ValueError):
+    pass
+
+
+def tokenize(text: str) -> List[str]:
+    folded = unicodedata.normalize("NFKD", text.lower())
+    folded = "".join(c for c in folded if not unicodedata.combining(c))
+    return _TOKEN.findall(folded)
+
+
+class _FieldIndex:
+    __slots__ = ("postings", "vocabulary")
+
+    def __init__(self):
+        self.postings: Dict[str, int] = {}
+        self.vocabulary: List[str] = []  # sorted, for prefix ranges
+
+    def add(self, token: str, doc: int):
+        posting = self.postings.get(token)
+        if posting is None:
+            posting = 0
+            bisect.insort(self.vocabulary, token)
+        self.postings[token] = posting | (1 << doc)
+
+    def discard(self, token: str, doc: int):
+        posting = self.postings.get(token)
+        if posting is None:
+            return
+        posting &= ~(1 << doc)
+        if posting:
+            self.postings[token] = posting
+        else:
+            del self.postings[token]
+            del self.vocabulary[bisect.bisect_left(self.vocabulary, token)]
+
+    def lookup(self, token: str, prefix: bool) -> int:
+        if not prefix:
+            return self.postings.get(token, 0)
+        start = bisect.bisect_left(self.vocabulary, token)
+        end = bisect.bisect_left(self.vocabulary, token + "\uffff")
+        docs = 0
+        for t in self.vocabulary[start:end]:
+            docs |= self.postings[t]
+        return docs
+
+
+def _lowest_docs(docs: int, limit: int) -> List[int]:
+    """Positions of the `limit` lowest set bits"""
+    found = []
+    while docs and len(found) < limit:
+        low = docs & -docs
+        found.append(low.bit_length() - 1)
+        docs ^= low
+    return found
+
+
+class SearchIndex:
+    """Inverted index kept in sync with the store via put/remove calls"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.queries = 0
+        self._reset()
+
+    def _reset(self):
+        self._fields = {name: _FieldIndex() for name in FIELDS}
+        self._doc_of: Dict[str, int] = {}
+        self._id_of: Dict[int, str] = {}
+        self._tokens_of: Dict[int, Dict[str, Set[str]]] = {}
+        self._next_doc = 1
+
+    # Maintenance
+    def rebuild(self, records: List[dict]):
+        with self._lock:
+            self._reset()
+            # Collect document lists first; setting bits one by one would copy each bitset per record
+            collected: Dict[str, Dict[str, List[int]]] = {name: {} for name in FIELDS}
+            for record in records:
+                doc = self._assign(record["id"])
+                tokens = {name: self._field_tokens(record.get(attr)) for name, attr in FIELDS.items()}
+                self._tokens_of[doc] = tokens
+                for name, field_tokens in tokens.items():
+                    for token in field_tokens:
+                        collected[name].setdefault(token, []).append(doc)
+            size = self._next_doc // 8 + 1
+            for name, postings in collected.items():
+                field = self._fields[name]
+                for token, docs in postings.items():
+                    bits = bytearray(size)
+                    for doc in docs:
+                        bits[doc >> 3] |= 1 << (doc & 7)
+                    field.postings[token] = int.from_bytes(bits, "little")
+                field.vocabulary = sorted(field.postings)
+
+    def _assign(self, empleaido_id: str) -> int:
+        doc = self._doc_of.get(empleaido_id)
+        if doc is None:
+            doc = self._next_doc
+            self._next_doc += 1
+            self._doc_of[empleaido_id] = doc
+            self._id_of[doc] = empleaido_id
+        return doc
+
+    def put(self, record: dict):
+        with self._lock:
+            doc = self._assign(record["id"])
+            tokens = {name: self._field_tokens(record.get(attr)) for name, attr in FIELDS.items()}
+            previous = self._tokens_of.get(doc, {})
+            for name, field in self._fields.items():
+                old, new = previous.get(name, set()), tokens[name]
+                for token in old - new:
+                    field.discard(token, doc)
+                for token in new - old:
+                    field.add(token, doc)
+            self._tokens_of[doc] = tokens
+
+    def remove(self, empleaido_id: str):
+        with self._lock:
+            doc = self._doc_of.pop(empleaido_id, None)
+            if doc is None:
+                return
+            del self._id_of[doc]
+            for name, tokens in self._tokens_of.pop(doc).items():
+                for token in tokens:
+                    self._fields[name].discard(token, doc)
+
+    def on_store_event(self, op: str, record: dict):
+        """Store listener: keeps the index current on put/delete (reset passes all records)"""
+        if op == "put":
+            self.put(record)
+        elif op == "delete":
+            self.remove(record["id"])
+        elif op == "reset":
+            self.rebuild(record)
+
+    @staticmethod
+    def _field_tokens(value) -> Set[str]:
+        if value is None:
+            return set()
+        values = value if isinstance(value, list) else [value]
+        return {token for item in values for token in tokenize(str(item))}
+
+    # Queries
+    def _parse(self, query: str) -> List[List[Tuple[Optional[str], str, bool]]]:
+        """Parse into OR-groups of AND-ed (field, token, prefix) terms"""
+        groups, current, expect_term = [], [], True
+        for word in query.split():
+            operator = word.upper()
+            if operator in ("AND", "OR"):
+                if expect_term:
+                    raise QuerySyntaxError(f"'{word}' must follow a search term")
+                if operator == "OR":
+                    groups.append(current)
+                    current = []
+                expect_term = True
+                continue
+            field = None
+            if ":" in word:
+                field, word = word.split(":", 1)
+                field = field.lower()
+                if field not in FIELDS:
+                    raise QuerySyntaxError(f"Unknown field '{field}' (use {', '.join(FIELDS)})")
+            prefix = word.endswith("*")
+            tokens = tokenize(word)
+            if not tokens:
+                raise QuerySyntaxError(f"Empty search term '{word}'")
+            # Multi-word values such as "whisper-transcription" must match every token
+            for i, token in enumerate(tokens):
+                current.append((field, token, prefix and i == len(tokens) - 1))
+            expect_term = False
+        if expect_term:
+            raise QuerySyntaxError("Query is empty or ends with an operator")
+        groups.append(current)
+        return groups
+
+    def _term_docs(self, field: Optional[str], token: str, prefix: bool) -> int:
+        if field:
+            return self._fields[field].lookup(token, prefix)
+        docs = 0
+        for f in self._fields.values():
+            docs |= f.lookup(token, prefix)
+        return docs
+
+    def search(self, query: str, limit: int = 50) -> Tuple[int, List[str]]:
+        """Return (total matches, first `limit` ids in insertion order)"""
+        groups = self._parse(query)
+        with self._lock:
+            self.queries += 1
+            matches = 0
+            for group in groups:
+                docs = -1  # all bits set
+                for term in group:
+                    docs &= self._term_docs(*term)
+                    if not docs:
+                        break
+                matches |= docs
+            return bin(matches).count("1"), [self._id_of[doc] for doc in _lowest_docs(matches, limit)]
+
+    def stats(self) -> dict:
+        return {
+            "documents": len(self._doc_of),
+            "tokens": {name: len(field.postings) for name, field in self._fields.items()},
+            "queries": self.queries,
+        }
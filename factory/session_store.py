@@ -0,0 +1,258 @@
+"""In-memory session store with heap-based expiry and periodic snapshots.
+
+Validation never touches the filesystem; expired sessions are popped from a
+min-heap ordered by expiry and the table is flushed to disk in the background
+as an atomic snapshot in the existing `sessions.json` format.
+
+`SQLiteSessionStore` has the same interface backed by a SQLite table, for
+deployments where several worker processes must see the same sessions.
+"""
+import asyncio
+import heapq
+import json
+import os
+import secrets
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from factory.metrics import timed
+
+
+class SessionStore:
+    """Session tokens kept in memory, persisted every `flush_interval` seconds"""
+
+    def __init__(self, path: Path, max_age: int = 3600, flush_interval: float = 5.0, max_sessions: int = 100000):
+        self.path = Path(path)
+        self.max_age = max_age
+        self.flush_interval = flush_interval
+        self.max_sessions = max_sessions
+        self._sessions: Dict[str, dict] = {}
+        self._expiry: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._flusher: Optional[asyncio.Task] = None
+        self.created = 0
+        self.expired = 0
+        self.evicted = 0
+        self.flushes = 0
+        self.load()
+
+    @timed("session_load")
+    def load(self):
+        """Restore unexpired sessions from the last snapshot"""
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r") as f:
+                sessions = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        with self._lock:
+            for token, session in sessions.items():
+                if session.get("expires_at", 0) > now:
+                    self._sessions[token] = session
+                    self._expiry.append((session["expires_at"], token))
+            heapq.heapify(self._expiry)
+            self._dirty = len(self._sessions) != len(sessions)
+
+    def _expire(self, now: float):
+        """Pop every session whose expiry has passed (stale heap entries are skipped)"""
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, token = heapq.heappop(self._expiry)
+            session = self._sessions.get(token)
+            if session and session["expires_at"] == expires_at:
+                del self._sessions[token]
+                self.expired += 1
+                self._dirty = True
+
+    def create(self) -> str:
+        token = secrets.token_urlsafe(32)
+        now = time.time()
+        session = {
+            "token": token,
+            "created_at": datetime.now().isoformat(),
+            "expires_at": now + self.max_age,
+        }
+        with self._lock:
+            self._expire(now)
+            while len(self._sessions) >= self.max_sessions and self._expiry:
+                # At capacity: drop the session closest to expiring
+                _, oldest = heapq.heappop(self._expiry)
+                if self._sessions.pop(oldest, None):
+                    self.evicted += 1
+            self._sessions[token] = session
+            heapq.heappush(self._expiry, (session["expires_at"], token))
+            self.created += 1
+            self._dirty = True
+        return token
+
+    def validate(self, token: str) -> bool:
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(token)
+            if not session:
+                return False
+            if now > session["expires_at"]:
+                del self._sessions[token]
+                self.expired += 1
+                self._dirty = True
+                return False
+            return True
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    # Persistence
+    def flush(self) -> bool:
+        """Write an atomic snapshot if anything changed since the last one"""
+        with self._lock:
+            self._expire(time.time())
+            if not self._dirty:
+                return False
+            snapshot = dict(self._sessions)
+            self._dirty = False
+
+        with timed("session_flush"):
+            self._write_snapshot(snapshot)
+        self.flushes += 1
+        return True
+
+    def _write_snapshot(self, snapshot: dict):
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{self.path.name}.", dir=self.path.parent)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(snapshot, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            with self._lock:
+                self._dirty = True
+            raise
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await run_in_threadpool(self.flush)
+            except Exception as e:
+                print(f"Error flushing sessions: {e}")
+
+    def start(self):
+        if self._flusher is None:
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await run_in_threadpool(self.flush)
+
+    def stats(self) -> dict:
+        return {
+            "active": len(self._sessions),
+            "created": self.created,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "flushes": self.flushes,
+        }
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions shared by every process using `db_path`; expired rows are purged by flush()"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sessions (
+        token TEXT PRIMARY KEY,
+        created_at TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at);
+    """
+
+    def __init__(self, db_path: Path, path: Optional[Path] = None, **kwargs):
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        self._conn().executescript(self.SCHEMA)
+        # `path` is the legacy sessions.json, imported once into an empty table
+        super().__init__(path or self.db_path.with_suffix(".json"), **kwargs)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @timed("session_load")
+    def load(self):
+        conn = self._conn()
+        if not self.path.exists() or conn.execute("SELECT 1 FROM sessions LIMIT 1").fetchone():
+            return
+        try:
+            with open(self.path, "r") as f:
+                sessions = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO sessions (token, created_at, expires_at) VALUES (?, ?, ?)",
+                [
+                    (token, session.get("created_at", ""), session["expires_at"])
+                    for token, session in sessions.items()
+                    if session.get("expires_at", 0) > now
+                ],
+            )
+
+    def create(self) -> str:
+        token = secrets.token_urlsafe(32)
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT INTO sessions (token, created_at, expires_at) VALUES (?, ?, ?)",
+                (token, datetime.now().isoformat(), time.time() + self.max_age),
+            )
+        with self._lock:
+            self.created += 1
+        return token
+
+    def validate(self, token: str) -> bool:
+        row = self._conn().execute("SELECT expires_at FROM sessions WHERE token = ?", (token,)).fetchone()
+        return bool(row) and row[0] > time.time()
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM sessions WHERE expires_at > ?", (time.time(),)).fetchone()[0]
+
+    def flush(self) -> bool:
+        """Purge expired sessions and enforce `max_sessions` (rows are already durable)"""
+        conn = self._conn()
+        with timed("session_flush"), conn:
+            expired = conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),)).rowcount
+            evicted = conn.execute(
+                "DELETE FROM sessions WHERE token IN "
+                "(SELECT token FROM sessions ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_sessions,),
+            ).rowcount
+        with self._lock:
+            self.expired += expired
+            self.evicted += evicted
+            self.flushes += 1
+        return bool(expired or evicted)
+
+    def stats(self) -> dict:
+        return dict(super().stats(), active=len(self), backend="sqlite", database=str(self.db_path))
@@ -0,0 +1,64 @@
+"""Helpers for running several API worker processes on one host.
+
+`file_lock()` serialises a critical section across processes with an advisory
+lock file, and `load_shared_secret()` gives every worker the same secret: the
+first process to start creates it, the rest read it.
+"""
+import os
+import secrets
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process locking only
+    fcntl = None
+
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+
+@contextmanager
+def file_lock(path: Path):
+    """Exclusive lock on `path` (created if missing), held for the block"""
+    path = Path(path)
+    with _thread_locks_guard:
+        thread_lock = _thread_locks.setdefault(str(path), threading.Lock())
+    # flock is per open file description, so threads of one process also need a lock
+    with thread_lock:
+        if fcntl is None:
+            yield
+            return
+        with open(path, "a+") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def load_shared_secret(path: Path, env_value: Optional[str] = None) -> str:
+    """Return `env_value` if set, else the secret in `path`, creating it once"""
+    if env_value:
+        return env_value
+    path = Path(path)
+    if path.exists():
+        secret = path.read_text().strip()
+        if secret:
+            return secret
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent or ".")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(secrets.token_urlsafe(32))
+        os.chmod(tmp_path, 0o600)
+        try:
+            # link() fails if another worker published first; theirs wins
+            os.link(tmp_path, path)
+        except FileExistsError:
+            pass
+    finally:
+        os.unlink(tmp_path)
+    return path.read_text().strip()
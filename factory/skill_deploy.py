@@ -0,0 +1,148 @@
+"""Incremental OpenClaw skill deployment.
+
+Files are only rewritten when their content hash changes, writes are atomic
+(temp file + rename), fleet deploys run on a bounded thread pool, and skill
+directories generated by the factory that no longer match an empleaido are
+removed.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Every generated skill.md carries this footer; only such dirs are pruned
+FACTORY_MARKER = "Generado por Empleaido Factory"
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class SkillDeployer:
+    """Reconcile empleaido records with skill directories on disk"""
+
+    def __init__(
+        self,
+        skills_path: Path,
+        render_skill: Callable[[dict], str],
+        render_index: Callable[[dict], str],
+        max_workers: int = 8,
+    ):
+        self.skills_path = Path(skills_path)
+        self.render_skill = render_skill
+        self.render_index = render_index
+        self.max_workers = max_workers
+        # path -> sha256 of what we last wrote or saw, so unchanged files are not re-read
+        self._hashes: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def skill_dir(self, empleaido: dict) -> Path:
+        return self.skills_path / empleaido["name"].lower()
+
+    def write_if_changed(self, path: Path, content: str) -> bool:
+        """Atomically write `content` unless the file already holds it"""
+        data = content.encode()
+        digest = _sha256(data)
+        key = str(path)
+        with self._lock:
+            known = self._hashes.get(key)
+        if known is None and path.exists():
+            known = _sha256(path.read_bytes())
+        if known == digest and path.exists():
+            with self._lock:
+                self._hashes[key] = digest
+            return False
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        with self._lock:
+            self._hashes[key] = digest
+        return True
+
+    def deploy_one(self, empleaido: dict) -> dict:
+        """Render and write skill.md/index.md; returns which files changed"""
+        skill_dir = self.skill_dir(empleaido)
+        written, unchanged = [], []
+        for filename, render in (("skill.md", self.render_skill), ("index.md", self.render_index)):
+            path = skill_dir / filename
+            if self.write_if_changed(path, render(empleaido)):
+                written.append(str(path))
+            else:
+                unchanged.append(str(path))
+        return {"id": empleaido["id"], "name": empleaido["name"], "written": written, "unchanged": unchanged}
+
+    def remove(self, empleaido: dict):
+        skill_dir = self.skill_dir(empleaido)
+        if skill_dir.exists():
+            shutil.rmtree(skill_dir)
+        self._forget(skill_dir)
+
+    def _forget(self, skill_dir: Path):
+        prefix = str(skill_dir) + os.sep
+        with self._lock:
+            for key in [k for k in self._hashes if k.startswith(prefix)]:
+                del self._hashes[key]
+
+    def _orphans(self, keep: set) -> List[Path]:
+        if not self.skills_path.exists():
+            return []
+        orphans = []
+        for entry in self.skills_path.iterdir():
+            if not entry.is_dir() or entry.name in keep:
+                continue
+            skill_file = entry / "skill.md"
+            try:
+                if skill_file.exists() and FACTORY_MARKER in skill_file.read_text():
+                    orphans.append(entry)
+            except OSError:
+                continue
+        return orphans
+
+    def reconcile(self, empleaidos: List[dict], prune: bool = True) -> dict:
+        """Deploy all `empleaidos` in parallel and optionally prune orphaned dirs"""
+        started = time.perf_counter()
+        results, errors = [], []
+
+        def deploy(empleaido):
+            try:
+                return self.deploy_one(empleaido)
+            except Exception as e:
+                return {"id": empleaido.get("id"), "error": str(e)}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for result in pool.map(deploy, empleaidos):
+                (errors if "error" in result else results).append(result)
+
+        removed = []
+        if prune:
+            keep = {empleaido["name"].lower() for empleaido in empleaidos}
+            for orphan in self._orphans(keep):
+                try:
+                    shutil.rmtree(orphan)
+                    self._forget(orphan)
+                    removed.append(str(orphan))
+                except OSError as e:
+                    errors.append({"path": str(orphan), "error": str(e)})
+
+        return {
+            "deployed": [r["id"] for r in results],
+            "changed": [r["id"] for r in results if r["written"]],
+            "written": [path for r in results for path in r["written"]],
+            "unchanged_files": sum(len(r["unchanged"]) for r in results),
+            "removed": removed,
+            "errors": errors,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
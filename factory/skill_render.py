@@ -0,0 +1,93 @@
+"""Compiled, memoized rendering of skill.md and index.md.
+
+Templates live in `templates/skills/` and are compiled once when the renderer
+is created. Rendered output is memoized by a hash of the empleaido record and
+the template version (a hash of the template sources), so redeploying an
+unchanged fleet costs a dictionary lookup per file.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined
+
+SEFIROT_CONTEXT = {
+    "Keter": "Corona - Universal consciousness, connection to source",
+    "Chochmah": "Sabiduría - Intuitive insight, creative inspiration",
+    "Binah": "Entendimiento - Analytical depth, structured processing",
+    "Chesed": "Bondad - Expansion, generosity, creative force",
+    "Gevurah": "Fuerza - Discipline, restraint, focused power",
+    "Tiferet": "Belleza - Balance, harmony, integration",
+    "Netzach": "Victoria - Endurance, confidence, momentum",
+    "Hod": "Esplendor - Detail-oriented, analytical precision",
+    "Yesod": "Fundación - Connection, transmission, foundation",
+    "Malkuth": "Reino - Manifestation, physical reality"
+}
+
+SKILL_TEMPLATE = "skill.md.j2"
+INDEX_TEMPLATE = "index.md.j2"
+
+
+class SkillRenderer:
+    """Render skill/index markdown from precompiled Jinja templates"""
+
+    def __init__(self, template_dir: Path, sanitize: Callable[[str, int], str], max_entries: int = 20000):
+        self.template_dir = Path(template_dir)
+        self.env = Environment(
+            loader=FileSystemLoader(str(self.template_dir)),
+            autoescape=False,  # Markdown output
+            keep_trailing_newline=True,
+            undefined=StrictUndefined,
+        )
+        self.env.filters["sanitize"] = sanitize
+        self.env.filters["bullet"] = lambda value: f"- {value}"
+        self.env.globals["sefirot_context"] = SEFIROT_CONTEXT
+        self.templates = {name: self.env.get_template(name) for name in (SKILL_TEMPLATE, INDEX_TEMPLATE)}
+        self.template_version = self._template_version()
+        self.max_entries = max_entries
+        self._memo: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _template_version(self) -> str:
+        digest = hashlib.sha256()
+        for name in sorted(self.templates):
+            digest.update(name.encode())
+            digest.update((self.template_dir / name).read_bytes())
+        return digest.hexdigest()[:16]
+
+    def render(self, template_name: str, empleaido: dict) -> str:
+        record_hash = hashlib.sha256(json.dumps(empleaido, sort_keys=True, default=str).encode()).hexdigest()
+        key = f"{template_name}:{self.template_version}:{record_hash}"
+        with self._lock:
+            cached = self._memo.get(key)
+            if cached is not None:
+                self._memo.move_to_end(key)
+                self.hits += 1
+                return cached
+
+        rendered = self.templates[template_name].render(empleaido=empleaido)
+        with self._lock:
+            self.misses += 1
+            self._memo[key] = rendered
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+        return rendered
+
+    def skill_md(self, empleaido: dict) -> str:
+        return self.render(SKILL_TEMPLATE, empleaido)
+
+    def index_md(self, empleaido: dict) -> str:
+        return self.render(INDEX_TEMPLATE, empleaido)
+
+    def stats(self) -> dict:
+        return {
+            "template_version": self.template_version,
+            "memoized": len(self._memo),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,399 @@
+"""SQLite storage backend for empleaidos.
+
+Same interface as `EmpleaidoStore`, backed by SQLite in WAL mode with indexes
+on id, name, status and deployed plus join tables for sefirot and skills, so
+filtered queries run in the database instead of over a Python list.
+
+Every write transaction also appends to a `changes` log keyed by data
+version. Listeners are notified from that log by `refresh()`, so a process
+also sees the writes made by other worker processes sharing the database.
+
+One-shot migration from the JSON file:
+
+    python -m factory.sqlite_store empleaidos.json empleaidos.db
+"""
+import json
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from factory.metrics import timed
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS empleaidos (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    role TEXT NOT NULL,
+    specialty TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'active',
+    created_at TEXT NOT NULL,
+    deployed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_empleaidos_name ON empleaidos (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_empleaidos_status ON empleaidos (status);
+CREATE INDEX IF NOT EXISTS idx_empleaidos_deployed ON empleaidos (deployed);
+
+CREATE TABLE IF NOT EXISTS empleaido_sefirot (
+    empleaido_id TEXT NOT NULL REFERENCES empleaidos (id) ON DELETE CASCADE,
+    sefira TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (empleaido_id, sefira)
+);
+CREATE INDEX IF NOT EXISTS idx_sefirot_sefira ON empleaido_sefirot (sefira);
+
+CREATE TABLE IF NOT EXISTS empleaido_skills (
+    empleaido_id TEXT NOT NULL REFERENCES empleaidos (id) ON DELETE CASCADE,
+    skill TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (empleaido_id, skill)
+);
+CREATE INDEX IF NOT EXISTS idx_skills_skill ON empleaido_skills (skill);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS changes (
+    version INTEGER NOT NULL,
+    op TEXT NOT NULL,
+    empleaido_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_changes_version ON changes (version);
+"""
+
+COLUMNS = ("id", "name", "role", "specialty", "status", "created_at", "deployed")
+
+# Change log rows kept for processes that fall behind; older gaps force a full reload
+CHANGES_RETAINED = 100000
+
+
+class SQLiteEmpleaidoStore:
+    """Drop-in replacement for EmpleaidoStore backed by a SQLite database"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        # Called as listener(op, record) for every put/delete from any process;
+        # op "reset" passes the full record list after a gap in the change log
+        self._listeners: List[Callable[[str, object], None]] = []
+        self._refresh_lock = threading.Lock()
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+        self._seen_version = self.version
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers run alongside a writer"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    # Row mapping
+    def _hydrate(self, rows: Iterable[sqlite3.Row]) -> List[dict]:
+        records = [
+            dict(
+                {column: row[column] for column in COLUMNS},
+                deployed=bool(row["deployed"]),
+                sefirot_activation=[],
+                skills=[],
+            )
+            for row in rows
+        ]
+        if not records:
+            return records
+        by_id = {record["id"]: record for record in records}
+        conn = self._conn()
+        for chunk in _chunks(list(by_id), 500):
+            marks = ",".join("?" * len(chunk))
+            for row in conn.execute(
+                f"SELECT empleaido_id, sefira FROM empleaido_sefirot WHERE empleaido_id IN ({marks}) ORDER BY position",
+                chunk,
+            ):
+                by_id[row[0]]["sefirot_activation"].append(row[1])
+            for row in conn.execute(
+                f"SELECT empleaido_id, skill FROM empleaido_skills WHERE empleaido_id IN ({marks}) ORDER BY position",
+                chunk,
+            ):
+                by_id[row[0]]["skills"].append(row[1])
+        # Keep the JSON field order used by the API
+        return [
+            {key: record[key] for key in (
+                "id", "name", "role", "specialty", "sefirot_activation",
+                "skills", "status", "created_at", "deployed",
+            )}
+            for record in records
+        ]
+
+    @property
+    def version(self) -> int:
+        """Data version, bumped in every write transaction (shared across processes)"""
+        row = self._conn().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return int(row[0]) if row else 0
+
+    @property
+    def epoch(self) -> str:
+        """Stable id of this database; versions only compare within one epoch"""
+        conn = self._conn()
+        with conn:
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('epoch', lower(hex(randomblob(4))))")
+        return conn.execute("SELECT value FROM meta WHERE key = 'epoch'").fetchone()[0]
+
+    def _bump_version(self, conn: sqlite3.Connection, changes: Iterable[Tuple[str, str]] = ()) -> int:
+        """Bump the data version and log `(op, id)` changes under it"""
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('version', '1') "
+            "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+        version = int(conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0])
+        conn.executemany(
+            "INSERT INTO changes (version, op, empleaido_id) VALUES (?, ?, ?)",
+            [(version, op, empleaido_id) for op, empleaido_id in changes],
+        )
+        if version % 1000 == 0:
+            conn.execute("DELETE FROM changes WHERE version <= ?", (version - CHANGES_RETAINED,))
+        return version
+
+    def _write(self, conn: sqlite3.Connection, record: dict):
+        conn.execute(
+            """
+            INSERT INTO empleaidos (id, name, role, specialty, status, created_at, deployed)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                name = excluded.name, role = excluded.role, specialty = excluded.specialty,
+                status = excluded.status, created_at = excluded.created_at, deployed = excluded.deployed
+            """,
+            (
+                record["id"], record["name"], record["role"], record["specialty"],
+                record.get("status", "active"), record.get("created_at", ""),
+                int(bool(record.get("deployed"))),
+            ),
+        )
+        conn.execute("DELETE FROM empleaido_sefirot WHERE empleaido_id = ?", (record["id"],))
+        conn.executemany(
+            "INSERT OR IGNORE INTO empleaido_sefirot (empleaido_id, sefira, position) VALUES (?, ?, ?)",
+            [(record["id"], sefira, i) for i, sefira in enumerate(record.get("sefirot_activation", []))],
+        )
+        conn.execute("DELETE FROM empleaido_skills WHERE empleaido_id = ?", (record["id"],))
+        conn.executemany(
+            "INSERT OR IGNORE INTO empleaido_skills (empleaido_id, skill, position) VALUES (?, ?, ?)",
+            [(record["id"], skill, i) for i, skill in enumerate(record.get("skills", []))],
+        )
+
+    # Reads
+    def all(self) -> List[dict]:
+        return self._hydrate(self._conn().execute("SELECT * FROM empleaidos ORDER BY seq"))
+
+    def get(self, empleaido_id: str) -> Optional[dict]:
+        records = self._hydrate(self._conn().execute("SELECT * FROM empleaidos WHERE id = ?", (empleaido_id,)))
+        return records[0] if records else None
+
+    def find_by_name(self, name: str) -> List[dict]:
+        return self._hydrate(self._conn().execute(
+            "SELECT * FROM empleaidos WHERE name = ? COLLATE NOCASE ORDER BY seq", (name,)
+        ))
+
+    def query(
+        self,
+        status: Optional[str] = None,
+        deployed: Optional[bool] = None,
+        sefirot: Optional[str] = None,
+        skill: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[dict]:
+        """Filter in SQL using the secondary indexes"""
+        return self.page(status=status, deployed=deployed, sefirot=sefirot, skill=skill, limit=limit)[0]
+
+    def page(
+        self,
+        after: int = 0,
+        limit: Optional[int] = None,
+        status: Optional[str] = None,
+        deployed: Optional[bool] = None,
+        sefirot: Optional[str] = None,
+        skill: Optional[str] = None,
+    ) -> Tuple[List[dict], Optional[int]]:
+        """Records with seq greater than `after`, plus the next-page cursor (or None)"""
+        clauses, params = ["seq > ?"], [after]
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if deployed is not None:
+            clauses.append("deployed = ?")
+            params.append(int(deployed))
+        if sefirot is not None:
+            clauses.append("id IN (SELECT empleaido_id FROM empleaido_sefirot WHERE sefira = ?)")
+            params.append(sefirot)
+        if skill is not None:
+            clauses.append("id IN (SELECT empleaido_id FROM empleaido_skills WHERE skill = ?)")
+            params.append(skill)
+        sql = "SELECT * FROM empleaidos WHERE " + " AND ".join(clauses) + " ORDER BY seq"
+        if limit is not None:
+            # Fetch one extra row to know whether another page exists
+            sql += " LIMIT ?"
+            params.append(limit + 1)
+        rows = self._conn().execute(sql, params).fetchall()
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = rows[-1]["seq"]
+        return self._hydrate(rows), next_cursor
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM empleaidos").fetchone()[0]
+
+    def summary(self) -> dict:
+        """Dashboard totals: records, active records and sefirot activations"""
+        conn = self._conn()
+        total, active = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(status = 'active'), 0) FROM empleaidos"
+        ).fetchone()
+        activations = conn.execute("SELECT COUNT(*) FROM empleaido_sefirot").fetchone()[0]
+        return {"total": total, "active": active, "sefirot_activations": activations}
+
+    # Writes
+    @timed("store_put")
+    def put(self, record: dict) -> dict:
+        record = dict(record)
+        conn = self._conn()
+        with self._write_lock, conn:
+            self._write(conn, record)
+            self._bump_version(conn, [("put", record["id"])])
+        self.refresh()
+        return record
+
+    @timed("store_put_many")
+    def put_many(self, records: List[dict]) -> List[dict]:
+        """Insert or replace a batch in a single transaction"""
+        records = [dict(record) for record in records]
+        if not records:
+            return records
+        conn = self._conn()
+        with self._write_lock, conn:
+            for record in records:
+                self._write(conn, record)
+            self._bump_version(conn, [("put", record["id"]) for record in records])
+        self.refresh()
+        return records
+
+    @timed("store_delete")
+    def delete(self, empleaido_id: str) -> Optional[dict]:
+        record = self.get(empleaido_id)
+        if record is None:
+            return None
+        conn = self._conn()
+        with self._write_lock, conn:
+            conn.execute("DELETE FROM empleaidos WHERE id = ?", (empleaido_id,))
+            self._bump_version(conn, [("delete", empleaido_id)])
+        self.refresh()
+        return record
+
+    def replace_all(self, records: List[dict]):
+        conn = self._conn()
+        with self._write_lock, conn:
+            ids = [record["id"] for record in records]
+            marks = ",".join("?" * len(ids)) or "''"
+            removed = [row[0] for row in conn.execute(f"SELECT id FROM empleaidos WHERE id NOT IN ({marks})", ids)]
+            conn.execute(f"DELETE FROM empleaidos WHERE id NOT IN ({marks})", ids)
+            for record in records:
+                self._write(conn, record)
+            self._bump_version(
+                conn,
+                [("delete", empleaido_id) for empleaido_id in removed] + [("put", record["id"]) for record in records],
+            )
+        self.refresh()
+
+    # Change notification
+    def subscribe(self, listener: Callable[[str, object], None]):
+        self._listeners.append(listener)
+
+    def _notify(self, op: str, payload):
+        for listener in self._listeners:
+            listener(op, payload)
+
+    def refresh(self) -> int:
+        """Notify listeners of changes committed since the last refresh, by any process"""
+        with self._refresh_lock:
+            version = self.version
+            if version == self._seen_version:
+                return 0
+            conn = self._conn()
+            oldest = conn.execute("SELECT MIN(version) FROM changes").fetchone()[0]
+            if oldest is None or oldest > self._seen_version + 1:
+                # Log pruned past our position (or never written): reload everything
+                self._seen_version = version
+                self._notify("reset", self.all())
+                return 1
+            rows = conn.execute(
+                "SELECT op, empleaido_id FROM changes WHERE version > ? AND version <= ? ORDER BY rowid",
+                (self._seen_version, version),
+            ).fetchall()
+            # Only the latest op per id matters; puts are re-read so they reflect the committed row
+            latest = {}
+            for op, empleaido_id in rows:
+                latest.pop(empleaido_id, None)
+                latest[empleaido_id] = op
+            put_ids = [empleaido_id for empleaido_id, op in latest.items() if op == "put"]
+            current = {}
+            for chunk in _chunks(put_ids, 500):
+                marks = ",".join("?" * len(chunk))
+                for record in self._hydrate(conn.execute(f"SELECT * FROM empleaidos WHERE id IN ({marks})", chunk)):
+                    current[record["id"]] = record
+            self._seen_version = version
+            for empleaido_id, op in latest.items():
+                if op == "put" and empleaido_id in current:
+                    self._notify("put", current[empleaido_id])
+                else:
+                    self._notify("delete", {"id": empleaido_id})
+            return len(latest)
+
+    # Migration
+    def migrate_from_json(self, json_path: Path) -> int:
+        """Import the JSON file once; later calls are no-ops"""
+        conn = self._conn()
+        done = conn.execute("SELECT value FROM meta WHERE key = 'migrated_from_json'").fetchone()
+        json_path = Path(json_path)
+        if done or not json_path.exists():
+            return 0
+        with open(json_path, "r") as f:
+            records = json.load(f)
+        with self._write_lock, conn:
+            for record in records:
+                self._write(conn, record)
+            self._bump_version(conn, [("put", record["id"]) for record in records])
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_from_json', ?)",
+                (str(json_path),),
+            )
+        return len(records)
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def stats(self) -> dict:
+        return {"backend": "sqlite", "records": len(self), "database": str(self.db_path), "version": self.version}
+
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m factory.sqlite_store <empleaidos.json> <empleaidos.db>")
+        sys.exit(1)
+    store = SQLiteEmpleaidoStore(Path(sys.argv[2]))
+    print(f"Migrated {store.migrate_from_json(Path(sys.argv[1]))} empleaidos")
@@ -0,0 +1,160 @@
+"""Content-addressed cache of transcription results.
+
+Keyed by the SHA-256 of the audio bytes plus model size and options, with an
+in-memory LRU tier in front of an on-disk tier bounded by total size.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+
+def cache_key(audio_sha256: str, model_size: str, options: Optional[dict] = None, engine: str = "whisper") -> str:
+    """Stable key for an (audio, engine, model, options) combination"""
+    material = {"audio": audio_sha256, "model": model_size, "options": options or {}}
+    if engine != "whisper":
+        # Keys of the original engine stay unchanged so existing entries remain valid
+        material["engine"] = engine
+    material = json.dumps(material, sort_keys=True)
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class TranscriptionCache:
+    """Two-tier (memory LRU + disk) store for Whisper result dicts"""
+
+    def __init__(self, directory: Path, memory_entries: int = 256, disk_max_bytes: int = 256 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.memory_entries = memory_entries
+        self.disk_max_bytes = disk_max_bytes
+        self._memory: "OrderedDict[str, dict]" = OrderedDict()
+        self._disk_index: Dict[str, list] = {}  # key -> [size_bytes, last_access]
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.seconds_saved = 0.0
+        self._load_index()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _load_index(self):
+        """Rebuild the disk index from existing cache files"""
+        if not self.directory.exists():
+            return
+        for path in self.directory.glob("*/*.json"):
+            stat = path.stat()
+            self._disk_index[path.stem] = [stat.st_size, stat.st_mtime]
+            self._disk_bytes += stat.st_size
+
+    def _remember(self, key: str, result: dict):
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            result = self._memory.get(key)
+            if result is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                self.seconds_saved += result.get("inference_seconds", 0)
+                return result
+            on_disk = key in self._disk_index
+
+        if on_disk:
+            try:
+                with open(self._path(key), "r") as f:
+                    result = json.load(f)
+            except (OSError, ValueError):
+                result = None
+            if result is not None:
+                with self._lock:
+                    if key in self._disk_index:
+                        self._disk_index[key][1] = time.time()
+                    self._remember(key, result)
+                    self.disk_hits += 1
+                    self.seconds_saved += result.get("inference_seconds", 0)
+                return result
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, result: dict):
+        data = json.dumps(result).encode()
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._remember(key, result)
+            previous = self._disk_index.get(key)
+            if previous:
+                self._disk_bytes -= previous[0]
+            self._disk_index[key] = [len(data), time.time()]
+            self._disk_bytes += len(data)
+            self.stores += 1
+            evict = self._select_evictions()
+
+        for stale in evict:
+            try:
+                os.unlink(self._path(stale))
+            except OSError:
+                pass
+
+    def _select_evictions(self):
+        """Pick least recently used disk entries until under the byte cap"""
+        if self._disk_bytes <= self.disk_max_bytes:
+            return []
+        evict = []
+        for key, (size, _) in sorted(self._disk_index.items(), key=lambda item: item[1][1]):
+            if self._disk_bytes <= self.disk_max_bytes:
+                break
+            evict.append(key)
+            self._disk_bytes -= size
+            self.evictions += 1
+        for key in evict:
+            del self._disk_index[key]
+        return evict
+
+    async def lookup(self, key: str) -> Optional[dict]:
+        """Async get: memory hits return inline, disk reads go to a thread"""
+        with self._lock:
+            in_memory = key in self._memory
+        if in_memory:
+            return self.get(key)
+        return await run_in_threadpool(self.get, key)
+
+    async def store(self, key: str, result: dict):
+        await run_in_threadpool(self.put, key, result)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "disk_entries": len(self._disk_index),
+                "disk_bytes": self._disk_bytes,
+                "disk_max_bytes": self.disk_max_bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "inference_seconds_saved": round(self.seconds_saved, 3),
+            }
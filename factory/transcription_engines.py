@@ -0,0 +1,150 @@
+"""Transcription backends behind one interface.
+
+An engine loads a model for a size name; the model's `transcribe(audio,
+**options)` takes a file path or a 16 kHz float32 array and returns a
+Whisper-style dict (`text`, `language`, `segments`). `decode(path)` turns any
+container the engine's library can read (OGG/Opus voice notes, MP3, M4A...)
+into that array, so decoding needs no library besides the engine's own.
+
+- `whisper`: openai-whisper on PyTorch (fp32 on CPU).
+- `faster-whisper`: CTranslate2 Whisper with quantized weights (int8 by
+  default), typically several times faster on CPU at a quarter the memory.
+
+Engines are described by a name and plain settings so worker processes can
+rebuild the same engine from picklable arguments.
+"""
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+# Approximate resident size (MB) of each checkpoint in fp32; int8 is about a quarter
+FP32_MODEL_MB = {
+    "tiny": 75,
+    "base": 145,
+    "small": 485,
+    "medium": 1530,
+    "large": 3090,
+    "large-v2": 3090,
+    "large-v3": 3090,
+}
+BYTES_PER_WEIGHT = {"float32": 4, "float16": 2, "int8_float32": 1, "int8_float16": 1, "int8": 1}
+
+SAMPLE_RATE = 16000
+
+# Options both engines understand; engine-specific extras are passed through
+_COMMON_OPTIONS = ("language", "task", "initial_prompt", "temperature", "beam_size", "word_timestamps")
+
+
+class TranscriptionEngine(ABC):
+    """Base class: `load(size)` returns a model with `transcribe(audio, **options)`"""
+
+    name = "base"
+
+    def __init__(self, cpu_threads: int = 0, **settings):
+        self.cpu_threads = cpu_threads  # 0 = library default
+        self.settings = settings
+
+    @abstractmethod
+    def load(self, size: str):
+        """Model for `size`"""
+
+    @abstractmethod
+    def decode(self, path: str):
+        """16 kHz mono float32 array of the audio file at `path`"""
+
+    def memory_mb(self, size: str) -> float:
+        return float(FP32_MODEL_MB.get(size, FP32_MODEL_MB["base"]))
+
+    def describe(self) -> dict:
+        return {"engine": self.name, "cpu_threads": self.cpu_threads, **self.settings}
+
+
+class WhisperEngine(TranscriptionEngine):
+    """openai-whisper (PyTorch)"""
+
+    name = "whisper"
+
+    def load(self, size: str):
+        import torch
+        import whisper
+
+        if self.cpu_threads:
+            torch.set_num_threads(self.cpu_threads)
+        return whisper.load_model(size, device=self.settings.get("device"))
+
+    def decode(self, path: str):
+        from whisper.audio import load_audio
+
+        return load_audio(path, sr=SAMPLE_RATE)
+
+
+class FasterWhisperModel:
+    """Adapts faster-whisper's segment generator to the Whisper result dict"""
+
+    def __init__(self, model):
+        self.model = model
+
+    def transcribe(self, audio, **options) -> dict:
+        kwargs = {key: options[key] for key in _COMMON_OPTIONS if key in options}
+        kwargs.update(options.get("faster_whisper", {}))
+        segments, info = self.model.transcribe(audio, **kwargs)
+        result_segments = [
+            {
+                "id": segment.id,
+                "start": round(segment.start, 3),
+                "end": round(segment.end, 3),
+                "text": segment.text,
+                "avg_logprob": segment.avg_logprob,
+                "no_speech_prob": segment.no_speech_prob,
+            }
+            for segment in segments  # decoding happens while iterating
+        ]
+        return {
+            "text": "".join(segment["text"] for segment in result_segments),
+            "language": info.language,
+            "segments": result_segments,
+        }
+
+
+class FasterWhisperEngine(TranscriptionEngine):
+    """CTranslate2 Whisper; `compute_type` selects the quantization (int8 by default)"""
+
+    name = "faster-whisper"
+
+    def __init__(self, cpu_threads: int = 0, compute_type: str = "int8", device: str = "cpu", **settings):
+        super().__init__(cpu_threads, compute_type=compute_type, device=device, **settings)
+
+    def load(self, size: str):
+        from faster_whisper import WhisperModel
+
+        return FasterWhisperModel(WhisperModel(
+            size,
+            device=self.settings["device"],
+            compute_type=self.settings["compute_type"],
+            cpu_threads=self.cpu_threads,
+            download_root=self.settings.get("download_root"),
+        ))
+
+    def decode(self, path: str):
+        from faster_whisper import decode_audio  # PyAV, no ffmpeg binary needed
+
+        return decode_audio(path, sampling_rate=SAMPLE_RATE)
+
+    def memory_mb(self, size: str) -> float:
+        weight_bytes = BYTES_PER_WEIGHT.get(self.settings["compute_type"], 1)
+        return super().memory_mb(size) * weight_bytes / 4
+
+
+ENGINES: Dict[str, type] = {
+    WhisperEngine.name: WhisperEngine,
+    FasterWhisperEngine.name: FasterWhisperEngine,
+    "ctranslate2": FasterWhisperEngine,
+}
+
+
+def create_engine(name: str, settings: Optional[dict] = None) -> TranscriptionEngine:
+    """Build an engine by name; raises ValueError for unknown names"""
+    try:
+        engine_class = ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Unknown transcription engine '{name}' (available: {', '.join(sorted(ENGINES))})")
+    return engine_class(**(settings or {}))
@@ -0,0 +1,527 @@
+"""Asynchronous transcription jobs backed by a bounded worker pool.
+
+Inference runs outside the event loop: in worker processes when `workers > 0`,
+or on a single background thread sharing the API's model registry otherwise.
+
+With `state_dir` set, job states are also published as JSON files so that any
+API worker process can answer polls for a job submitted to another one.
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import re
+import secrets
+import tempfile
+import threading
+import time
+from concurrent.futures import CancelledError, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from factory.audio_preprocess import preprocess
+from factory.metrics import REGISTRY, observe_operation
+from factory.transcription_engines import create_engine
+from factory.whisper_models import WhisperModelRegistry
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+# Registry owned by each worker process (or the API process in thread mode)
+_worker_registry: Optional[WhisperModelRegistry] = None
+# Holds each warm-up job until every worker has one, so no worker warms up twice
+_warm_up_barrier = None
+
+AUDIO_SECONDS = REGISTRY.counter(
+    "empleaido_transcription_audio_seconds_total", "Decoded audio before and after silence trimming", ("stage",)
+)
+INFERENCE_SAVED_SECONDS = REGISTRY.counter(
+    "empleaido_transcription_inference_saved_seconds_total",
+    "Estimated inference time avoided by silence trimming",
+)
+
+
+class QueueFullError(Exception):
+    """Raised when the pending job count has reached `max_queue_depth`"""
+
+
+def _init_worker(sizes, memory_cap_mb, preload, engine_name, engine_settings, warm_up_barrier=None):
+    global _worker_registry, _warm_up_barrier
+    _warm_up_barrier = warm_up_barrier
+    engine = create_engine(engine_name, engine_settings)
+    _worker_registry = WhisperModelRegistry(sizes, memory_cap_mb=memory_cap_mb, engine=engine)
+    if preload:
+        _worker_registry.preload()
+
+
+def run_transcription(
+    audio_path: str,
+    model_size: str,
+    options: Optional[dict] = None,
+    decode: bool = False,
+    vad: Optional[dict] = None,
+) -> dict:
+    """Worker entry point: transcribe `audio_path` with the resident model.
+
+    With `decode`, the file is decoded once here and the model gets the
+    array; `vad` (trim_silence settings) also cuts long silences first.
+    """
+    started_at = time.time()
+    loads = _worker_registry.loads
+    clock = time.perf_counter()
+    model = _worker_registry.get(model_size)
+    # Timings travel back with the result; worker processes have no metrics endpoint
+    timings = {"model_load": time.perf_counter() - clock if _worker_registry.loads != loads else None}
+    audio, prepared, report = audio_path, None, None
+    if decode:
+        prepared = preprocess(audio_path, vad, _worker_registry.engine.decode)
+        audio = prepared.audio
+        timings["audio_decode"] = prepared.report["decode_seconds"]
+        timings["audio_vad"] = prepared.report["vad_seconds"] if vad is not None else None
+    clock = time.perf_counter()
+    if prepared is not None and len(audio) == 0:
+        result = {"text": "", "language": "unknown", "segments": []}  # nothing but silence
+    else:
+        result = model.transcribe(audio, **(options or {}))
+    timings["model_transcribe"] = time.perf_counter() - clock
+    if prepared is not None:
+        result = prepared.time_map.remap(result)
+        report = dict(prepared.report)
+        speech, removed = report["speech_seconds"], report["audio_seconds"] - report["speech_seconds"]
+        # Whisper's cost grows with audio length: extrapolate this run's real-time factor
+        report["inference_saved_seconds"] = (
+            round(timings["model_transcribe"] / speech * removed, 3) if speech > 0 else None
+        )
+    return {
+        "result": {
+            "text": result.get("text", ""),
+            "language": result.get("language", "unknown"),
+            "segments": result.get("segments", []),
+        },
+        "started_at": started_at,
+        "finished_at": time.time(),
+        "pid": os.getpid(),
+        "timings": timings,
+        "preprocess": report,
+        "models": _worker_registry.stats(),
+    }
+
+
+def warm_up_worker(preload: bool, timeout: float = 600) -> dict:
+    """Worker entry point run once per worker at startup; reports its registry"""
+    if preload:
+        _worker_registry.preload()
+    if _warm_up_barrier is not None:
+        try:
+            _warm_up_barrier.wait(timeout)
+        except threading.BrokenBarrierError:
+            pass
+    return {"pid": os.getpid(), "models": _worker_registry.stats()}
+
+
+class TranscriptionJob:
+    """A single submitted transcription and its timing"""
+
+    def __init__(
+        self,
+        audio_path: str,
+        model_size: str,
+        options: Optional[dict],
+        cleanup: bool,
+        audio_seconds: Optional[float] = None,
+    ):
+        self.id = secrets.token_urlsafe(12)
+        self.audio_path = audio_path
+        self.model_size = model_size
+        self.audio_seconds = audio_seconds
+        self.options = options or {}
+        self.cleanup = cleanup
+        self.status = JOB_QUEUED
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.running_since: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.future: Optional[Future] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+    def to_dict(self) -> dict:
+        status = self.status
+        if status == JOB_QUEUED and self.future is not None and self.future.running():
+            status = JOB_RUNNING
+        timing = {"submitted_at": self.submitted_at, "started_at": self.started_at, "finished_at": self.finished_at}
+        if self.started_at:
+            timing["queue_seconds"] = round(self.started_at - self.submitted_at, 3)
+        if self.started_at and self.finished_at:
+            timing["run_seconds"] = round(self.finished_at - self.started_at, 3)
+        data = {"id": self.id, "status": status, "model": self.model_size, "timing": timing}
+        if self.result is not None:
+            data["result"] = self.result
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+class PublishedJob:
+    """Read-only view of a job owned by another API worker process"""
+
+    remote = True
+
+    def __init__(self, data: dict):
+        self.id = data["id"]
+        self.data = data
+
+    @property
+    def finished(self) -> bool:
+        return self.data.get("status") in (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+    def to_dict(self) -> dict:
+        return self.data
+
+
+class TranscriptionJobQueue:
+    """Bounded queue of transcription jobs executed by a worker pool"""
+
+    def __init__(
+        self,
+        model_sizes,
+        workers: int = 1,
+        max_queue_depth: int = 32,
+        memory_cap_mb: Optional[float] = None,
+        preload: bool = False,
+        retention_seconds: int = 3600,
+        registry: Optional[WhisperModelRegistry] = None,
+        state_dir: Optional[Path] = None,
+        decode: bool = False,
+        vad: Optional[dict] = None,
+        engine: str = "whisper",
+        engine_settings: Optional[dict] = None,
+    ):
+        self.model_sizes = list(model_sizes)
+        self.workers = workers
+        self.max_queue_depth = max_queue_depth
+        self.memory_cap_mb = memory_cap_mb
+        self.preload = preload
+        self.retention_seconds = retention_seconds
+        self.registry = registry
+        self.state_dir = Path(state_dir) if state_dir else None
+        self.decode = decode
+        self.engine = engine
+        self.engine_settings = dict(engine_settings or {})
+        self.vad = dict(vad) if vad is not None else None
+        if self.state_dir:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+        self._executor: Optional[Executor] = None
+        self._jobs: Dict[str, TranscriptionJob] = {}
+        self._unfinished: Dict[str, TranscriptionJob] = {}  # until the worker lets go, even if cancelled
+        self._listeners: List[Callable[[TranscriptionJob, dict], None]] = []
+        self._worker_models: Dict[int, dict] = {}  # pid -> registry stats last reported by that worker
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self.audio_seconds = 0.0
+        self.speech_seconds = 0.0
+        self.inference_saved_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.workers > 0:
+                context = multiprocessing.get_context("spawn")
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(
+                        self.model_sizes, self.memory_cap_mb, self.preload, self.engine, self.engine_settings,
+                        context.Barrier(self.workers),
+                    ),
+                )
+            else:
+                # Thread mode shares the API process registry
+                global _worker_registry
+                _worker_registry = self.registry or WhisperModelRegistry(
+                    self.model_sizes,
+                    memory_cap_mb=self.memory_cap_mb,
+                    engine=create_engine(self.engine, self.engine_settings),
+                )
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper")
+        return self._executor
+
+    def start(self) -> List[Future]:
+        """Create the pool now and warm up every worker (loads the models when `preload`)
+
+        Spawning and model loading happen at startup instead of on the first
+        request. Each warm-up reports the worker's registry for `model_stats()`.
+        """
+        executor = self._get_executor()
+        warm_ups = [executor.submit(warm_up_worker, self.preload) for _ in range(max(1, self.workers))]
+        for future in warm_ups:
+            future.add_done_callback(self._on_warmed_up)
+        return warm_ups
+
+    def _on_warmed_up(self, future: Future):
+        try:
+            output = future.result()
+        except Exception as e:
+            print(f"Error warming up transcription worker: {e}")
+            return
+        with self._lock:
+            self._worker_models[output["pid"]] = output["models"]
+
+    def model_stats(self) -> dict:
+        """Model registry as the workers report it (the shared registry in thread mode)"""
+        if self.workers == 0:
+            registry = self.registry or _worker_registry
+            return dict(registry.stats(), mode="thread") if registry else {"mode": "thread", "workers": {}}
+        with self._lock:
+            workers = {str(pid): stats for pid, stats in self._worker_models.items()}
+        return {
+            "mode": "process",
+            "configured_sizes": self.model_sizes,
+            "memory_cap_mb": self.memory_cap_mb,
+            "resident_mb": self.resident_mb(),
+            "workers": workers,
+        }
+
+    def resident_mb(self) -> float:
+        """Model memory resident across all workers"""
+        if self.workers == 0:
+            registry = self.registry or _worker_registry
+            return registry.resident_mb() if registry else 0.0
+        with self._lock:
+            return round(sum(stats["resident_mb"] for stats in self._worker_models.values()), 1)
+
+    def pending(self) -> int:
+        return sum(1 for job in self._unfinished.values() if not job.finished)
+
+    def submit(
+        self,
+        audio_path: str,
+        model_size: str,
+        options: Optional[dict] = None,
+        cleanup: bool = True,
+        audio_seconds: Optional[float] = None,
+    ) -> TranscriptionJob:
+        """Queue a transcription; raises QueueFullError when at capacity"""
+        with self._lock:
+            self._prune()
+            if self.pending() >= self.max_queue_depth:
+                self.rejected += 1
+                raise QueueFullError(f"Transcription queue is full ({self.max_queue_depth} pending)")
+            job = TranscriptionJob(audio_path, model_size, options, cleanup, audio_seconds)
+            self._jobs[job.id] = job
+            self._unfinished[job.id] = job
+            self.submitted += 1
+
+        self._publish(job)
+        job.future = self._get_executor().submit(
+            run_transcription, audio_path, model_size, job.options, self.decode, self.vad
+        )
+        job.future.add_done_callback(lambda future: self._on_done(job, future))
+        return job
+
+    def subscribe(self, listener: Callable[[TranscriptionJob, dict], None]):
+        """Call `listener(job, output)` for every job that completes successfully"""
+        self._listeners.append(listener)
+
+    def backlog(self) -> List[Tuple[str, Optional[float], float]]:
+        """(model size, audio seconds, seconds running) of each job still holding or awaiting a worker"""
+        now = time.time()
+        with self._lock:
+            jobs = [job for job in self._unfinished.values() if job.future is not None]
+        backlog = []
+        for job in jobs:
+            if job.future.running() and job.running_since is None:
+                job.running_since = now  # first seen running; workers report the exact start only at the end
+            backlog.append((job.model_size, job.audio_seconds, now - job.running_since if job.running_since else 0.0))
+        return backlog
+
+    def _on_done(self, job: TranscriptionJob, future: Future):
+        output = None
+        with self._lock:
+            if job.status == JOB_CANCELLED:
+                pass
+            elif future.cancelled():
+                job.status = JOB_CANCELLED
+                self.cancelled += 1
+            else:
+                try:
+                    output = future.result()
+                    job.result = output["result"]
+                    job.started_at = output["started_at"]
+                    for operation, seconds in output.get("timings", {}).items():
+                        observe_operation(operation, seconds)
+                    self._record_preprocess(output.get("preprocess"))
+                    if output.get("models") is not None:
+                        self._worker_models[output["pid"]] = output["models"]
+                    job.status = JOB_DONE
+                    self.completed += 1
+                except CancelledError:
+                    job.status = JOB_CANCELLED
+                    self.cancelled += 1
+                except Exception as e:
+                    job.error = str(e)
+                    job.status = JOB_FAILED
+                    self.failed += 1
+            job.finished_at = time.time()
+            self._unfinished.pop(job.id, None)
+        self._publish(job)
+        if job.status == JOB_DONE:
+            for listener in self._listeners:
+                listener(job, output)
+        if job.cleanup and os.path.exists(job.audio_path):
+            try:
+                os.unlink(job.audio_path)
+            except OSError:
+                pass
+
+    def _record_preprocess(self, report: Optional[dict]):
+        """Accumulate audio and inference time saved by trimming (called under the lock)"""
+        if not report:
+            return
+        saved = report.get("inference_saved_seconds") or 0.0
+        self.audio_seconds += report["audio_seconds"]
+        self.speech_seconds += report["speech_seconds"]
+        self.inference_saved_seconds += saved
+        AUDIO_SECONDS.inc("decoded", amount=report["audio_seconds"])
+        AUDIO_SECONDS.inc("speech", amount=report["speech_seconds"])
+        INFERENCE_SAVED_SECONDS.inc(amount=saved)
+
+    def _prune(self):
+        """Forget finished jobs older than the retention window"""
+        cutoff = time.time() - self.retention_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+        if self.state_dir:
+            for path in self.state_dir.glob("*.json"):
+                try:
+                    if path.stat().st_mtime < cutoff:
+                        path.unlink()
+                except OSError:
+                    pass
+
+    # Cross-process job state
+    def _state_path(self, job_id: str) -> Optional[Path]:
+        if self.state_dir is None or not re.match(r"^[\w\-]+$", job_id):
+            return None
+        return self.state_dir / f"{job_id}.json"
+
+    def _publish(self, job: TranscriptionJob):
+        path = self._state_path(job.id)
+        if path is None:
+            return
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{job.id}.", dir=self.state_dir)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(job.to_dict(), f)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def _load_published(self, job_id: str) -> Optional[PublishedJob]:
+        path = self._state_path(job_id)
+        if path is None:
+            return None
+        try:
+            with open(path, "r") as f:
+                return PublishedJob(json.load(f))
+        except (OSError, ValueError):
+            return None
+
+    def get(self, job_id: str) -> Optional[Union[TranscriptionJob, PublishedJob]]:
+        """A local job, or the published state of one owned by another process"""
+        return self._jobs.get(job_id) or self._load_published(job_id)
+
+    def cancel(self, job_id: str) -> Optional[TranscriptionJob]:
+        """Cancel a job; a running job finishes in its worker but is discarded"""
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return job
+        if not job.future.cancel():
+            with self._lock:
+                job.status = JOB_CANCELLED
+                job.finished_at = time.time()
+                self.cancelled += 1
+            self._publish(job)
+        return job
+
+    async def wait(self, job: TranscriptionJob, timeout: Optional[float] = None) -> TranscriptionJob:
+        """Long-poll helper: wait up to `timeout` seconds for the job to finish"""
+        if job.finished:
+            return job
+        if isinstance(job, PublishedJob):
+            deadline = time.monotonic() + (timeout or 0)
+            while not job.finished and time.monotonic() < deadline:
+                await asyncio.sleep(0.1)
+                job = self._load_published(job.id) or job
+            return job
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job.future)), timeout)
+        except (asyncio.TimeoutError, CancelledError, Exception):
+            pass
+        # Give the done callback a chance to record the outcome
+        for _ in range(10):
+            if job.finished or not job.future.done():
+                break
+            await asyncio.sleep(0.01)
+        return job
+
+    async def run(
+        self,
+        audio_path: str,
+        model_size: str,
+        options: Optional[dict] = None,
+        cleanup: bool = True,
+        audio_seconds: Optional[float] = None,
+    ) -> dict:
+        """Submit and await a job, returning the Whisper-style result dict"""
+        job = self.submit(audio_path, model_size, options, cleanup, audio_seconds)
+        await self.wait(job)
+        if job.status == JOB_FAILED:
+            raise RuntimeError(job.error)
+        if job.status != JOB_DONE:
+            raise RuntimeError(f"Transcription job {job.status}")
+        return job.result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "mode": "process" if self.workers > 0 else "thread",
+                "engine": self.engine,
+                "pending": self.pending(),
+                "max_queue_depth": self.max_queue_depth,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "rejected": self.rejected,
+                "preprocess": {
+                    "decode": self.decode,
+                    "vad": self.vad,
+                    "audio_seconds": round(self.audio_seconds, 3),
+                    "speech_seconds": round(self.speech_seconds, 3),
+                    "audio_seconds_saved": round(self.audio_seconds - self.speech_seconds, 3),
+                    "inference_seconds_saved": round(self.inference_saved_seconds, 3),
+                },
+            }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,200 @@
+"""Streaming multipart uploads and audio header probing.
+
+The request body is parsed chunk-by-chunk and the file part is written straight
+to a spool file on disk, so memory per upload stays constant.
+"""
+import hashlib
+import os
+import struct
+import tempfile
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+ALLOWED_AUDIO_SUFFIXES = {".wav", ".ogg", ".oga", ".opus", ".mp3", ".m4a", ".webm", ".flac"}
+
+
+class UploadError(Exception):
+    """Malformed or missing upload (HTTP 400)"""
+
+
+class UploadTooLargeError(UploadError):
+    """Upload exceeded the configured byte limit (HTTP 413)"""
+
+
+class SpooledUpload:
+    """An uploaded file written to disk; the caller owns `path`"""
+
+    def __init__(self, path: str, filename: str, size: int, sha256: Optional[str] = None):
+        self.path = path
+        self.filename = filename
+        self.size = size
+        self.sha256 = sha256
+
+    def discard(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _suffix_for(filename: str, default: str) -> str:
+    suffix = os.path.splitext(filename or "")[1].lower()
+    return suffix if suffix in ALLOWED_AUDIO_SUFFIXES else default
+
+
+async def stream_upload_to_disk(
+    request,
+    field: str = "file",
+    max_bytes: int = 25 * 1024 * 1024,
+    default_suffix: str = ".wav",
+) -> SpooledUpload:
+    """Stream the `field` file part of a multipart request into a temp file"""
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise UploadError("Expected multipart/form-data upload")
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + 64 * 1024:
+        raise UploadTooLargeError(f"Upload exceeds {max_bytes} bytes")
+
+    state = {"header_field": b"", "header_value": b"", "headers": {}, "events": []}
+
+    def on_header_field(data, start, end):
+        state["header_field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        state["header_value"] += data[start:end]
+
+    def on_header_end():
+        state["headers"][state["header_field"].lower()] = state["header_value"]
+        state["header_field"] = b""
+        state["header_value"] = b""
+
+    def on_headers_finished():
+        _, options = parse_options_header(state["headers"].get(b"content-disposition", b""))
+        state["events"].append(("part", options))
+        state["headers"] = {}
+
+    def on_part_data(data, start, end):
+        state["events"].append(("data", bytes(data[start:end])))
+
+    parser = MultipartParser(params[b"boundary"], {
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+    })
+
+    spool = None
+    filename = ""
+    size = 0
+    digest = hashlib.sha256()
+    writing = False
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            events, state["events"] = state["events"], []
+            for kind, value in events:
+                if kind == "part":
+                    name = value.get(b"name", b"").decode("latin-1")
+                    writing = name == field and spool is None and b"filename" in value
+                    if writing:
+                        filename = value[b"filename"].decode("utf-8", "replace")
+                        spool = tempfile.NamedTemporaryFile(
+                            delete=False, suffix=_suffix_for(filename, default_suffix)
+                        )
+                elif writing:
+                    size += len(value)
+                    if size > max_bytes:
+                        raise UploadTooLargeError(f"Upload exceeds {max_bytes} bytes")
+                    digest.update(value)
+                    await run_in_threadpool(spool.write, value)
+        parser.finalize()
+    except Exception:
+        if spool is not None:
+            spool.close()
+            os.unlink(spool.name)
+        raise
+
+    if spool is None:
+        raise UploadError(f"No '{field}' file provided")
+    spool.close()
+    return SpooledUpload(spool.name, filename, size, digest.hexdigest())
+
+
+# Audio header probing
+def _wav_duration(f) -> Optional[float]:
+    header = f.read(12)
+    if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        return None
+    byte_rate = None
+    while True:
+        chunk = f.read(8)
+        if len(chunk) < 8:
+            return None
+        chunk_id, chunk_size = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+        if chunk_id == b"fmt ":
+            fmt = f.read(chunk_size)
+            byte_rate = struct.unpack("<I", fmt[8:12])[0]
+            if chunk_size % 2:
+                f.read(1)
+        elif chunk_id == b"data":
+            if not byte_rate:
+                return None
+            if chunk_size == 0xFFFFFFFF:  # streamed WAV with unknown length
+                chunk_size = os.fstat(f.fileno()).st_size - f.tell()
+            return chunk_size / byte_rate
+        else:
+            f.seek(chunk_size + (chunk_size % 2), os.SEEK_CUR)
+
+
+def _ogg_duration(f) -> Optional[float]:
+    first = f.read(4096)
+    if first[:4] != b"OggS":
+        return None
+    # Identification header follows the 27-byte page header and segment table
+    body = first[27 + first[26]:]
+    if body.startswith(b"OpusHead"):
+        sample_rate = 48000
+        pre_skip = struct.unpack("<H", body[10:12])[0]
+    elif body.startswith(b"\x01vorbis"):
+        sample_rate = struct.unpack("<I", body[12:16])[0]
+        pre_skip = 0
+    else:
+        return None
+
+    size = os.fstat(f.fileno()).st_size
+    f.seek(max(0, size - 65536))
+    tail = f.read()
+    last = tail.rfind(b"OggS")
+    if last < 0 or len(tail) < last + 14 or not sample_rate:
+        return None
+    granule = struct.unpack("<q", tail[last + 6:last + 14])[0]
+    return max(0, granule - pre_skip) / sample_rate
+
+
+def probe_audio_duration(path: str) -> Optional[float]:
+    """Read the duration in seconds from a WAV or Ogg header, None if unknown"""
+    try:
+        with open(path, "rb") as f:
+            duration = _wav_duration(f)
+            if duration is None:
+                f.seek(0)
+                duration = _ogg_duration(f)
+        return round(duration, 3) if duration is not None else None
+    except (OSError, struct.error, IndexError):
+        return None
@@ -0,0 +1,361 @@
+"""Outbound WhatsApp replies: split, queue, and send in order with retries.
+
+The webhook enqueues a reply and returns; a few asyncio workers deliver it
+through one pooled keep-alive client. Text longer than `max_chars` (4096 on
+WhatsApp) is split on sentence boundaries, then word boundaries, and the
+parts of a reply are sent in order.
+
+Replies wait in a mailbox per recipient, and a worker takes a whole mailbox,
+so messages to one recipient never overlap or reorder and are spaced by
+`min_interval` seconds (the provider's per-user pair rate). Other recipients
+are served by the remaining workers in the meantime.
+
+429, 5xx and network errors are retried with exponential backoff and full
+jitter, honouring Retry-After; any other 4xx fails the reply immediately.
+Requests use the Meta Cloud API text-message shape, so a local stand-in
+server accepting that JSON is enough to exercise the whole path.
+"""
+import asyncio
+import random
+import re
+import secrets
+import time
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+
+import httpx
+
+from factory.metrics import REGISTRY
+
+REPLY_QUEUED = "queued"
+REPLY_SENDING = "sending"
+REPLY_DELIVERED = "delivered"
+REPLY_FAILED = "failed"
+
+# Sentence ends (., !, ?, ellipsis) followed by whitespace, or a blank line
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?…])\s+|\n\s*\n")
+
+OUTBOUND_MESSAGES = REGISTRY.counter(
+    "empleaido_whatsapp_outbound_messages_total", "Outbound WhatsApp message parts by outcome", ("outcome",)
+)
+OUTBOUND_SEND_SECONDS = REGISTRY.histogram(
+    "empleaido_whatsapp_outbound_send_seconds", "Provider API latency per outbound message part"
+)
+
+
+class OutboxFullError(Exception):
+    """Raised when `max_queue` replies are already waiting"""
+
+
+def split_message(text: str, max_chars: int = 4096) -> List[str]:
+    """Split `text` into parts of at most `max_chars`, preferring sentence boundaries"""
+    text = text.strip()
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    parts, current = [], ""
+    for piece in _pieces(text, max_chars):
+        if current and len(current) + 1 + len(piece) > max_chars:
+            parts.append(current)
+            current = piece
+        else:
+            current = f"{current} {piece}" if current else piece
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _pieces(text: str, max_chars: int):
+    for sentence in _SENTENCE_BREAK.split(text):
+        sentence = sentence.strip()
+        if len(sentence) <= max_chars:
+            if sentence:
+                yield sentence
+            continue
+        # Run-on sentence: fall back to words, and hard-cut words that are still too long
+        for word in sentence.split():
+            while len(word) > max_chars:
+                yield word[:max_chars]
+                word = word[max_chars:]
+            yield word
+
+
+class OutboundReply:
+    """One reply to a recipient and its delivery progress"""
+
+    def __init__(self, recipient: str, parts: List[str], reply_to: Optional[str] = None):
+        self.id = secrets.token_urlsafe(12)
+        self.recipient = recipient
+        self.parts = parts
+        self.reply_to = reply_to
+        self.status = REPLY_QUEUED
+        self.sent = 0
+        self.attempts = 0
+        self.error: Optional[str] = None
+        self.provider_ids: List[str] = []
+        self.queued_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "reply_id": self.id,
+            "status": self.status,
+            "parts": len(self.parts),
+            "sent": self.sent,
+            "attempts": self.attempts,
+            "error": self.error,
+            "provider_ids": self.provider_ids,
+            "queued_at": self.queued_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class WhatsAppOutbox:
+    """Per-recipient ordered, paced delivery of replies through the provider API"""
+
+    def __init__(
+        self,
+        api_url: str,
+        token: Optional[str] = None,
+        workers: int = 8,
+        max_queue: int = 1000,
+        max_chars: int = 4096,
+        min_interval: float = 1.0,
+        max_attempts: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        timeout: float = 10.0,
+        max_connections: int = 20,
+        retain: int = 1000,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self.api_url = api_url
+        self.headers = {"Authorization": f"Bearer {token}"} if token else {}
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.max_chars = max_chars
+        self.min_interval = min_interval
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.timeout = httpx.Timeout(timeout, connect=min(timeout, 5.0))
+        self.retain = retain
+        self._sleep = sleep
+        self._client: Optional[httpx.AsyncClient] = None
+        self._mailboxes: Dict[str, Deque[OutboundReply]] = {}
+        # recipient -> earliest next send; ordered by that time, so expired entries sit at the front
+        self._next_send: "OrderedDict[str, float]" = OrderedDict()
+        self._replies: "OrderedDict[str, OutboundReply]" = OrderedDict()
+        self._ready: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._idle: Optional[asyncio.Event] = None
+        self.pending = 0
+        self.delivered = 0
+        self.failed = 0
+        self.rejected = 0
+        self.parts_sent = 0
+        self.retries = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_url)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+        return self._client
+
+    def start(self):
+        """Start the workers on the running event loop (idempotent)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._tasks:
+            return
+        self._loop = loop
+        self._ready = asyncio.Queue()
+        self._idle = asyncio.Event()
+        if self.pending == 0:
+            self._idle.set()
+        # Mailboxes left by a previous loop are handed to the new workers
+        for recipient in self._mailboxes:
+            self._ready.put_nowait(recipient)
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    def enqueue(self, recipient: str, text: str, reply_to: Optional[str] = None) -> OutboundReply:
+        """Queue `text` for `recipient`; raises OutboxFullError when the queue is at capacity"""
+        if self.pending >= self.max_queue:
+            self.rejected += 1
+            raise OutboxFullError(f"Outbound queue is full ({self.max_queue} replies waiting)")
+        self.start()
+        reply = OutboundReply(recipient, split_message(text, self.max_chars), reply_to)
+        self._remember(reply)
+        if not reply.parts:
+            self._finish(reply, REPLY_DELIVERED, count=False)
+            return reply
+        self.pending += 1
+        self._idle.clear()
+        mailbox = self._mailboxes.get(recipient)
+        if mailbox is None:
+            self._mailboxes[recipient] = deque([reply])
+            self._ready.put_nowait(recipient)
+        else:
+            mailbox.append(reply)
+        return reply
+
+    def get(self, reply_id: str) -> Optional[OutboundReply]:
+        return self._replies.get(reply_id)
+
+    def _remember(self, reply: OutboundReply):
+        self._replies[reply.id] = reply
+        while len(self._replies) > self.retain:
+            oldest_id, oldest = next(iter(self._replies.items()))
+            if oldest.finished_at is None:
+                break
+            del self._replies[oldest_id]
+
+    async def _worker(self):
+        while True:
+            recipient = await self._ready.get()
+            mailbox = self._mailboxes[recipient]
+            while mailbox:
+                reply = mailbox.popleft()
+                try:
+                    await self._deliver(reply)
+                except Exception as e:
+                    reply.error = f"{type(e).__name__}: {e}"
+                    self._finish(reply, REPLY_FAILED)
+                finally:
+                    self.pending -= 1
+            del self._mailboxes[recipient]
+            self._prune_pacing()
+            if self.pending == 0:
+                self._idle.set()
+
+    async def _deliver(self, reply: OutboundReply):
+        reply.status = REPLY_SENDING
+        while reply.sent < len(reply.parts):
+            wait = self._next_send.get(reply.recipient, 0.0) - time.monotonic()
+            if wait > 0:
+                await self._sleep(wait)
+            ok = await self._send_part(reply, reply.sent)
+            self._next_send[reply.recipient] = time.monotonic() + self.min_interval
+            self._next_send.move_to_end(reply.recipient)
+            if not ok:
+                self._finish(reply, REPLY_FAILED)
+                return
+            reply.sent += 1
+        self._finish(reply, REPLY_DELIVERED)
+
+    def _prune_pacing(self):
+        """Forget recipients whose pacing interval has passed; they can be sent to right away"""
+        now = time.monotonic()
+        while self._next_send:
+            recipient, next_send = next(iter(self._next_send.items()))
+            if next_send > now:
+                break
+            del self._next_send[recipient]
+
+    async def _send_part(self, reply: OutboundReply, index: int) -> bool:
+        body = {
+            "messaging_product": "whatsapp",
+            "recipient_type": "individual",
+            "to": reply.recipient,
+            "type": "text",
+            "text": {"preview_url": False, "body": reply.parts[index]},
+        }
+        if reply.reply_to and index == 0:
+            body["context"] = {"message_id": reply.reply_to}
+
+        for attempt in range(1, self.max_attempts + 1):
+            reply.attempts += 1
+            retry_after = None
+            clock = time.perf_counter()
+            try:
+                response = await self.client.post(self.api_url, json=body, headers=self.headers)
+            except httpx.HTTPError as e:
+                reply.error = f"{type(e).__name__}: {e}"
+            else:
+                OUTBOUND_SEND_SECONDS.observe(time.perf_counter() - clock)
+                if response.status_code < 300:
+                    reply.error = None
+                    reply.provider_ids.append(self._message_id(response))
+                    self.parts_sent += 1
+                    OUTBOUND_MESSAGES.inc("sent")
+                    return True
+                reply.error = f"Provider returned HTTP {response.status_code}"
+                if response.status_code != 429 and response.status_code < 500:
+                    break
+                retry_after = self._retry_after(response)
+            if attempt == self.max_attempts:
+                break
+            self.retries += 1
+            OUTBOUND_MESSAGES.inc("retried")
+            await self._sleep(self._backoff(attempt, retry_after))
+        OUTBOUND_MESSAGES.inc("failed")
+        return False
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        if retry_after is not None:
+            return min(self.backoff_max, retry_after)
+        # Full jitter keeps recipients that failed together from retrying together
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> Optional[float]:
+        try:
+            return max(0.0, float(response.headers["retry-after"]))
+        except (KeyError, ValueError):
+            return None
+
+    @staticmethod
+    def _message_id(response: httpx.Response) -> str:
+        try:
+            return response.json()["messages"][0]["id"]
+        except (ValueError, KeyError, IndexError, TypeError):
+            return ""
+
+    def _finish(self, reply: OutboundReply, status: str, count: bool = True):
+        reply.status = status
+        reply.finished_at = time.time()
+        if count and status == REPLY_DELIVERED:
+            self.delivered += 1
+        elif count:
+            self.failed += 1
+
+    async def drain(self, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for queued replies; True when none are left"""
+        if self._idle is None or self.pending == 0:
+            return True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "pending": self.pending,
+            "recipients_waiting": len(self._mailboxes),
+            "recipients_paced": len(self._next_send),
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "parts_sent": self.parts_sent,
+            "retries": self.retries,
+            "workers": self.workers,
+            "min_interval": self.min_interval,
+        }
+
+    async def aclose(self, timeout: float = 5.0):
+        """Give queued replies `timeout` seconds to go out, then stop the workers"""
+        await self.drain(timeout)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
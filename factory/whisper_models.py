@@ -0,0 +1,131 @@
+"""Process-wide Whisper model registry.
+
+Loads each model size once through the configured transcription engine, keeps
+it resident and evicts the least recently used size when the configured
+memory cap would be exceeded.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from factory.transcription_engines import TranscriptionEngine, WhisperEngine
+
+DEFAULT_MODEL_SIZE = "base"
+
+
+def _estimate_mb(model, size: str, engine: TranscriptionEngine) -> float:
+    """Measure parameter memory when the model exposes it, else ask the engine"""
+    try:
+        total = sum(p.numel() * p.element_size() for p in model.parameters())
+        if total:
+            return total / (1024 * 1024)
+    except Exception:
+        pass
+    return engine.memory_mb(size)
+
+
+class WhisperModelRegistry:
+    """Thread-safe LRU cache of loaded Whisper models keyed by size"""
+
+    def __init__(
+        self,
+        sizes: Optional[List[str]] = None,
+        memory_cap_mb: Optional[float] = None,
+        loader: Optional[Callable[[str], object]] = None,
+        engine: Optional[TranscriptionEngine] = None,
+    ):
+        self.sizes = list(sizes or [DEFAULT_MODEL_SIZE])
+        self.memory_cap_mb = memory_cap_mb
+        self.engine = engine or WhisperEngine()
+        self._loader = loader or self.engine.load
+        self._models: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def _validate(self, size: str):
+        if size not in self.sizes:
+            raise ValueError(f"Whisper model size '{size}' is not configured")
+
+    def get(self, size: str = DEFAULT_MODEL_SIZE):
+        """Return the resident model for `size`, loading it on first use"""
+        self._validate(size)
+        with self._lock:
+            entry = self._models.get(size)
+            if entry:
+                self._models.move_to_end(size)
+                entry["last_used"] = time.time()
+                self.hits += 1
+                return entry["model"]
+            load_lock = self._load_locks.setdefault(size, threading.Lock())
+
+        # Only one thread loads a given size; the rest wait and reuse it
+        with load_lock:
+            with self._lock:
+                entry = self._models.get(size)
+                if entry:
+                    self._models.move_to_end(size)
+                    self.hits += 1
+                    return entry["model"]
+
+            started = time.perf_counter()
+            model = self._loader(size)
+            load_seconds = time.perf_counter() - started
+            memory_mb = _estimate_mb(model, size, self.engine)
+
+            with self._lock:
+                self._evict_for(memory_mb)
+                self._models[size] = {
+                    "model": model,
+                    "load_seconds": load_seconds,
+                    "loaded_at": time.time(),
+                    "last_used": time.time(),
+                    "memory_mb": memory_mb,
+                }
+                self.loads += 1
+            return model
+
+    def _evict_for(self, incoming_mb: float):
+        """Drop least recently used models until `incoming_mb` fits the cap"""
+        if not self.memory_cap_mb:
+            return
+        while self._models and self.resident_mb() + incoming_mb > self.memory_cap_mb:
+            self._models.popitem(last=False)
+            self.evictions += 1
+
+    def resident_mb(self) -> float:
+        return sum(entry["memory_mb"] for entry in self._models.values())
+
+    def preload(self, sizes: Optional[List[str]] = None):
+        """Warm up the given sizes (default: all configured) at startup"""
+        for size in sizes or self.sizes:
+            self.get(size)
+
+    def is_loaded(self, size: str) -> bool:
+        with self._lock:
+            return size in self._models
+
+    def stats(self) -> dict:
+        with self._lock:
+            resident = {
+                size: {
+                    "load_seconds": round(entry["load_seconds"], 3),
+                    "loaded_at": entry["loaded_at"],
+                    "last_used": entry["last_used"],
+                    "memory_mb": round(entry["memory_mb"], 1),
+                }
+                for size, entry in self._models.items()
+            }
+            return {
+                "engine": self.engine.describe(),
+                "configured_sizes": self.sizes,
+                "resident": resident,
+                "resident_mb": round(self.resident_mb(), 1),
+                "memory_cap_mb": self.memory_cap_mb,
+                "loads": self.loads,
+                "hits": self.hits,
+                "evictions": self.evictions,
+            }
@@ -1,26 +1,66 @@
 from fastapi import FastAPI, Request, HTTPException, Cookie, Response, UploadFile
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, ValidationError, field_validator
 from typing import List, Optional
 import json
+import os
 from pathlib import Path
 import subprocess
-import shutil
+import tempfile
 import re
 import secrets
 import hashlib
+import time
 from datetime import datetime
 import uvicorn
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+
+from factory.audio_preprocess import decode_audio
+from factory.audit import AuditLogWriter
+from factory.bulk_import import ImportFormatError, iter_records
+from factory.chunking import AudioChunk, merge_results, plan_chunks, stitch_chunk, transcribe_chunks
+from factory.empleaido_store import EmpleaidoStore
+from factory.idempotency import WebhookIdempotency
+from factory.metrics import REGISTRY as metrics, timed
+from factory.model_scheduler import ModelScheduler, OverloadedError
+from factory.media_fetcher import MediaFetcher, MediaFetchError, MediaTooLargeError
+from factory.rate_limit import SQLiteRateLimiter, SlidingWindowRateLimiter, parse_route_limits
+from factory.response_cache import VersionedResponseCache
+from factory.search_index import QuerySyntaxError, SearchIndex
+from factory.session_store import SessionStore, SQLiteSessionStore
+from factory.shared_state import load_shared_secret
+from factory.skill_deploy import SkillDeployer
+from factory.skill_render import SkillRenderer
+from factory.sqlite_store import SQLiteEmpleaidoStore
+from factory.transcription_cache import TranscriptionCache, cache_key
+from factory.transcription_engines import create_engine
+from factory.transcription_jobs import QueueFullError, TranscriptionJobQueue
+from factory.whatsapp_outbox import OutboxFullError, WhatsAppOutbox, split_message
+from factory.uploads import UploadError, UploadTooLargeError, hash_file, probe_audio_duration, stream_upload_to_disk
+from factory.whisper_models import WhisperModelRegistry
 
 app = FastAPI(title="Empleaido Factory", version="2.1.0")
 
+# Multi-worker mode (python main.py --workers N): state lives in SQLite so all workers share it
+WEB_WORKERS = int(os.environ.get("EMPLEAIDO_WORKERS", "1"))
+MULTI_WORKER = WEB_WORKERS > 1
+SHARED_STATE_DB = Path(os.environ.get("SHARED_STATE_DB", "shared_state.db"))  # sessions + rate limits
+SECRET_KEY_FILE = Path(os.environ.get("SECRET_KEY_FILE", ".secret_key"))
+
 # Security Configuration
-SECRET_KEY = secrets.token_urlsafe(32)
+if MULTI_WORKER:
+    SECRET_KEY = load_shared_secret(SECRET_KEY_FILE, os.environ.get("EMPLEAIDO_SECRET_KEY"))
+else:
+    SECRET_KEY = os.environ.get("EMPLEAIDO_SECRET_KEY") or secrets.token_urlsafe(32)
 SESSION_COOKIE_NAME = "empleaido_session"
 MAX_SESSION_AGE = 3600  # 1 hour
 RATE_LIMIT_PER_MINUTE = 60
+RATE_LIMITS = parse_route_limits(os.environ.get("RATE_LIMITS", ""))  # e.g. "whisper_transcribe=20,create_empleaido=30"
+RATE_LIMIT_MAX_CLIENTS = int(os.environ.get("RATE_LIMIT_MAX_CLIENTS", "200000"))
+SESSION_FLUSH_INTERVAL = float(os.environ.get("SESSION_FLUSH_INTERVAL", "5"))  # seconds
 
 # Setup
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -28,9 +68,144 @@ templates = Jinja2Templates(directory="templates")
 
 # Data storage
 DATA_FILE = Path("empleaidos.json")
+DATA_JOURNAL_FILE = Path("empleaidos.journal")
+DATA_DB_FILE = Path(os.environ.get("EMPLEAIDO_DB_FILE", "empleaidos.db"))
+STORAGE_BACKEND = os.environ.get("EMPLEAIDO_BACKEND", "journal")  # journal | sqlite
+if MULTI_WORKER and STORAGE_BACKEND != "sqlite":
+    # The journal store keeps records in process memory; workers would diverge
+    print(f"EMPLEAIDO_WORKERS={WEB_WORKERS}: using the sqlite storage backend")
+    STORAGE_BACKEND = "sqlite"
 SESSIONS_FILE = Path("sessions.json")
 AUDIT_LOG_FILE = Path("audit.log")
+AUDIT_LOG_MAX_MB = int(os.environ.get("AUDIT_LOG_MAX_MB", "10"))
+AUDIT_LOG_BACKUPS = int(os.environ.get("AUDIT_LOG_BACKUPS", "14"))
+AUDIT_LOG_COMPRESS = os.environ.get("AUDIT_LOG_COMPRESS", "true").lower() == "true"
 OPENCLAW_SKILLS_PATH = Path.home() / "Dev" / "openclaw-skills" / "openclaw-skills" / "skills" / "nadalpiantini"
+SKILL_DEPLOY_WORKERS = int(os.environ.get("SKILL_DEPLOY_WORKERS", "8"))
+IMPORT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", "500"))
+IMPORT_MAX_RECORD_BYTES = 64 * 1024
+
+# Whisper configuration
+WHISPER_MODEL_SIZES = [s.strip() for s in os.environ.get("WHISPER_MODEL_SIZES", "base").split(",") if s.strip()]
+WHISPER_DEFAULT_MODEL = os.environ.get("WHISPER_DEFAULT_MODEL", WHISPER_MODEL_SIZES[0])
+WHISPER_PRELOAD = os.environ.get("WHISPER_PRELOAD", "false").lower() == "true"
+WHISPER_MEMORY_CAP_MB = float(os.environ.get("WHISPER_MEMORY_CAP_MB", "0")) or None
+WHISPER_WORKERS = int(os.environ.get("WHISPER_WORKERS", "1"))  # 0 = background thread in this process
+WHISPER_ENGINE = os.environ.get("WHISPER_ENGINE", "whisper")  # whisper (PyTorch) | faster-whisper (CTranslate2)
+WHISPER_COMPUTE_TYPE = os.environ.get("WHISPER_COMPUTE_TYPE", "int8")  # faster-whisper quantization
+# Inference threads per worker; default splits the cores between the worker processes
+WHISPER_CPU_THREADS = int(os.environ.get("WHISPER_CPU_THREADS", "0")) or max(
+    1, (os.cpu_count() or 1) // max(1, WHISPER_WORKERS)
+)
+WHISPER_MAX_QUEUE_DEPTH = int(os.environ.get("WHISPER_MAX_QUEUE_DEPTH", "32"))
+WHISPER_MAX_LONG_POLL = 30  # seconds
+WHISPER_MAX_UPLOAD_BYTES = int(os.environ.get("WHISPER_MAX_UPLOAD_MB", "25")) * 1024 * 1024
+WHISPER_DECODE = os.environ.get("WHISPER_DECODE", "true").lower() == "true"  # decode once in the worker, pass arrays
+WHISPER_VAD = os.environ.get("WHISPER_VAD", "true").lower() == "true"  # trim long silences before inference
+WHISPER_VAD_THRESHOLD_DB = float(os.environ.get("WHISPER_VAD_THRESHOLD_DB", "-35"))  # relative to loud frames
+WHISPER_VAD_MIN_SILENCE = float(os.environ.get("WHISPER_VAD_MIN_SILENCE", "0.5"))  # seconds
+WHISPER_ADAPTIVE_MODEL = os.environ.get("WHISPER_ADAPTIVE_MODEL", "true").lower() == "true"  # downsize under load
+WHISPER_LATENCY_SLO = float(os.environ.get("WHISPER_LATENCY_SLO", "30"))  # seconds from upload to transcript
+WHISPER_CHUNK_SECONDS = float(os.environ.get("WHISPER_CHUNK_SECONDS", "30"))
+WHISPER_CHUNK_OVERLAP = float(os.environ.get("WHISPER_CHUNK_OVERLAP", "1.0"))  # seconds shared by neighbouring chunks
+WHISPER_CHUNKED_MIN_SECONDS = float(os.environ.get("WHISPER_CHUNKED_MIN_SECONDS", "120"))  # longer audio is split
+
+# Transcription result cache (keyed by audio SHA-256 + model + options)
+TRANSCRIPTION_CACHE_DIR = Path(os.environ.get("TRANSCRIPTION_CACHE_DIR", ".cache/transcriptions"))
+TRANSCRIPTION_CACHE_ENTRIES = int(os.environ.get("TRANSCRIPTION_CACHE_ENTRIES", "256"))
+TRANSCRIPTION_CACHE_DISK_MB = int(os.environ.get("TRANSCRIPTION_CACHE_DISK_MB", "256"))
+
+# WhatsApp media downloads
+MEDIA_FETCH_TIMEOUT = float(os.environ.get("MEDIA_FETCH_TIMEOUT", "15"))
+MEDIA_FETCH_PER_HOST = int(os.environ.get("MEDIA_FETCH_PER_HOST", "8"))
+
+# Webhook redelivery dedup (keyed on message_id)
+WEBHOOK_DEDUP_DB = Path(os.environ.get("WEBHOOK_DEDUP_DB", "webhook_deliveries.db"))
+WEBHOOK_DEDUP_WINDOW = float(os.environ.get("WEBHOOK_DEDUP_WINDOW", str(24 * 3600)))  # seconds
+WEBHOOK_DEDUP_MAX_RECENT = int(os.environ.get("WEBHOOK_DEDUP_MAX_RECENT", "10000"))
+
+# Outbound WhatsApp replies (provider /messages endpoint; unset = transcriptions are only returned)
+WHATSAPP_API_URL = os.environ.get("WHATSAPP_API_URL", "")
+WHATSAPP_API_TOKEN = os.environ.get("WHATSAPP_API_TOKEN", "")
+WHATSAPP_MAX_CHARS = int(os.environ.get("WHATSAPP_MAX_CHARS", "4096"))
+WHATSAPP_SEND_WORKERS = int(os.environ.get("WHATSAPP_SEND_WORKERS", "8"))
+WHATSAPP_SEND_INTERVAL = float(os.environ.get("WHATSAPP_SEND_INTERVAL", "1.0"))  # seconds between parts to one recipient
+WHATSAPP_SEND_ATTEMPTS = int(os.environ.get("WHATSAPP_SEND_ATTEMPTS", "5"))
+WHATSAPP_OUTBOX_MAX = int(os.environ.get("WHATSAPP_OUTBOX_MAX", "1000"))
+
+# Every transcription path (sync, jobs, stream, WhatsApp) runs on this engine
+whisper_engine_settings = {"cpu_threads": WHISPER_CPU_THREADS}
+if WHISPER_ENGINE != "whisper":
+    whisper_engine_settings["compute_type"] = WHISPER_COMPUTE_TYPE
+whisper_engine = create_engine(WHISPER_ENGINE, whisper_engine_settings)
+
+# Loaded once per process, shared by all transcription endpoints
+whisper_models = WhisperModelRegistry(
+    WHISPER_MODEL_SIZES, memory_cap_mb=WHISPER_MEMORY_CAP_MB, engine=whisper_engine
+)
+
+# Inference runs in this pool, never on the event loop
+transcription_jobs = TranscriptionJobQueue(
+    WHISPER_MODEL_SIZES,
+    workers=WHISPER_WORKERS,
+    max_queue_depth=WHISPER_MAX_QUEUE_DEPTH,
+    memory_cap_mb=WHISPER_MEMORY_CAP_MB,
+    preload=WHISPER_PRELOAD,
+    registry=whisper_models,
+    # Lets any worker answer polls for jobs submitted to another
+    state_dir=Path(".cache/jobs") if MULTI_WORKER else None,
+    engine=WHISPER_ENGINE,
+    engine_settings=whisper_engine_settings,
+    decode=WHISPER_DECODE,
+    vad={"threshold_db": WHISPER_VAD_THRESHOLD_DB, "min_silence_seconds": WHISPER_VAD_MIN_SILENCE}
+    if WHISPER_DECODE and WHISPER_VAD else None,
+)
+
+# Model size per request: the default when the backlog allows, smaller or shed when it does not
+model_scheduler = ModelScheduler(
+    WHISPER_MODEL_SIZES,
+    WHISPER_DEFAULT_MODEL,
+    transcription_jobs.backlog,
+    workers=WHISPER_WORKERS,
+    slo_seconds=WHISPER_LATENCY_SLO,
+)
+transcription_jobs.subscribe(model_scheduler.on_job_done)
+
+transcription_cache = TranscriptionCache(
+    TRANSCRIPTION_CACHE_DIR,
+    memory_entries=TRANSCRIPTION_CACHE_ENTRIES,
+    disk_max_bytes=TRANSCRIPTION_CACHE_DISK_MB * 1024 * 1024,
+)
+
+# Shared keep-alive pool for provider media downloads
+media_fetcher = MediaFetcher(
+    per_host_limit=MEDIA_FETCH_PER_HOST,
+    timeout=MEDIA_FETCH_TIMEOUT,
+    max_bytes=WHISPER_MAX_UPLOAD_BYTES,
+)
+
+# Provider retries of a message attach to the first delivery's result
+webhook_deliveries = WebhookIdempotency(
+    WEBHOOK_DEDUP_DB,
+    window_seconds=WEBHOOK_DEDUP_WINDOW,
+    max_recent=WEBHOOK_DEDUP_MAX_RECENT,
+)
+
+# Replies go out in the background, in order and paced per recipient
+whatsapp_outbox = WhatsAppOutbox(
+    WHATSAPP_API_URL,
+    token=WHATSAPP_API_TOKEN or None,
+    workers=WHATSAPP_SEND_WORKERS,
+    max_queue=WHATSAPP_OUTBOX_MAX,
+    max_chars=WHATSAPP_MAX_CHARS,
+    min_interval=WHATSAPP_SEND_INTERVAL,
+    max_attempts=WHATSAPP_SEND_ATTEMPTS,
+)
+
+# Listing
+MAX_PAGE_SIZE = 1000
+AUTH_TOKEN_PLACEHOLDER = "__EMPLEAIDO_AUTH_TOKEN__"
+EMPLEAIDO_FIELDS = ("id", "name", "role", "specialty", "sefirot_activation", "skills", "status", "created_at", "deployed")
 
 # Valid Sefirot names (whitelist)
 VALID_SEFIROT = {
@@ -129,49 +304,31 @@ class EmpleaidoCreate(BaseModel):
             raise ValueError('No valid skills provided')
         return validated
 
-# Session management
+# Session management (in memory, snapshotted to SESSIONS_FILE in the background)
+if MULTI_WORKER:
+    session_store = SQLiteSessionStore(
+        SHARED_STATE_DB, path=SESSIONS_FILE, max_age=MAX_SESSION_AGE, flush_interval=SESSION_FLUSH_INTERVAL
+    )
+else:
+    session_store = SessionStore(SESSIONS_FILE, max_age=MAX_SESSION_AGE, flush_interval=SESSION_FLUSH_INTERVAL)
+
 def create_session() -> str:
     """Create a new secure session"""
-    session_token = secrets.token_urlsafe(32)
-    session = {
-        "token": session_token,
-        "created_at": datetime.now().isoformat(),
-        "expires_at": (datetime.now().timestamp() + MAX_SESSION_AGE)
-    }
-    sessions = load_sessions()
-    sessions[session_token] = session
-    save_sessions(sessions)
-    return session_token
+    return session_store.create()
 
 def validate_session(token: str) -> bool:
     """Validate session token and check expiration"""
-    sessions = load_sessions()
-    session = sessions.get(token)
-    if not session:
-        return False
-    if datetime.now().timestamp() > session["expires_at"]:
-        # Session expired, remove it
-        del sessions[token]
-        save_sessions(sessions)
-        return False
-    return True
+    return session_store.validate(token)
 
-def load_sessions() -> dict:
-    """Load sessions from file"""
-    if SESSIONS_FILE.exists():
-        try:
-            with open(SESSIONS_FILE, "r") as f:
-                return json.load(f)
-        except:
-            return {}
-    return {}
-
-def save_sessions(sessions: dict):
-    """Save sessions to file"""
-    with open(SESSIONS_FILE, "w") as f:
-        json.dump(sessions, f, indent=2)
-
-# Audit logging
+# Audit logging (queued in memory, written in batches by a background thread)
+audit_writer = AuditLogWriter(
+    AUDIT_LOG_FILE,
+    max_bytes=AUDIT_LOG_MAX_MB * 1024 * 1024,
+    backups=AUDIT_LOG_BACKUPS,
+    compress=AUDIT_LOG_COMPRESS,
+)
+
+@timed("audit_log")
 def audit_log(action: str, details: dict, ip: str = None):
     """Log security-relevant events"""
     log_entry = {
@@ -180,173 +337,187 @@ def audit_log(action: str, details: dict, ip: str = None):
         "ip": ip or "unknown",
         "details": details
     }
-    with open(AUDIT_LOG_FILE, "a") as f:
-        f.write(json.dumps(log_entry) + "\n")
-
-# Rate limiting (in-memory, simple version)
-rate_limit_tracker = {}
+    audit_writer.log(log_entry)
+
+# Rate limiting (sliding-window counter, O(1) state per ip:endpoint)
+rate_limiter_options = dict(
+    default_limit=RATE_LIMIT_PER_MINUTE,
+    window_seconds=60,
+    route_limits=RATE_LIMITS,
+    max_keys=RATE_LIMIT_MAX_CLIENTS,
+)
+if MULTI_WORKER:
+    rate_limiter = SQLiteRateLimiter(SHARED_STATE_DB, **rate_limiter_options)
+else:
+    rate_limiter = SlidingWindowRateLimiter(**rate_limiter_options)
 
 def check_rate_limit(ip: str, endpoint: str) -> bool:
     """Check if IP has exceeded rate limit"""
-    key = f"{ip}:{endpoint}"
-    now = datetime.now().timestamp()
-    minute_ago = now - 60
-
-    # Clean old entries
-    if key in rate_limit_tracker:
-        rate_limit_tracker[key] = [
-            ts for ts in rate_limit_tracker[key]
-            if ts > minute_ago
-        ]
+    return rate_limiter.check(ip, endpoint)
 
-    # Check limit
-    if len(rate_limit_tracker.get(key, [])) >= RATE_LIMIT_PER_MINUTE:
-        return False
-
-    # Add current request
-    if key not in rate_limit_tracker:
-        rate_limit_tracker[key] = []
-    rate_limit_tracker[key].append(now)
-    return True
+# Transcription with result cache
+async def transcribe_cached(audio_path: str, audio_sha256: str, options: dict = None, duration: float = None):
+    """Return (result, cached, model_size); repeated audio is served without inference
 
-# Initialize data
-def load_empleaidos():
-    if DATA_FILE.exists():
+    The model size comes from the scheduler; raises OverloadedError when the
+    backlog cannot meet the latency SLO even on the smallest model.
+    """
+    model_size = WHISPER_DEFAULT_MODEL
+    key = cache_key(audio_sha256, model_size, options, engine=whisper_engine.name)
+    cached = await transcription_cache.lookup(key)
+    if cached is None:
+        if duration is None:
+            duration = probe_audio_duration(audio_path)
+        chunked = duration is not None and duration >= WHISPER_CHUNKED_MIN_SECONDS
         try:
-            with open(DATA_FILE, "r") as f:
-                return json.load(f)
-        except:
-            return []
-    return []
-
-def save_empleaidos(empleaidos):
-    with open(DATA_FILE, "w") as f:
-        json.dump(empleaidos, f, indent=2)
-
-# Generate skill.md content
-def generate_skill_md(empleaido: dict) -> str:
-    sefirot_context = {
-        "Keter": "Corona - Universal consciousness, connection to source",
-        "Chochmah": "Sabiduría - Intuitive insight, creative inspiration",
-        "Binah": "Entendimiento - Analytical depth, structured processing",
-        "Chesed": "Bondad - Expansion, generosity, creative force",
-        "Gevurah": "Fuerza - Discipline, restraint, focused power",
-        "Tiferet": "Belleza - Balance, harmony, integration",
-        "Netzach": "Victoria - Endurance, confidence, momentum",
-        "Hod": "Esplendor - Detail-oriented, analytical precision",
-        "Yesod": "Fundación - Connection, transmission, foundation",
-        "Malkuth": "Reino - Manifestation, physical reality"
-    }
-
-    sefirot_descriptions = "\n        ".join([
-        f"- **{sefira}**: {sefirot_context.get(sefira, 'Sefirotic activation')}"
-        for sefira in empleaido.get("sefirot_activation", [])
-    ])
-
-    skills_list = "\n        ".join([f"- {skill}" for skill in empleaido.get("skills", [])])
-
-    # Sanitize output
-    name = sanitize_string(empleaido['name'], 50)
-    role = sanitize_string(empleaido['role'], 100)
-    specialty = sanitize_string(empleaido['specialty'], 200)
-
-    skill_md = f"""---
-name: {name.lower()}
-version: 1.0.0
-description: {role} - {specialty}
----
-
-# {name.upper()}
-
-**{role}** especializado en **{specialty}**
-
-## 🎯 Rol Principal
-
-{role} con expertise en {specialty}
-
-## ✨ Sefirot Activation
-
-Este empleaido opera con activación Sefirotic en los siguientes canales:
-
-    {sefirot_descriptions}
-
-## 🔧 Skills Competencies
-
-    {skills_list}
-
-## 🚀 Invocación
-
-```bash
-openclaw agent --message "TU_PEDIDO_AQUI" --skill {name.lower()}
-```
-
-## 📋 Arquetipo del Agente
-
-Este empleaido fue creado a través de **Empleaido Factory** con la arquitectura Adán Kadmon v3, integrando:
-
-- **OpenClaw Skills System**: Framework de habilidades modulares
-- **Sefirotic Orchestrator**: Topología de decisión basada en el Árbol de la Vida
-- **Arquetipo Personalizado**: {role}
-
-## 🎨 Contexto Operativo
+            model_size = choose_model_size(duration, chunked)
+        except OverloadedError:
+            os.unlink(audio_path)
+            raise
+        if model_size != WHISPER_DEFAULT_MODEL:
+            key = cache_key(audio_sha256, model_size, options, engine=whisper_engine.name)
+            cached = await transcription_cache.lookup(key)
+    if cached is not None:
+        if os.path.exists(audio_path):
+            os.unlink(audio_path)
+        return cached, True, model_size
+
+    # Worker pool transcribes and removes the temp file
+    started = time.perf_counter()
+    if chunked:
+        audio, chunks = await run_in_threadpool(prepare_chunks, audio_path)
+        parts = [part async for part in transcribe_chunks(
+            transcription_jobs, audio, chunks, model_size, options, chunk_concurrency()
+        )]
+        result = merge_results(parts)
+    else:
+        result = await transcription_jobs.run(audio_path, model_size, options, audio_seconds=duration)
+    result = dict(result, inference_seconds=round(time.perf_counter() - started, 3))
+    await transcription_cache.store(key, result)
+    return result, False, model_size
+
+def choose_model_size(duration: Optional[float], chunked: bool = False) -> str:
+    """Model size for a new transcription; raises OverloadedError to shed load"""
+    if not WHISPER_ADAPTIVE_MODEL:
+        return WHISPER_DEFAULT_MODEL
+    return model_scheduler.choose(duration, parallelism=chunk_concurrency() if chunked else 1)
+
+def overloaded_response(e: OverloadedError, endpoint: str, client_ip: str) -> HTTPException:
+    """503 with Retry-After for requests shed by the model scheduler"""
+    audit_log("whisper_overloaded", {"endpoint": endpoint, "retry_after": e.retry_after}, client_ip)
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+def model_label(model_size: str) -> str:
+    """Model name reported to clients, e.g. whisper-base or faster-whisper-small"""
+    return f"{whisper_engine.name}-{model_size}"
+
+def prepare_chunks(audio_path: str):
+    """Decode a recording and plan its chunks; the source file is removed"""
+    try:
+        audio = decode_audio(audio_path, whisper_engine.decode)
+    finally:
+        if os.path.exists(audio_path):
+            os.unlink(audio_path)
+    return audio, plan_chunks(audio, WHISPER_CHUNK_SECONDS, overlap_seconds=WHISPER_CHUNK_OVERLAP)
+
+def chunk_concurrency() -> int:
+    """Chunks in flight per recording: one per worker process"""
+    return max(1, transcription_jobs.workers)
+
+# Initialize data (journal: indexed in memory; sqlite: indexed on disk)
+def open_empleaido_store():
+    if STORAGE_BACKEND == "sqlite":
+        store = SQLiteEmpleaidoStore(DATA_DB_FILE)
+        store.migrate_from_json(DATA_FILE)
+        return store
+    return EmpleaidoStore(DATA_FILE, DATA_JOURNAL_FILE)
+
+empleaido_store = open_empleaido_store()
+
+# Inverted index for /api/empleaidos/search, kept current by store notifications
+search_index = SearchIndex()
+search_index.rebuild(empleaido_store.all())
+empleaido_store.subscribe(search_index.on_store_event)
+
+@timed("load_empleaidos")
+def load_empleaidos():
+    return empleaido_store.all()
 
-Cuando invoques a {name}, está operando con:
-- Conciencia Sefirotic multidimensional
-- Especialización en {specialty}
-- Skills activos: {', '.join(empleaido.get('skills', []))}
+def get_empleaido(empleaido_id: str) -> Optional[dict]:
+    return empleaido_store.get(empleaido_id)
 
-## 📊 Métricas de Activación
+# skill.md / index.md come from precompiled templates, memoized per record
+skill_renderer = SkillRenderer(Path("templates") / "skills", sanitize=sanitize_string)
 
-- **Nivel de Consciencia**: Sefirotic
-- **Modo de Operación**: {empleaido.get('status', 'active').upper()}
-- **Sistema Base**: Adán Kadmon v3 + OpenClaw
+def generate_skill_md(empleaido: dict) -> str:
+    return skill_renderer.skill_md(empleaido)
 
----
+def generate_index_md(empleaido: dict) -> str:
+    return skill_renderer.index_md(empleaido)
 
-**Generado por Empleaido Factory v2.1.0**
-**Fecha de Creación**: {empleaido.get('created_at', 'Unknown')}
-**ID**: {empleaido['id']}
-"""
-    return skill_md
+# Deploy empleaido as OpenClaw skill (files rewritten only when content changes)
+skill_deployer = SkillDeployer(
+    OPENCLAW_SKILLS_PATH,
+    render_skill=generate_skill_md,
+    render_index=generate_index_md,
+    max_workers=SKILL_DEPLOY_WORKERS,
+)
 
-# Deploy empleaido as OpenClaw skill
 def deploy_empleaido_skill(empleaido: dict) -> bool:
     try:
-        skill_dir = OPENCLAW_SKILLS_PATH / empleaido['name'].lower()
-        skill_dir.mkdir(parents=True, exist_ok=True)
-
-        skill_md = generate_skill_md(empleaido)
-        skill_file = skill_dir / "skill.md"
-
-        with open(skill_file, "w") as f:
-            f.write(skill_md)
-
-        # Create index.md for documentation
-        index_md = f"""# {empleaido['name']} - OpenClaw Skill
-
-{empleaido['role']} especializado en {empleaido['specialty']}.
-
-## Quick Start
-
-```bash
-openclaw agent --message "Your request here" --skill {empleaido['name'].lower()}
-```
-
-## Skills
-{chr(10).join(['- ' + s for s in empleaido['skills']])}
-
-## Sefirot Activation
-{chr(10).join(['- ' + s for s in empleaido['sefirot_activation']])}
-"""
-        index_file = skill_dir / "index.md"
-        with open(index_file, "w") as f:
-            f.write(index_md)
-
+        skill_deployer.deploy_one(empleaido)
         return True
     except Exception as e:
         print(f"Error deploying skill: {e}")
         return False
 
+# Pre-serialized read responses, invalidated by the store's data version
+response_cache = VersionedResponseCache(epoch=empleaido_store.epoch)
+
+_ui_version = (0.0, "")
+
+def ui_version() -> str:
+    """Fingerprint of the app version, index.html and static assets (re-checked every few seconds)"""
+    global _ui_version
+    checked_at, value = _ui_version
+    if time.monotonic() - checked_at < 5:
+        return value
+    digest = hashlib.sha1(app.version.encode())
+    for path in [Path("templates") / "index.html", *sorted(Path("static").rglob("*"))]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        digest.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+    _ui_version = (time.monotonic(), digest.hexdigest()[:12])
+    return _ui_version[1]
+
+def render_index(request: Request, auth_token: str) -> bytes:
+    """Render index.html once per data and UI version; only the auth token varies"""
+    version = empleaido_store.version
+    key = f"home:{ui_version()}"
+    cached = response_cache.get(key, version)
+    if cached is None:
+        # The catalog loads page by page from app.js, so rendering is independent of its size
+        html = templates.get_template("index.html").render(
+            request=request, auth_token=AUTH_TOKEN_PLACEHOLDER
+        ).encode()
+        response_cache.put(key, version, html)
+    else:
+        html = cached[0]
+    return html.replace(AUTH_TOKEN_PLACEHOLDER.encode(), auth_token.encode())
+
+# Streamed JSON responses
+def stream_json_array(records: List[dict], projection: Optional[List[str]] = None, batch_size: int = 100):
+    """Yield a JSON array in chunks of `batch_size` records instead of encoding it whole"""
+    yield "["
+    for start in range(0, len(records), batch_size):
+        batch = records[start:start + batch_size]
+        if projection:
+            batch = [{key: record[key] for key in projection if key in record} for record in batch]
+        yield ("," if start else "") + ",".join(json.dumps(record) for record in batch)
+    yield "]"
+
 # Security Middleware
 @app.middleware("http")
 async def add_security_headers(request: Request, call_next):
@@ -373,11 +544,73 @@ async def add_security_headers(request: Request, call_next):
 
     return response
 
+# Request metrics, exposed with everything else at /api/metrics
+http_requests = metrics.counter("http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+http_latency = metrics.histogram(
+    "http_request_duration_seconds", "Time until response headers, by route", ("method", "route")
+)
+http_in_flight = metrics.gauge("http_requests_in_flight", "Requests currently being handled", ("method", "route"))
+
+_route_patterns = None
+
+def route_template(path: str, method: str) -> str:
+    """Route path template (e.g. /api/whisper/jobs/{job_id}) so labels stay bounded"""
+    global _route_patterns
+    if _route_patterns is None:
+        # Plain regex matching; Route.matches() builds a child scope per route
+        _route_patterns = [
+            (route.path_regex, route.path, getattr(route, "methods", None)) for route in app.router.routes
+        ]
+    partial = None
+    for regex, template, methods in _route_patterns:
+        if regex.match(path):
+            if methods is None or method in methods:
+                return template
+            partial = partial or template
+    return partial or "unmatched"
+
+@app.middleware("http")
+async def track_request_metrics(request: Request, call_next):
+    method = request.method
+    route = route_template(request.url.path, method)
+    http_in_flight.inc(method, route)
+    started = time.perf_counter()
+    status = "500"
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+        return response
+    finally:
+        http_latency.observe(time.perf_counter() - started, method, route)
+        http_requests.inc(method, route, status)
+        http_in_flight.dec(method, route)
+
+@app.on_event("startup")
+async def start_session_flusher():
+    session_store.start()
+
+@app.on_event("startup")
+async def start_whatsapp_outbox():
+    if whatsapp_outbox.enabled:
+        whatsapp_outbox.start()
+
+@app.on_event("startup")
+async def start_transcription_workers():
+    """Spawn the worker pool (and load models with WHISPER_PRELOAD) before the first request"""
+    transcription_jobs.start()
+
+@app.on_event("shutdown")
+async def shutdown_services():
+    transcription_jobs.shutdown()
+    await session_store.stop()
+    empleaido_store.close()
+    await media_fetcher.aclose()
+    await whatsapp_outbox.aclose()
+    audit_writer.close()
+
 # Routes
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
-    empleaidos = load_empleaidos()
-
     # Check session
     session_token = request.cookies.get(SESSION_COOKIE_NAME)
     is_authenticated = session_token and validate_session(session_token)
@@ -385,10 +618,7 @@ async def home(request: Request):
     # Get/set auth token for API calls
     if not is_authenticated:
         new_token = create_session()
-        response = templates.TemplateResponse(
-            "index.html",
-            {"request": request, "empleaidos": empleaidos, "auth_token": new_token}
-        )
+        response = HTMLResponse(render_index(request, new_token))
         response.set_cookie(
             key=SESSION_COOKIE_NAME,
             value=new_token,
@@ -399,10 +629,12 @@ async def home(request: Request):
         )
         return response
 
-    return templates.TemplateResponse(
-        "index.html",
-        {"request": request, "empleaidos": empleaidos, "auth_token": session_token}
-    )
+    # Unchanged page for this session: answer with a header comparison only.
+    # The data epoch survives restarts, so the UI version makes a deploy change the tag
+    etag = response_cache.etag(f"home:{ui_version()}:{session_token}", empleaido_store.version)
+    if response_cache.not_modified_for(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return HTMLResponse(render_index(request, session_token), headers={"ETag": etag})
 
 @app.post("/api/auth/login")
 async def login():
@@ -411,17 +643,127 @@ async def login():
     audit_log("login", {"token_hash": hashlib.sha256(token.encode()).hexdigest()})
     return {"token": token, "expires_in": MAX_SESSION_AGE}
 
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Validate a comma-separated `fields` projection"""
+    if not fields:
+        return None
+    projection = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = set(projection) - set(EMPLEAIDO_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return projection
+
 @app.get("/api/empleaidos")
-async def get_empleaidos(request: Request):
+async def get_empleaidos(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    status: Optional[str] = None,
+    deployed: Optional[bool] = None,
+    sefirot: Optional[str] = None,
+    skill: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    """List empleaidos; supports cursor pagination, filters and field projection"""
     # Rate limiting
     client_ip = request.client.host
     if not check_rate_limit(client_ip, "get_empleaidos"):
         audit_log("rate_limit_exceeded", {"endpoint": "get_empleaidos"}, client_ip)
         raise HTTPException(status_code=429, detail="Rate limit exceeded")
 
-    empleaidos = load_empleaidos()
+    # Cursor is the position of the last record on the previous page
+    if cursor is not None and not cursor.isdigit():
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    projection = parse_fields(fields)
+
+    # Same query + same data version = same bytes
+    version = empleaido_store.version
+    cache_key = "empleaidos?" + "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    etag = response_cache.etag(cache_key, version)
+    if response_cache.not_modified_for(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    cached = response_cache.get(cache_key, version)
+    if cached is not None:
+        body, headers = cached
+        audit_log("get_empleaidos", {"cached": True}, client_ip)
+        return Response(content=body, media_type="application/json", headers=dict(headers, ETag=etag))
+
+    empleaidos, next_cursor = empleaido_store.page(
+        after=int(cursor or 0),
+        limit=limit,
+        status=status,
+        deployed=deployed,
+        sefirot=sefirot,
+        skill=skill,
+    )
     audit_log("get_empleaidos", {"count": len(empleaidos)}, client_ip)
-    return empleaidos
+
+    headers = {}
+    if next_cursor is not None:
+        headers["X-Next-Cursor"] = str(next_cursor)
+    body = stream_json_array(empleaidos, projection)
+    if limit is not None:
+        # Only bounded pages are kept; the unpaged listing streams every time (ETag still applies)
+        body = response_cache.tee(cache_key, version, body, headers)
+    return StreamingResponse(
+        body,
+        media_type="application/json",
+        headers=dict(headers, ETag=etag),
+    )
+
+@app.get("/api/empleaidos/stats")
+async def empleaido_stats(request: Request):
+    """Dashboard totals, so the UI can show them without downloading the catalog"""
+    client_ip = request.client.host
+    if not check_rate_limit(client_ip, "empleaido_stats"):
+        audit_log("rate_limit_exceeded", {"endpoint": "empleaido_stats"}, client_ip)
+        raise HTTPException(status_code=429, detail="Rate limit exceeded")
+
+    version = empleaido_store.version
+    etag = response_cache.etag("empleaidos/stats", version)
+    if response_cache.not_modified_for(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    cached = response_cache.get("empleaidos/stats", version)
+    if cached is None:
+        body = json.dumps(empleaido_store.summary()).encode()
+        response_cache.put("empleaidos/stats", version, body)
+    else:
+        body = cached[0]
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+@app.get("/api/empleaidos/search")
+async def search_empleaidos(request: Request, q: str, limit: int = 50, fields: Optional[str] = None):
+    """Search skills, sefirot, role and specialty (AND/OR, field:term, prefix*)"""
+    client_ip = request.client.host
+    if not check_rate_limit(client_ip, "search_empleaidos"):
+        audit_log("rate_limit_exceeded", {"endpoint": "search_empleaidos"}, client_ip)
+        raise HTTPException(status_code=429, detail="Rate limit exceeded")
+
+    if not 0 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 0 and {MAX_PAGE_SIZE}")
+    if len(q) > 500:
+        raise HTTPException(status_code=400, detail="Query too long")
+    projection = parse_fields(fields)
+
+    started = time.perf_counter()
+    # Pick up writes made by other worker processes
+    empleaido_store.refresh()
+    try:
+        count, ids = search_index.search(q, limit)
+    except QuerySyntaxError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    took_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    results = [record for record in (get_empleaido(i) for i in ids) if record]
+    if projection:
+        results = [{key: record[key] for key in projection if key in record} for record in results]
+
+    audit_log("search_empleaidos", {"query": q, "count": count}, client_ip)
+    return {"query": q, "count": count, "results": results, "took_ms": took_ms}
 
 @app.post("/api/empleaidos")
 async def create_empleaido(empleaido: EmpleaidoCreate, request: Request):
@@ -431,8 +773,6 @@ async def create_empleaido(empleaido: EmpleaidoCreate, request: Request):
         audit_log("rate_limit_exceeded", {"endpoint": "create_empleaido"}, client_ip)
         raise HTTPException(status_code=429, detail="Rate limit exceeded")
 
-    empleaidos = load_empleaidos()
-
     new_empleaido = Empleaido(
         id=secrets.token_urlsafe(16),
         name=empleaido.name,
@@ -445,8 +785,7 @@ async def create_empleaido(empleaido: EmpleaidoCreate, request: Request):
         deployed=False
     )
 
-    empleaidos.append(new_empleaido.dict())
-    save_empleaidos(empleaidos)
+    empleaido_store.put(new_empleaido.dict())
 
     audit_log("create_empleaido", {
         "id": new_empleaido.id,
@@ -455,6 +794,138 @@ async def create_empleaido(empleaido: EmpleaidoCreate, request: Request):
 
     return new_empleaido
 
+def import_batch(batch: list, dry_run: bool) -> list:
+    """Validate (line, raw record, parse error) entries; unless dry-running, commit the valid ones in one write"""
+    results, records = [], []
+    for number, raw, parse_error in batch:
+        if parse_error:
+            results.append({"line": number, "status": "invalid", "errors": [{"field": "", "message": parse_error}]})
+            continue
+        try:
+            empleaido = EmpleaidoCreate.model_validate(raw)
+        except ValidationError as e:
+            results.append({"line": number, "status": "invalid", "errors": [
+                {"field": ".".join(str(part) for part in err["loc"]), "message": err["msg"]}
+                for err in e.errors()
+            ]})
+            continue
+        record = Empleaido(
+            id=secrets.token_urlsafe(16),
+            name=empleaido.name,
+            role=empleaido.role,
+            specialty=empleaido.specialty,
+            sefirot_activation=empleaido.sefirot_activation,
+            skills=empleaido.skills,
+            status="active",
+            created_at=datetime.now().isoformat(),
+            deployed=False
+        ).dict()
+        records.append(record)
+        results.append({
+            "line": number,
+            "status": "valid" if dry_run else "created",
+            "id": None if dry_run else record["id"],
+            "name": record["name"]
+        })
+    if records and not dry_run:
+        empleaido_store.put_many(records)
+    return results
+
+@app.post("/api/empleaidos/import")
+async def import_empleaidos(request: Request, dry_run: bool = False):
+    """Bulk-create empleaidos from an NDJSON or JSON-array body.
+
+    Records are validated with EmpleaidoCreate and committed IMPORT_BATCH_SIZE
+    at a time. The response is an NDJSON report with one line per input record
+    followed by a summary line; with `dry_run=true` nothing is written.
+    """
+    client_ip = request.client.host
+    if not check_rate_limit(client_ip, "import_empleaidos"):
+        audit_log("rate_limit_exceeded", {"endpoint": "import_empleaidos"}, client_ip)
+        raise HTTPException(status_code=429, detail="Rate limit exceeded")
+
+    started = time.perf_counter()
+    # The body is consumed before responding, so the report is spooled meanwhile
+    report = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    counts = {"created": 0, "valid": 0, "invalid": 0}
+    batches = 0
+    error = None
+
+    def write(results):
+        for result in results:
+            counts[result["status"]] += 1
+            report.write(json.dumps(result).encode() + b"\n")
+
+    batch = []
+    try:
+        async for number, raw, parse_error in iter_records(request.stream(), IMPORT_MAX_RECORD_BYTES):
+            # Parse failures ride along in the batch so the report stays in input order
+            batch.append((number, raw, parse_error))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                write(await run_in_threadpool(import_batch, batch, dry_run))
+                batches += 1
+                batch = []
+    except ImportFormatError as e:
+        error = str(e)
+    if batch:
+        write(await run_in_threadpool(import_batch, batch, dry_run))
+        batches += 1
+
+    summary = dict(counts, dry_run=dry_run, batches=batches, seconds=round(time.perf_counter() - started, 3))
+    if error:
+        # Batches committed before the malformed input are kept
+        summary["error"] = error
+    report.write(json.dumps({"summary": summary}).encode() + b"\n")
+    report.seek(0)
+
+    audit_log("import_empleaidos", summary, client_ip)
+
+    return StreamingResponse(
+        iter(lambda: report.read(64 * 1024), b""),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(report.close),
+    )
+
+class BulkDeployRequest(BaseModel):
+    ids: Optional[List[str]] = Field(default=None, max_length=10000)
+    prune: bool = True
+
+@app.post("/api/empleaidos/deploy")
+async def bulk_deploy_empleaidos(request: Request, body: Optional[BulkDeployRequest] = None):
+    """Reconcile the skills directory with the given empleaidos (default: all)"""
+    client_ip = request.client.host
+    if not check_rate_limit(client_ip, "bulk_deploy"):
+        audit_log("rate_limit_exceeded", {"endpoint": "bulk_deploy"}, client_ip)
+        raise HTTPException(status_code=429, detail="Rate limit exceeded")
+
+    body = body or BulkDeployRequest()
+    if body.ids is None:
+        empleaidos = load_empleaidos()
+        prune = body.prune
+    else:
+        for empleaido_id in body.ids:
+            if not re.match(r'^[\w\-]+$', empleaido_id):
+                raise HTTPException(status_code=400, detail="Invalid empleaido ID")
+        empleaidos = [e for e in (get_empleaido(i) for i in body.ids) if e]
+        # Pruning against a partial set would remove the rest of the fleet
+        prune = False
+
+    report = await run_in_threadpool(skill_deployer.reconcile, empleaidos, prune)
+
+    for empleaido_id in report["deployed"]:
+        empleaido = get_empleaido(empleaido_id)
+        if empleaido and not empleaido.get("deployed"):
+            empleaido_store.put(dict(empleaido, deployed=True))
+
+    audit_log("bulk_deploy", {
+        "deployed": len(report["deployed"]),
+        "changed": len(report["changed"]),
+        "removed": len(report["removed"]),
+        "errors": len(report["errors"]),
+        "seconds": report["seconds"]
+    }, client_ip)
+    return report
+
 @app.post("/api/empleaidos/{empleaido_id}/deploy")
 async def deploy_empleaido(empleaido_id: str, request: Request):
     # Rate limiting
@@ -468,8 +939,7 @@ async def deploy_empleaido(empleaido_id: str, request: Request):
         audit_log("invalid_id", {"id": empleaido_id}, client_ip)
         raise HTTPException(status_code=400, detail="Invalid empleaido ID")
 
-    empleaidos = load_empleaidos()
-    empleaido = next((e for e in empleaidos if e["id"] == empleaido_id), None)
+    empleaido = get_empleaido(empleaido_id)
 
     if not empleaido:
         audit_log("deploy_not_found", {"id": empleaido_id}, client_ip)
@@ -478,8 +948,7 @@ async def deploy_empleaido(empleaido_id: str, request: Request):
     success = deploy_empleaido_skill(empleaido)
 
     if success:
-        empleaido["deployed"] = True
-        save_empleaidos(empleaidos)
+        empleaido = empleaido_store.put(dict(empleaido, deployed=True))
 
         audit_log("deploy_empleaido", {
             "id": empleaido_id,
@@ -508,23 +977,66 @@ async def delete_empleaido(empleaido_id: str, request: Request):
         audit_log("invalid_id", {"id": empleaido_id}, client_ip)
         raise HTTPException(status_code=400, detail="Invalid empleaido ID")
 
-    empleaidos = load_empleaidos()
-    empleaido = next((e for e in empleaidos if e["id"] == empleaido_id), None)
+    empleaido = get_empleaido(empleaido_id)
 
     if empleaido:
         # Delete skill directory if deployed
         if empleaido.get("deployed"):
-            skill_dir = OPENCLAW_SKILLS_PATH / empleaido['name'].lower()
-            if skill_dir.exists():
-                shutil.rmtree(skill_dir)
+            skill_deployer.remove(empleaido)
 
-    empleaidos = [e for e in empleaidos if e["id"] != empleaido_id]
-    save_empleaidos(empleaidos)
+    empleaido_store.delete(empleaido_id)
 
     audit_log("delete_empleaido", {"id": empleaido_id}, client_ip)
 
     return {"message": "Deleted successfully"}
 
+# Scrape-time gauges read from the services' own counters
+metrics.gauge_callback("empleaido_records", "Stored empleaidos", lambda: {(): len(empleaido_store)})
+metrics.gauge_callback("empleaido_sessions_active", "Live sessions", lambda: {(): len(session_store)})
+metrics.gauge_callback(
+    "empleaido_transcription_jobs_pending", "Queued or running transcription jobs",
+    lambda: {(): transcription_jobs.stats()["pending"]},
+)
+metrics.gauge_callback(
+    "empleaido_audit_log_entries", "Audit log entries by state",
+    lambda: {(state,): audit_writer.stats()[state] for state in ("queued", "written", "dropped")},
+    ("state",),
+)
+metrics.gauge_callback(
+    "empleaido_webhook_duplicates", "Webhook redeliveries absorbed, by state of the original",
+    lambda: {
+        ("in_flight",): webhook_deliveries.duplicates_in_flight,
+        ("completed",): webhook_deliveries.duplicates_completed,
+    },
+    ("original",),
+)
+metrics.gauge_callback(
+    "empleaido_whisper_model_decisions", "Transcriptions admitted per model size by the scheduler",
+    lambda: {(size,): count for size, count in model_scheduler.stats()["decisions"].items()},
+    ("size",),
+)
+metrics.gauge_callback(
+    "empleaido_whisper_shed", "Transcriptions rejected with Retry-After to protect the latency SLO",
+    lambda: {(): model_scheduler.rejected},
+)
+metrics.gauge_callback(
+    "empleaido_whisper_backlog_seconds", "Estimated inference seconds owed to queued and running jobs",
+    lambda: {(): model_scheduler.pending_seconds()},
+)
+metrics.gauge_callback(
+    "empleaido_whatsapp_outbox_pending", "Outbound WhatsApp replies waiting to be sent",
+    lambda: {(): whatsapp_outbox.pending},
+)
+metrics.gauge_callback(
+    "empleaido_whisper_resident_mb", "Estimated memory of resident Whisper models",
+    lambda: {(): transcription_jobs.resident_mb()},
+)
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text exposition of request, hot-path and service metrics"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
@@ -532,7 +1044,22 @@ async def health_check():
         "status": "healthy",
         "version": "2.1.0",
         "security": "enabled",
-        "whisper": "installed"
+        "worker": {"pid": os.getpid(), "workers": WEB_WORKERS},
+        "whisper": "installed",
+        "whisper_models": transcription_jobs.model_stats(),
+        "transcription_jobs": transcription_jobs.stats(),
+        "media_fetcher": media_fetcher.stats(),
+        "transcription_cache": transcription_cache.stats(),
+        "storage": empleaido_store.stats(),
+        "sessions": session_store.stats(),
+        "rate_limiter": rate_limiter.stats(),
+        "audit_log": audit_writer.stats(),
+        "response_cache": response_cache.stats(),
+        "skill_render": skill_renderer.stats(),
+        "search_index": search_index.stats(),
+        "webhook_deliveries": webhook_deliveries.stats(),
+        "whatsapp_outbox": whatsapp_outbox.stats(),
+        "model_scheduler": model_scheduler.stats()
     }
 
 # Whisper/Audio Transcription endpoints
@@ -544,50 +1071,212 @@ async def transcribe_audio(request: Request):
         audit_log("rate_limit_exceeded", {"endpoint": "whisper_transcribe"}, client_ip)
         raise HTTPException(status_code=429, detail="Rate limit exceeded")
 
+    # Stream the upload to disk (size limit enforced while receiving)
     try:
-        import whisper
-        from fastapi import UploadFile
+        upload = await stream_upload_to_disk(request, max_bytes=WHISPER_MAX_UPLOAD_BYTES)
+    except UploadTooLargeError as e:
+        audit_log("whisper_upload_too_large", {"endpoint": "whisper_transcribe"}, client_ip)
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        # Get audio file from form
-        form = await request.form()
-        audio_file = form.get("file")
-
-        if not audio_file:
-            raise HTTPException(status_code=400, detail="No audio file provided")
-
-        # Save temp file
-        import tempfile
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp_file:
-            content = await audio_file.read()
-            tmp_file.write(content)
-            tmp_path = tmp_file.name
-
-        # Load Whisper model
-        model = whisper.load_model("base")
+    try:
+        duration = probe_audio_duration(upload.path)
 
-        # Transcribe
-        result = model.transcribe(tmp_path)
+        result, cached, model_size = await transcribe_cached(upload.path, upload.sha256, duration=duration)
         text = result["text"].strip()
 
-        # Cleanup
-        import os
-        os.unlink(tmp_path)
-
         audit_log("whisper_transcribe", {
-            "length_seconds": len(content) / 32000,  # rough estimate
-            "text_length": len(text)
+            "length_seconds": duration,
+            "bytes": upload.size,
+            "text_length": len(text),
+            "model": model_size,
+            "cached": cached
         }, client_ip)
 
         return {
             "text": text,
-            "model": "whisper-base",
-            "duration_estimate": len(content) / 32000
+            "model": model_label(model_size),
+            "duration_estimate": duration,
+            "cached": cached
         }
 
+    except OverloadedError as e:
+        raise overloaded_response(e, "whisper_transcribe", client_ip)
+    except QueueFullError as e:
+        upload.discard()
+        audit_log("whisper_queue_full", {"endpoint": "whisper_transcribe"}, client_ip)
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
         audit_log("whisper_error", {"error": str(e)}, client_ip)
         raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
 
+async def single_chunk(chunk: AudioChunk, audio_path: str, model_size: str):
+    """`transcribe_chunks` counterpart for audio that fits in one chunk"""
+    result = await transcription_jobs.run(audio_path, model_size, audio_seconds=chunk.end)
+    yield chunk, stitch_chunk(chunk, result), result
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/api/whisper/transcribe/stream")
+async def transcribe_audio_stream(request: Request):
+    """Transcribe long audio in parallel chunks, streaming text as Server-Sent Events
+
+    Events: `start` (chunk plan), `partial` (each chunk's stitched segments, in
+    order), then `done` with the full result, or `error`.
+    """
+    client_ip = request.client.host
+    if not check_rate_limit(client_ip, "whisper_transcribe"):
+        audit_log("rate_limit_exceeded", {"endpoint": "whisper_transcribe_stream"}, client_ip)
+        raise HTTPException(status_code=429, detail="Rate limit exceeded")
+
+    try:
+        upload = await stream_upload_to_disk(request, max_bytes=WHISPER_MAX_UPLOAD_BYTES)
+    except UploadTooLargeError as e:
+        audit_log("whisper_upload_too_large", {"endpoint": "whisper_transcribe_stream"}, client_ip)
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Shed or downsize before the stream starts, so overload is a plain 503
+    model_size = WHISPER_DEFAULT_MODEL
+    key = cache_key(upload.sha256, model_size, None, engine=whisper_engine.name)
+    cached_result = await transcription_cache.lookup(key)
+    duration = probe_audio_duration(upload.path)
+    if cached_result is None:
+        try:
+            model_size = choose_model_size(duration, chunked=duration is None or duration > WHISPER_CHUNK_SECONDS)
+        except OverloadedError as e:
+            upload.discard()
+            raise overloaded_response(e, "whisper_transcribe_stream", client_ip)
+        if model_size != WHISPER_DEFAULT_MODEL:
+            key = cache_key(upload.sha256, model_size, None, engine=whisper_engine.name)
+            cached_result = await transcription_cache.lookup(key)
+
+    async def events():
+        started = time.perf_counter()
+        result = cached_result
+        cached = result is not None
+        try:
+            if cached:
+                upload.discard()
+                yield sse_event("start", {"chunks": 1, "cached": True})
+            else:
+                if duration is not None and duration <= WHISPER_CHUNK_SECONDS:
+                    # Short clip: one job on the original file, no decode in this process
+                    chunks = [AudioChunk(0, 0.0, duration, 0.0, duration)]
+                    results = single_chunk(chunks[0], upload.path, model_size)
+                else:
+                    audio, chunks = await run_in_threadpool(prepare_chunks, upload.path)
+                    results = transcribe_chunks(
+                        transcription_jobs, audio, chunks, model_size, None, chunk_concurrency()
+                    )
+                yield sse_event("start", {
+                    "chunks": len(chunks),
+                    "duration": chunks[-1].keep_until if chunks else 0,
+                    "cached": False
+                })
+                parts = []
+                async for chunk, segments, chunk_result in results:
+                    parts.append((chunk, segments, chunk_result))
+                    yield sse_event("partial", {
+                        "chunk": chunk.index,
+                        "start": chunk.keep_from,
+                        "end": chunk.keep_until,
+                        "text": "".join(segment.get("text", "") for segment in segments).strip(),
+                        "segments": segments
+                    })
+                result = dict(merge_results(parts), inference_seconds=round(time.perf_counter() - started, 3))
+                await transcription_cache.store(key, result)
+        except Exception as e:
+            upload.discard()
+            event = "whisper_queue_full" if isinstance(e, QueueFullError) else "whisper_error"
+            audit_log(event, {"endpoint": "whisper_transcribe_stream", "error": str(e)}, client_ip)
+            yield sse_event("error", {"detail": f"Transcription failed: {str(e)}"})
+            return
+
+        text = result["text"].strip()
+        audit_log("whisper_transcribe", {
+            "bytes": upload.size,
+            "chunks": result.get("chunks", 1),
+            "text_length": len(text),
+            "model": model_size,
+            "cached": cached,
+            "streamed": True
+        }, client_ip)
+        yield sse_event("done", {
+            "text": text,
+            "language": result.get("language", "unknown"),
+            "segments": result.get("segments", []),
+            "model": model_label(model_size),
+            "cached": cached
+        })
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(upload.discard)
+    )
+
+@app.post("/api/whisper/jobs", status_code=202)
+async def submit_transcription_job(request: Request):
+    """Queue an audio file for transcription and return the job id"""
+    client_ip = request.client.host
+    if not check_rate_limit(client_ip, "whisper_jobs"):
+        audit_log("rate_limit_exceeded", {"endpoint": "whisper_jobs"}, client_ip)
+        raise HTTPException(status_code=429, detail="Rate limit exceeded")
+
+    try:
+        upload = await stream_upload_to_disk(request, max_bytes=WHISPER_MAX_UPLOAD_BYTES)
+    except UploadTooLargeError as e:
+        audit_log("whisper_upload_too_large", {"endpoint": "whisper_jobs"}, client_ip)
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        duration = probe_audio_duration(upload.path)
+        model_size = choose_model_size(duration)
+        job = transcription_jobs.submit(upload.path, model_size, audio_seconds=duration)
+    except OverloadedError as e:
+        upload.discard()
+        raise overloaded_response(e, "whisper_jobs", client_ip)
+    except QueueFullError as e:
+        upload.discard()
+        audit_log("whisper_queue_full", {"endpoint": "whisper_jobs"}, client_ip)
+        raise HTTPException(status_code=429, detail=str(e))
+
+    audit_log("whisper_job_submitted", {"job_id": job.id}, client_ip)
+    return job.to_dict()
+
+@app.get("/api/whisper/jobs/{job_id}")
+async def get_transcription_job(job_id: str, wait: float = 0):
+    """Poll a transcription job; `wait` long-polls for up to that many seconds"""
+    job = transcription_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if wait > 0:
+        job = await transcription_jobs.wait(job, min(wait, WHISPER_MAX_LONG_POLL))
+    return job.to_dict()
+
+@app.delete("/api/whisper/jobs/{job_id}")
+async def cancel_transcription_job(job_id: str, request: Request):
+    """Cancel a queued or running transcription job"""
+    job = transcription_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if getattr(job, "remote", False):
+        # Only the owning worker process can cancel its executor's futures
+        if not job.finished:
+            raise HTTPException(status_code=409, detail="Job is owned by another worker process")
+        return job.to_dict()
+    job = transcription_jobs.cancel(job_id)
+    audit_log("whisper_job_cancelled", {"job_id": job_id}, request.client.host)
+    return job.to_dict()
+
 @app.get("/api/whisper/skills")
 async def get_whisper_skills():
     """Get available Whisper/Audio skills"""
@@ -647,78 +1336,123 @@ async def whatsapp_webhook(request: Request):
                 "message_type": message_type
             }
 
+        if not payload.get("message_id"):
+            return await process_whatsapp_audio(payload, client_ip)
+
+        response, duplicate = await webhook_deliveries.run(
+            f"whatsapp:{message_id}", lambda: process_whatsapp_audio(payload, client_ip)
+        )
+        if duplicate:
+            audit_log("whatsapp_duplicate_delivery", {"message_id": message_id}, client_ip)
+            return dict(response, duplicate=True)
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        audit_log("whatsapp_webhook_error", {"error": str(e)}, client_ip)
+        raise HTTPException(status_code=400, detail=f"Invalid webhook payload: {str(e)}")
+
+
+async def process_whatsapp_audio(payload: dict, client_ip: str) -> dict:
+    """Download and transcribe one audio message; runs once per message_id"""
+    sender = payload.get("from", "unknown")
+    message_id = payload.get("message_id", "unknown")
+    try:
         # Get audio path
         audio_url = payload.get("audio_url")
         audio_path = payload.get("audio_path")
 
         # Download audio if URL provided
         if audio_url and not audio_path:
-            import tempfile
-            import requests
-
-            response = requests.get(audio_url)
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".ogg") as tmp:
-                tmp.write(response.content)
-                audio_path = tmp.name
+            try:
+                download = await media_fetcher.fetch_to_file(audio_url, suffix=".ogg")
+            except MediaTooLargeError as e:
+                audit_log("whatsapp_media_too_large", {"message_id": message_id}, client_ip)
+                raise HTTPException(status_code=413, detail=str(e))
+            except MediaFetchError as e:
+                audit_log("whatsapp_media_error", {"message_id": message_id, "error": str(e)}, client_ip)
+                raise HTTPException(status_code=502, detail=str(e))
+            audio_path = download.path
+            audio_sha256 = download.sha256
+        else:
+            audio_sha256 = None
 
         if not audio_path:
             raise HTTPException(status_code=400, detail="No audio file provided")
 
         # Transcribe with Whisper
         try:
-            import whisper
-            model = whisper.load_model("base")
-            result = model.transcribe(audio_path)
-
-            # Cleanup temp file
-            import os
-            if os.path.exists(audio_path):
-                os.unlink(audio_path)
+            if audio_sha256 is None:
+                audio_sha256 = await run_in_threadpool(hash_file, audio_path)
+            result, cached, model_size = await transcribe_cached(audio_path, audio_sha256)
 
             transcribed_text = result["text"].strip()
             duration = result.get("segments", [{}])[-1].get("end", 0) if result.get("segments") else 0
             detected_language = result.get("language", "unknown")
 
-            # Format for WhatsApp (max 4096 chars)
-            max_length = 4096
-            formatted_text = transcribed_text[:max_length] if len(transcribed_text) > max_length else transcribed_text
-            parts_needed = len(transcribed_text) > max_length
-
-            response_data = {
-                "message_id": message_id,
-                "sender": sender,
-                "transcription": formatted_text,
-                "original_length": len(transcribed_text),
-                "formatted_length": len(formatted_text),
-                "parts_needed": parts_needed,
-                "duration": duration,
-                "language": detected_language,
-                "timestamp": datetime.now().isoformat()
-            }
+            # WhatsApp caps a message at 4096 chars; longer text goes out as several parts
+            parts = split_message(transcribed_text, WHATSAPP_MAX_CHARS)
+            parts_needed = len(parts) > 1
 
             audit_log("whatsapp_transcription_complete", {
                 "duration": duration,
                 "language": detected_language,
-                "chars": len(formatted_text)
+                "chars": len(transcribed_text),
+                "parts": len(parts),
+                "model": model_size,
+                "cached": cached
             }, client_ip)
 
-            # In production, send back to WhatsApp via provider API
-            # For now, just return the transcription
+            # Sent in the background; the provider gets its webhook response right away
+            delivery = None
+            if whatsapp_outbox.enabled and parts and sender != "unknown":
+                try:
+                    reply = whatsapp_outbox.enqueue(sender, transcribed_text, reply_to=payload.get("message_id"))
+                    delivery = {"reply_id": reply.id, "status": reply.status, "parts": len(reply.parts)}
+                except OutboxFullError as e:
+                    audit_log("whatsapp_outbox_full", {"message_id": message_id}, client_ip)
+                    delivery = {"status": "rejected", "error": str(e)}
+
             return {
                 "success": True,
-                "transcription": formatted_text,
+                "transcription": transcribed_text,
                 "whatsapp_ready": True,  # Ready to send to WhatsApp
+                "parts": parts,
                 "parts_needed": parts_needed,
+                "delivery": delivery,
                 "metadata": {
                     "duration": duration,
-                    "language": detected_language
+                    "language": detected_language,
+                    "model": model_label(model_size),
+                    "cached": cached
                 }
             }
 
+        except OverloadedError as e:
+            raise overloaded_response(e, "whatsapp_webhook", client_ip)
+        except QueueFullError as e:
+            audit_log("whisper_queue_full", {"endpoint": "whatsapp_webhook"}, client_ip)
+            raise HTTPException(status_code=429, detail=str(e))
         except Exception as e:
             audit_log("whisper_transcription_error", {"error": str(e)}, client_ip)
             raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
 
+    except HTTPException:
+        raise
+    except Exception as e:
+        audit_log("whatsapp_webhook_error", {"error": str(e)}, client_ip)
+        raise HTTPException(status_code=400, detail=f"Invalid webhook payload: {str(e)}")
+
+
+@app.get("/api/whatsapp/replies/{reply_id}")
+async def get_whatsapp_reply(reply_id: str):
+    """Delivery progress of an outbound reply (held by the worker process that queued it)"""
+    reply = whatsapp_outbox.get(reply_id)
+    if not reply:
+        raise HTTPException(status_code=404, detail="Reply not found")
+    return reply.to_dict()
+
 
 @app.get("/api/whatsapp/status")
 async def whatsapp_status():
@@ -729,8 +1463,10 @@ async def whatsapp_status():
         "version": "1.0.0",
         "endpoints": {
             "webhook": "/api/whatsapp/webhook",
-            "test": "/api/whatsapp/transcribe"
+            "test": "/api/whatsapp/transcribe",
+            "replies": "/api/whatsapp/replies/{reply_id}"
         },
+        "outbound_delivery": "enabled" if whatsapp_outbox.enabled else "disabled",
         "capabilities": [
             "Audio transcription via WhatsApp",
             "Automatic language detection",
@@ -747,4 +1483,17 @@ async def whatsapp_status():
 
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="127.0.0.1", port=8000)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Empleaido Factory API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=WEB_WORKERS, help="API worker processes")
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        # Worker processes import main:app and read this to share state via SQLite
+        os.environ["EMPLEAIDO_WORKERS"] = str(args.workers)
+        uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers)
+    else:
+        uvicorn.run(app, host=args.host, port=args.port)
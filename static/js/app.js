@@ -1,6 +1,13 @@
 // State
 let empleaidos = [];
 let authToken = null;
+let nextCursor = null;
+let loadingPage = false;
+let catalogGeneration = 0;
+
+// Cards fetched per page; more are requested as the grid scrolls into view
+const PAGE_SIZE = 60;
+const GRID_FIELDS = 'id,name,role,specialty,sefirot_activation,skills,status,deployed';
 
 // Load empleaidos on page load
 document.addEventListener('DOMContentLoaded', async () => {
@@ -12,6 +19,7 @@ document.addEventListener('DOMContentLoaded', async () => {
         await createSession();
     }
 
+    watchGridEnd();
     await loadEmpleaidos();
     updateStats();
 });
@@ -32,27 +40,108 @@ async function createSession() {
     }
 }
 
-// Load empleaidos from API
-async function loadEmpleaidos() {
-    try {
-        const headers = { 'Content-Type': 'application/json' };
-        if (authToken) {
-            headers['X-Auth-Token'] = authToken;
+function authHeaders() {
+    const headers = { 'Content-Type': 'application/json' };
+    if (authToken) {
+        headers['X-Auth-Token'] = authToken;
+    }
+    return headers;
+}
+
+// GET that waits out 429s (Retry-After, else a growing pause) and throws on other errors
+async function fetchJson(url, attempts = 4) {
+    for (let attempt = 1; ; attempt++) {
+        const response = await fetch(url, { headers: authHeaders() });
+        if (response.ok) {
+            return response;
+        }
+        if (response.status !== 429 || attempt >= attempts) {
+            throw new Error(`${url} returned HTTP ${response.status}`);
         }
+        const retryAfter = parseFloat(response.headers.get('Retry-After'));
+        const seconds = Number.isFinite(retryAfter) ? retryAfter : 2 ** attempt;
+        await new Promise(resolve => setTimeout(resolve, seconds * 1000));
+    }
+}
 
-        const response = await fetch('/api/empleaidos', { headers });
-        empleaidos = await response.json();
+// Load the first page of empleaidos (again, after any change)
+async function loadEmpleaidos() {
+    const generation = ++catalogGeneration;
+    loadingPage = false;
+    try {
+        const { records, cursor } = await fetchPage(null);
+        if (generation !== catalogGeneration) return;
+        empleaidos = records;
+        nextCursor = cursor;
         renderEmpleaidos();
+        fillViewport();
     } catch (error) {
         console.error('Error loading empleaidos:', error);
         showError('Error loading empleaidos');
     }
 }
 
+// Append the next page when the end of the grid comes into view
+async function loadMoreEmpleaidos() {
+    if (loadingPage || !nextCursor) return;
+    const generation = catalogGeneration;
+    let loaded = false;
+    loadingPage = true;
+    try {
+        const { records, cursor } = await fetchPage(nextCursor);
+        if (generation !== catalogGeneration) return;
+        empleaidos.push(...records);
+        nextCursor = cursor;
+        document.getElementById('empleaidos-grid').insertAdjacentHTML('beforeend', records.map(cardHtml).join(''));
+        loaded = true;
+    } catch (error) {
+        console.error('Error loading empleaidos:', error);
+        showError('Error loading empleaidos');
+    } finally {
+        if (generation === catalogGeneration) {
+            loadingPage = false;
+        }
+    }
+    if (loaded) {
+        fillViewport();
+    }
+}
+
+// The observer only fires on changes, so keep loading while the grid end is still on screen
+function fillViewport() {
+    const sentinel = document.getElementById('empleaidos-end');
+    if (sentinel && sentinel.getBoundingClientRect().top < window.innerHeight + 600) {
+        loadMoreEmpleaidos();
+    }
+}
+
+async function fetchPage(cursor) {
+    // Only the fields the grid renders
+    const params = new URLSearchParams({ limit: String(PAGE_SIZE), fields: GRID_FIELDS });
+    if (cursor) params.set('cursor', cursor);
+    const response = await fetchJson(`/api/empleaidos?${params}`);
+    return { records: await response.json(), cursor: response.headers.get('X-Next-Cursor') };
+}
+
+function watchGridEnd() {
+    const grid = document.getElementById('empleaidos-grid');
+    const sentinel = document.createElement('div');
+    sentinel.id = 'empleaidos-end';
+    grid.after(sentinel);
+    new IntersectionObserver(entries => {
+        if (entries.some(entry => entry.isIntersecting)) {
+            loadMoreEmpleaidos();
+        }
+    }, { rootMargin: '600px' }).observe(sentinel);
+}
+
 // Render empleaidos
 function renderEmpleaidos() {
-    const grid = document.getElementById('empleaidos-grid');
-    grid.innerHTML = empleaidos.map(empleaido => `
+    document.getElementById('empleaidos-grid').innerHTML = empleaidos.map(cardHtml).join('');
+}
+
+function cardHtml(empleaido) {
+    return `
         <div class="bg-slate-800/50 backdrop-blur rounded-xl p-6 border border-purple-500/30 card-hover transition-all duration-300">
             <div class="flex justify-between items-start mb-4">
                 <div>
@@ -100,7 +189,7 @@ function renderEmpleaidos() {
                 </div>
             </div>
         </div>
-    `).join('');
+    `;
 }
 
 // Escape HTML to prevent XSS
@@ -110,13 +199,16 @@ function escapeHtml(text) {
     return div.innerHTML;
 }
 
-// Update stats
-function updateStats() {
-    document.getElementById('total-count').textContent = empleaidos.length;
-    document.getElementById('active-count').textContent = empleaidos.filter(e => e.status === 'active').length;
-
-    const totalSefirot = empleaidos.reduce((sum, e) => sum + e.sefirot_activation.length, 0);
-    document.getElementById('sefirot-count').textContent = totalSefirot;
+// Update stats (catalog-wide totals from the server; the grid holds only the loaded pages)
+async function updateStats() {
+    try {
+        const stats = await (await fetchJson('/api/empleaidos/stats')).json();
+        document.getElementById('total-count').textContent = stats.total;
+        document.getElementById('active-count').textContent = stats.active;
+        document.getElementById('sefirot-count').textContent = stats.sefirot_activations;
+    } catch (error) {
+        console.error('Error loading stats:', error);
+    }
 }
 
 // Show error message